@@ -0,0 +1,292 @@
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# Board pipeline order; stages not listed here sort after these
+STAGE_ORDER = ('Idea Description', 'Market Analysis', 'Business Case', 'Completed')
+APPROVED = 'Completed and Approved'
+UNDECIDED = 'In Progress'
+
+SECONDS_PER_DAY = 86400.0
+
+
+def parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def stage_rank(stage):
+    """Position of ``stage`` in the pipeline, or -1 for stages outside it."""
+    return STAGE_ORDER.index(stage) if stage in STAGE_ORDER else -1
+
+
+def stage_sort_key(stage):
+    rank = stage_rank(stage)
+    return (rank if rank >= 0 else len(STAGE_ORDER), stage)
+
+
+class Distribution:
+    """A sorted multiset of numbers with a running sum, for O(1) summaries."""
+
+    def __init__(self):
+        self.values = []
+        self.total = 0.0
+
+    def add(self, value):
+        bisect.insort(self.values, value)
+        self.total += value
+
+    def remove(self, value):
+        index = bisect.bisect_left(self.values, value)
+        if index < len(self.values) and self.values[index] == value:
+            del self.values[index]
+            self.total -= value
+
+    def summary(self):
+        values = self.values
+        if not values:
+            return {'count': 0}
+        return {
+            'count': len(values),
+            'mean': round(self.total / len(values), 1),
+            'p50': round(values[len(values) // 2], 1),
+            'p90': round(values[min(len(values) - 1, int(len(values) * 0.9))], 1),
+            'max': round(values[-1], 1),
+        }
+
+
+class _PipelineState:
+    """Aggregates plus what each task currently contributes to them."""
+
+    def __init__(self):
+        self.tasks = {}              # task id -> (stage, completion_status)
+        self.meeting_dates = {}      # meeting id -> datetime
+        self.history = {}            # task id -> {meeting id: stage_at_meeting}
+        self.meeting_tasks = {}      # meeting id -> {task ids}
+        self.contributions = {}      # task id -> (reached stage, [(stage, days)], [days])
+        self.stages = Counter()
+        self.statuses = Counter()
+        self.reached = Counter()
+        self.time_in_stage = {}
+        self.between_meetings = Distribution()
+
+    # -- per-task contributions --------------------------------------------
+
+    def _contribution(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        visits = sorted(
+            (date, meeting_id, stage)
+            for meeting_id, stage in self.history.get(task_id, {}).items()
+            if stage
+            if (date := self.meeting_dates.get(meeting_id)) is not None
+        )
+        reached = max([stage_rank(task[0])] + [stage_rank(stage) for _, _, stage in visits])
+        in_stage, gaps = [], []
+        stage_started = None
+        for index, (date, _, stage) in enumerate(visits):
+            if index:
+                previous_date, _, previous_stage = visits[index - 1]
+                gaps.append((date - previous_date).total_seconds() / SECONDS_PER_DAY)
+                if stage != previous_stage:
+                    in_stage.append((previous_stage, (date - stage_started).total_seconds() / SECONDS_PER_DAY))
+                    stage_started = date
+            else:
+                stage_started = date
+        return reached, in_stage, gaps
+
+    def refresh_task(self, task_id):
+        """Swap the task's old contribution to the aggregates for its current one."""
+        old = self.contributions.pop(task_id, None)
+        if old is not None:
+            reached, in_stage, gaps = old
+            self.reached[reached] -= 1
+            for stage, days in in_stage:
+                self.time_in_stage[stage].remove(days)
+            for days in gaps:
+                self.between_meetings.remove(days)
+        new = self._contribution(task_id)
+        if new is not None:
+            reached, in_stage, gaps = new
+            self.reached[reached] += 1
+            for stage, days in in_stage:
+                self.time_in_stage.setdefault(stage, Distribution()).add(days)
+            for days in gaps:
+                self.between_meetings.add(days)
+            self.contributions[task_id] = new
+
+    # -- changes -----------------------------------------------------------
+
+    def set_task(self, task_id, stage, status):
+        stage, status = stage or 'Unknown', status or 'Unknown'
+        old = self.tasks.get(task_id)
+        if old is not None:
+            self.stages[old[0]] -= 1
+            self.statuses[old[1]] -= 1
+        self.tasks[task_id] = (stage, status)
+        self.stages[stage] += 1
+        self.statuses[status] += 1
+        self.refresh_task(task_id)
+
+    def remove_task(self, task_id):
+        old = self.tasks.pop(task_id, None)
+        if old is not None:
+            self.stages[old[0]] -= 1
+            self.statuses[old[1]] -= 1
+        for meeting_id in self.history.pop(task_id, {}):
+            self.meeting_tasks.get(meeting_id, set()).discard(task_id)
+        self.refresh_task(task_id)
+
+    def set_meeting(self, meeting_id, date):
+        self.meeting_dates[meeting_id] = parse_date(date)
+        for task_id in self.meeting_tasks.get(meeting_id, ()):
+            self.refresh_task(task_id)
+
+    def remove_meeting(self, meeting_id):
+        self.meeting_dates.pop(meeting_id, None)
+        for task_id in self.meeting_tasks.pop(meeting_id, set()):
+            self.history.get(task_id, {}).pop(meeting_id, None)
+            self.refresh_task(task_id)
+
+    def set_visit(self, meeting_id, task_id, stage):
+        self.history.setdefault(task_id, {})[meeting_id] = stage
+        self.meeting_tasks.setdefault(meeting_id, set()).add(task_id)
+        self.refresh_task(task_id)
+
+    def remove_visit(self, meeting_id, task_id):
+        self.history.get(task_id, {}).pop(meeting_id, None)
+        self.meeting_tasks.get(meeting_id, set()).discard(task_id)
+        self.refresh_task(task_id)
+
+    def apply(self, event_type, data):
+        if event_type in ('task.created', 'task.updated'):
+            self.set_task(data['id'], data.get('stage'), data.get('completion_status'))
+        elif event_type == 'task.deleted':
+            self.remove_task(data['id'])
+        elif event_type in ('meeting.created', 'meeting.updated'):
+            if 'date' in data:
+                self.set_meeting(data['id'], data['date'])
+        elif event_type == 'meeting.deleted':
+            self.remove_meeting(data['id'])
+        elif event_type == 'meeting_task.added':
+            self.set_visit(data['meeting_id'], data['task_id'], data.get('stage_at_meeting'))
+        elif event_type == 'meeting_task.removed':
+            self.remove_visit(data['meeting_id'], data['task_id'])
+
+    # -- reporting ---------------------------------------------------------
+
+    def summary(self):
+        stages = sorted((stage for stage, count in self.stages.items() if count), key=stage_sort_key)
+        decided = sum(count for status, count in self.statuses.items() if status != UNDECIDED)
+        # Tasks that got at least as far as each stage
+        funnel, reached = [], 0
+        for rank in range(len(STAGE_ORDER) - 1, -1, -1):
+            reached += self.reached.get(rank, 0)
+            funnel.append({'stage': STAGE_ORDER[rank], 'reached': reached})
+        return {
+            'tasks': len(self.tasks),
+            'stages': {stage: self.stages[stage] for stage in stages},
+            'statuses': {status: count for status, count in sorted(self.statuses.items()) if count},
+            'approval_rate': round(self.statuses.get(APPROVED, 0) / decided, 3) if decided else None,
+            'funnel': funnel[::-1],
+            'time_in_stage_days': {
+                stage: self.time_in_stage[stage].summary()
+                for stage in sorted(self.time_in_stage, key=stage_sort_key)
+                if self.time_in_stage[stage].values
+            },
+            'days_between_meetings': self.between_meetings.summary(),
+        }
+
+
+class PipelineAnalytics:
+    """Stage, status and time-in-stage aggregates over the whole board.
+
+    Every change event adjusts the counters and distributions for just the
+    task (or meeting) it touches, and the summary is kept until the next
+    change, so reading it costs the same however many tasks there are.
+    ``loader()`` returns ``(tasks, meetings, meeting_tasks)`` row iterables
+    for a full rebuild, done on first use, after missed events, or once the
+    aggregates are older than ``max_age`` seconds.
+    """
+
+    def __init__(self, loader, max_age=3600.0):
+        self.loader = loader
+        self.max_age = max_age
+        self._state = _PipelineState()
+        self._summary = None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._built_at = None
+        self._stale = True
+        self._pending = None
+
+    def apply_event(self, event_type, data):
+        """EventLog listener that keeps the aggregates in step with the API's writes."""
+        if event_type in ('tasks.imported', 'reset'):
+            self._stale = True
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event_type, data))
+            self._state.apply(event_type, data)
+            self._summary = None
+
+    def rebuild(self, only_if_stale=False):
+        with self._rebuild_lock:
+            if only_if_stale and self._built_at is not None and not self._stale:
+                return
+            started = time.perf_counter()
+            with self._lock:
+                self._pending = []
+                self._stale = False
+            try:
+                state = _PipelineState()
+                tasks, meetings, meeting_tasks = self.loader()
+                for meeting in meetings:
+                    state.meeting_dates[meeting['id']] = parse_date(meeting.get('date'))
+                for row in meeting_tasks:
+                    state.history.setdefault(row['task_id'], {})[row['meeting_id']] = row.get('stage_at_meeting')
+                    state.meeting_tasks.setdefault(row['meeting_id'], set()).add(row['task_id'])
+                for task in tasks:
+                    state.set_task(task['id'], task.get('stage'), task.get('completion_status'))
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                    self._stale = True
+                raise
+            with self._lock:
+                pending, self._pending = self._pending, None
+                for event_type, data in pending:
+                    state.apply(event_type, data)
+                self._state, self._summary = state, None
+                self._built_at = time.monotonic()
+            logging.info("Rebuilt pipeline analytics", extra={
+                'tasks': len(state.tasks), 'seconds': round(time.perf_counter() - started, 3)
+            })
+
+    def ensure_fresh(self):
+        if self._built_at is None or self._stale:
+            self.rebuild(only_if_stale=True)
+        elif self.max_age and time.monotonic() - self._built_at > self.max_age and not self._rebuild_lock.locked():
+            self._built_at = time.monotonic()
+            threading.Thread(target=self._rebuild_quietly, name='pipeline-analytics', daemon=True).start()
+
+    def _rebuild_quietly(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logging.error(f"Pipeline analytics rebuild failed: {str(e)}")
+
+    def summary(self):
+        with self._lock:
+            if self._summary is None:
+                self._summary = self._state.summary()
+            return self._summary
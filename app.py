@@ -1,42 +1,167 @@
 import os
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, Response, request, jsonify, send_file
 from flask_cors import CORS
 from datetime import datetime, timezone
-from docx import Document
-from docx.shared import Pt, Cm
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from io import BytesIO
 import requests
 import logging
 from supabase import create_client, Client
-from oauthlib.oauth2 import BackendApplicationClient
-from requests_oauthlib import OAuth2Session
 from dotenv import load_dotenv
 import json
 import postgrest.exceptions
+from postgrest.types import ReturnMethod
 import uuid
+import re
+import hashlib
+import gc
+import tempfile
+import time
+from contextvars import copy_context
+from itertools import islice
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 from enum import Enum
+from jobs import ArtifactJobs
+from process_local import ProcessLocal
+from docx_render import DocxTemplate, PAGE_BREAK, default_template_path
+from cache import ReadCache, JsonPayload, brotli
+from storage import StorageBucket, HashingSpool, UploadTooLarge, CHUNK_SIZE
+from metrics import default_metrics
+from logs import setup_logging, request_id_var, LazyJson
+from events import EventLog, StreamSlots
+from search import SearchIndex, FIELD_WEIGHTS, RESULT_FIELDS
+from analytics import PipelineAnalytics
+from export import (TASK_COLUMNS, HISTORY_COLUMNS, TASK_EXPORT_SELECT, HISTORY_EXPORT_SELECT, task_export_row,
+                    history_export_row, csv_chunks, xlsx_chunks)
+from nettskjema import NettskjemaClient, NettskjemaFeedError, iter_answers, group_submissions
 
 load_dotenv()
 
+# Largest file accepted by POST /tasks/<id>/upload
+MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", str(25 * 1024 * 1024)))
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Hash and size-check uploaded files while they are being received
+        return HashingSpool(max_size=MAX_UPLOAD_SIZE)
+
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
+app.request_class = UploadRequest
+CORS_ORIGINS = ["http://localhost:3000"]
+CORS_EXPOSE_HEADERS = ["X-Next-Cursor", "ETag", "X-Request-ID"]
+CORS(app, resources={r"/*": {"origins": CORS_ORIGINS}}, expose_headers=CORS_EXPOSE_HEADERS)
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG)
+# JSON lines (LOG_FORMAT=text for local use) written by a background thread
+setup_logging(os.environ.get("LOG_LEVEL", "INFO"), os.environ.get("LOG_FORMAT", "json"))
+# httpx logs every Supabase call at INFO; /metrics counts those calls instead
+logging.getLogger("httpx").setLevel(max(logging.getLogger().level, logging.WARNING))
 
 # Initialize Supabase client
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
-supabase: Client = create_client(url, key)
+
+# Per-route latency and upstream call metrics, served at GET /metrics. With
+# METRICS_DIR set, every gunicorn worker's numbers are included in a scrape.
+metrics = default_metrics(os.environ.get("METRICS_DIR") or None)
+# Requests slower than this are logged with their upstream calls (0 = off)
+SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS", "0"))
+
+def create_supabase_client():
+    client = create_client(url, key)
+    for event, hooks in metrics.httpx_hooks('supabase').items():
+        client.postgrest.session.event_hooks[event] += hooks
+    return client
+
+supabase: Client = ProcessLocal(create_supabase_client)
+attachments_bucket = StorageBucket(url, key, 'task-attachments', response_hook=metrics.requests_hook('supabase'))
 
 # Nettskjema API configuration
-NETTSKJEMA_API_URL = "https://api.nettskjema.no/v3"
-NETTSKJEMA_AUTH_URL = "https://authorization.nettskjema.no/oauth2/token"
+NETTSKJEMA_API_URL = os.environ.get("NETTSKJEMA_API_URL", "https://api.nettskjema.no/v3")
+NETTSKJEMA_AUTH_URL = os.environ.get("NETTSKJEMA_AUTH_URL", "https://authorization.nettskjema.no/oauth2/token")
 NETTSKJEMA_CLIENT_ID = os.environ.get("NETTSKJEMA_CLIENT_ID")
 NETTSKJEMA_CLIENT_SECRET = os.environ.get("NETTSKJEMA_CLIENT_SECRET")
 NETTSKJEMA_FORM_ID = os.environ.get("NETTSKJEMA_FORM_ID")
+# Whether the answers feed lists each submission's answers together, in
+# ascending submission order; if not, the import has to buffer the whole feed.
+# An import that finds the feed out of order falls back to buffering it
+NETTSKJEMA_ANSWERS_ORDERED = os.environ.get("NETTSKJEMA_ANSWERS_ORDERED", "true").lower() == "true"
+
+# Submissions handled per import batch, and attachments transferred in parallel
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "50"))
+ATTACHMENT_CONCURRENCY = int(os.environ.get("ATTACHMENT_CONCURRENCY", "8"))
+
+# Shared Nettskjema client: one pooled session and cached token per worker
+nettskjema = NettskjemaClient(
+    NETTSKJEMA_CLIENT_ID,
+    NETTSKJEMA_CLIENT_SECRET,
+    api_url=NETTSKJEMA_API_URL,
+    auth_url=NETTSKJEMA_AUTH_URL,
+    response_hook=metrics.requests_hook('nettskjema')
+)
+
+
+# Rendered meeting documents, cached on disk by a hash of their content.
+# Bump DOCUMENT_RENDERER_VERSION when the layout changes to invalidate them.
+DOCUMENT_RENDERER_VERSION = 2
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+DOCUMENT_JOB_ID = re.compile(r'^(?P<kind>report|minutes)-(?P<meeting_id>\d+)-[0-9a-f]{24}$')
+document_jobs = ArtifactJobs(
+    os.environ.get("ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "innovation-board-artifacts")),
+    max_workers=int(os.environ.get("DOCUMENT_WORKERS", "2")),
+    suffix='.docx',
+    job_ttl=int(os.environ.get("DOCUMENT_JOB_TTL", "3600"))
+)
+
+# Change feed behind GET /events. The log file is shared by the workers on
+# this host, so every event reaches every connected board.
+event_log = EventLog(
+    os.environ.get("EVENTS_FILE", os.path.join(tempfile.gettempdir(), "innovation-board-events", "events.log")),
+    history=int(os.environ.get("EVENTS_HISTORY", "500"))
+)
+# Open GET /events streams per worker. Each holds a gthread thread or a
+# gevent greenlet until the board goes away, so gthread workers keep half
+# their threads for the rest of the API and sync workers don't stream.
+# Boards past the limit get a 503 and try again later.
+EVENT_STREAM_LIMIT = int(os.environ.get("EVENT_STREAM_LIMIT") or {
+    'gthread': max(1, int(os.environ.get("GUNICORN_THREADS", "8")) // 2),
+    'gevent': int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "200")) // 2,
+    'sync': 0,
+}.get(os.environ.get("WORKER_PROFILE", "gthread").lower(), 100))
+EVENT_STREAM_RETRY_SECONDS = 30
+event_streams = StreamSlots(EVENT_STREAM_LIMIT)
+
+BOARD_MEMBERS = [
+    ("Lars Olsen", "Dean Executive"),
+    ("Cecilie Asting", "Associate Dean Bachelor of Management"),
+    ("Geir Høidal Bjønnes", "Associate Dean Master of Management"),
+    ("Lise Hammergren", "Executive Vice President, BI Executive"),
+    ("Gry Varre", "Manager Open Enrolment"),
+    ("Wenche Martinussen", "Director Sales/Marketing"),
+    ("Tonje Omland", "Manager Programme administration - Executive"),
+    ("Jørgen Bjørnson Aanderaa", "Director Learning Center"),
+    ("Line Lervik-Olsen", "Head of Department, Marketing"),
+    ("Eivind Furseth", "Head of Department, Accounting and Operations Management")
+]
+SECRETARIAT = [
+    ("Nora Iversen Røed", "Adviser"),
+    ("Haakon Tveter", "Senior Adviser")
+]
+
+# JSON bodies smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+
+# Largest page GET /tasks will return when the client asks for pagination
+TASKS_PAGE_MAX = 500
+# Query parameters task_list_query reads
+TASK_LIST_PARAMS = ('after', 'limit', 'fields', 'stage', 'completion_status')
+SEARCH_PAGE_MAX = 100
+# Rows per Supabase read while streaming /export/tasks
+EXPORT_PAGE_SIZE = int(os.environ.get("EXPORT_PAGE_SIZE", "1000"))
+COLUMN_NAME = re.compile(r'^[a-z_][a-z0-9_]*$')
+REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+TASK_VERSION_TAG = re.compile(r'^(?:W/)?"?(\d+)"?$')
 
 class CompletionStatus(Enum):
     IN_PROGRESS = 'In Progress'
@@ -50,49 +175,181 @@ class DateTimeEncoder(json.JSONEncoder):
             return o.isoformat()
         return super().default(o)
 
-def get_oauth_session():
-    client = BackendApplicationClient(client_id=NETTSKJEMA_CLIENT_ID)
-    oauth = OAuth2Session(client=client)
-    token = oauth.fetch_token(
-        token_url=NETTSKJEMA_AUTH_URL,
-        client_id=NETTSKJEMA_CLIENT_ID,
-        client_secret=NETTSKJEMA_CLIENT_SECRET
-    )
-    return oauth
+def get_nettskjema_data(form_id, after_submission_id=None, ordered=None):
+    """Stream the form's submissions, each as a list of answers.
 
-def get_nettskjema_data(form_id):
-    oauth = get_oauth_session()
-    response = oauth.get(f"{NETTSKJEMA_API_URL}/form/{form_id}/answers")
-    response.raise_for_status()
-    
-    submissions = {}
-    for line in response.iter_lines():
-        if line:
-            try:
-                answer = json.loads(line.decode('utf-8'))
-                submission_id = answer['submissionId']
-                if submission_id not in submissions:
-                    submissions[submission_id] = []
-                submissions[submission_id].append(answer)
-            except json.JSONDecodeError as e:
-                logging.error(f"Error decoding JSON line: {e}")
-                logging.error(f"Problematic line: {line}")
-    
-    return list(submissions.values())
+    The feed is read incrementally and submissions are yielded one at a time,
+    so memory stays flat however long the form's history is. Answers belonging
+    to submissions at or below ``after_submission_id`` are dropped as they
+    arrive.
+    """
+    if ordered is None:
+        ordered = NETTSKJEMA_ANSWERS_ORDERED
+    with nettskjema.get(f"form/{form_id}/answers", stream=True) as response:
+        answers = iter_answers(response.iter_lines(chunk_size=64 * 1024))
+        if after_submission_id is not None:
+            answers = (answer for answer in answers if answer['submissionId'] > after_submission_id)
+        yield from group_submissions(answers, ordered=ordered)
 
 def get_form_elements(form_id):
-    oauth = get_oauth_session()
-    response = oauth.get(f"{NETTSKJEMA_API_URL}/form/{form_id}/elements")
-    response.raise_for_status()
+    response = nettskjema.get(f"form/{form_id}/elements")
     elements = response.json()
     
-    # Create a mapping of element texts to their IDs
-    element_mapping = {element['text']: element['elementId'] for element in elements}
-    logging.info(f"Element mapping: {json.dumps(element_mapping, indent=2)}")
-    
+    logging.info("Fetched form elements", extra={'form_id': form_id, 'elements': len(elements)})
+    logging.debug("Element mapping: %s", LazyJson({element['text']: element['elementId'] for element in elements}))
+
     return elements
 
-def transform_submission_to_task(submission, element_mapping):
+def batched(iterable, size):
+    """Yield lists of up to ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def attachment_extension(content_disposition):
+    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', content_disposition or '')
+    return os.path.splitext(match.group(1))[1] if match else ''
+
+def transfer_attachment(task):
+    """Stream one submission's attachment from Nettskjema into storage.
+
+    Replaces ``task['attachment_url']`` with the public storage URL, or with
+    None if the transfer fails, and returns a report entry with the timing.
+    """
+    started = time.perf_counter()
+    report = {'submission_id': task['submission_id']}
+    try:
+        with nettskjema.get(task['attachment_url'], stream=True) as response:
+            file_name = f"{uuid.uuid4()}{attachment_extension(response.headers.get('Content-Disposition'))}"
+            length = response.headers.get('Content-Length')
+            report['bytes'] = attachments_bucket.upload(
+                file_name,
+                response.iter_content(CHUNK_SIZE),
+                content_type=response.headers.get('Content-Type'),
+                length=int(length) if length and 'Content-Encoding' not in response.headers else None
+            )
+        task['attachment_url'] = attachments_bucket.public_url(file_name)
+        logging.debug("Uploaded attachment: %s", task['attachment_url'])
+    except Exception as e:
+        logging.error(f"Error uploading attachment: {str(e)}")
+        task['attachment_url'] = None
+        report['error'] = str(e)
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+def transfer_attachments(tasks):
+    """Transfer the attachments of ``tasks`` concurrently; one failure doesn't affect the rest."""
+    pending = [task for task in tasks if task['attachment_url']]
+    if not pending:
+        return []
+    with ThreadPoolExecutor(max_workers=min(ATTACHMENT_CONCURRENCY, len(pending))) as pool:
+        # Each transfer runs in a copy of the request's context so its calls count towards it
+        futures = [pool.submit(copy_context().run, transfer_attachment, task) for task in pending]
+        return [future.result() for future in futures]
+
+def find_existing_submission_ids(submission_ids):
+    """Return which of ``submission_ids`` are already stored as tasks."""
+    response = supabase.table('tasks').select('submission_id').in_('submission_id', submission_ids).execute()
+    return {task['submission_id'] for task in response.data}
+
+def insert_imported_tasks(tasks, overwrite=False):
+    """Insert imported tasks in one bulk statement, skipping known submissions.
+
+    Duplicates are resolved by the database (ON CONFLICT (submission_id) DO
+    NOTHING), so only newly created rows come back; with ``overwrite`` they
+    are updated instead (DO UPDATE) and come back too. If the bulk statement
+    is rejected, the rows are retried one by one so the failure can be pinned
+    to its submission. Returns ``(inserted_rows, errors)``.
+    """
+    if not tasks:
+        return [], []
+    try:
+        response = supabase.table('tasks')\
+            .upsert(tasks, on_conflict='submission_id', ignore_duplicates=not overwrite)\
+            .execute()
+        logging.debug("Inserted %d of %d tasks, skipped %d duplicates", len(response.data), len(tasks), len(tasks) - len(response.data))
+        return response.data, []
+    except postgrest.exceptions.APIError as e:
+        logging.warning(f"Bulk insert of {len(tasks)} tasks failed, retrying row by row: {e.message}")
+
+    inserted, errors = [], []
+    for task in tasks:
+        try:
+            response = supabase.table('tasks')\
+                .upsert(task, on_conflict='submission_id', ignore_duplicates=not overwrite)\
+                .execute()
+            inserted.extend(response.data)
+        except Exception as e:
+            logging.error(f"Error inserting task into database: {str(e)}")
+            errors.append({'submission_id': task['submission_id'], 'error': str(e)})
+    return inserted, errors
+
+def get_import_high_water_mark(form_id):
+    """Return the highest submission id already imported from the form.
+
+    The mark is read from ``nettskjema_imports``; before the first incremental
+    import has recorded one it falls back to the newest submission in tasks.
+    """
+    try:
+        response = supabase.table('nettskjema_imports').select('last_submission_id').eq('form_id', str(form_id)).execute()
+        if response.data and response.data[0]['last_submission_id'] is not None:
+            return response.data[0]['last_submission_id']
+    except postgrest.exceptions.APIError as e:
+        logging.warning(f"Could not read import high-water mark: {e.message}")
+
+    response = supabase.table('tasks')\
+        .select('submission_id')\
+        .not_.is_('submission_id', 'null')\
+        .order('submission_id', desc=True)\
+        .limit(1)\
+        .execute()
+    return response.data[0]['submission_id'] if response.data else None
+
+def set_import_high_water_mark(form_id, submission_id):
+    supabase.table('nettskjema_imports').upsert({
+        'form_id': str(form_id),
+        'last_submission_id': submission_id,
+        'imported_at': datetime.now(timezone.utc).isoformat()
+    }, on_conflict='form_id', returning=ReturnMethod.minimal).execute()
+
+# Task field filled in by the answer to each Nettskjema question
+QUESTION_FIELDS = {
+    'Idea title': 'title',
+    'Idea Owner': 'owner',
+    'Briefly describe the idea:': 'description',
+    'Why is this relevant for BI?': 'relevance_for_bi',
+    'Why does individuals and/or organizations need such a course/idea?': 'need_for_course',
+    'What would be the relevant target group?': 'target_group',
+    'What are your thoughts on the future growth potential of the market for this course/idea?': 'growth_potential',
+    'Faculty resources – which academic departments should be involved?': 'faculty_resources'
+}
+
+def compile_element_mapper(form_elements):
+    """Build the elementId -> task field lookup used by transform_submission_to_task.
+
+    The result is cached per form schema, so it is only rebuilt when the
+    form's questions change.
+    """
+    schema = tuple((element['elementId'], element['text']) for element in form_elements)
+    return _compile_element_mapper(schema)
+
+@lru_cache(maxsize=8)
+def _compile_element_mapper(schema):
+    element_fields = {}
+    for element_id, text in schema:
+        field = QUESTION_FIELDS.get(text)
+        if field is not None:
+            # Answers normally carry integer ids; accept their string form too
+            element_fields[element_id] = field
+            element_fields[str(element_id)] = field
+    return element_fields
+
+def transform_submission_to_task(submission, element_fields):
+    """Turn one submission's answers into a task row.
+
+    ``element_fields`` comes from compile_element_mapper; every answer costs a
+    single dictionary lookup.
+    """
     task = {
         "submission_id": submission[0]['submissionId'],
         "title": "",
@@ -109,33 +366,289 @@ def transform_submission_to_task(submission, element_mapping):
     }
     
     for answer in submission:
-        element_id = str(answer.get('elementId'))
-        if element_id == str(element_mapping.get('Idea title')):
-            task['title'] = answer.get('textAnswer', '')
-        elif element_id == str(element_mapping.get('Idea Owner')):
-            task['owner'] = answer.get('textAnswer', '')
-        elif element_id == str(element_mapping.get('Briefly describe the idea:')):
-            task['description'] = answer.get('textAnswer', '')
-        elif element_id == str(element_mapping.get('Why is this relevant for BI?')):
-            task['relevance_for_bi'] = answer.get('textAnswer', '')
-        elif element_id == str(element_mapping.get('Why does individuals and/or organizations need such a course/idea?')):
-            task['need_for_course'] = answer.get('textAnswer', '')
-        elif element_id == str(element_mapping.get('What would be the relevant target group?')):
-            task['target_group'] = answer.get('textAnswer', '')
-        elif element_id == str(element_mapping.get('What are your thoughts on the future growth potential of the market for this course/idea?')):
-            task['growth_potential'] = answer.get('textAnswer', '')
-        elif element_id == str(element_mapping.get('Faculty resources – which academic departments should be involved?')):
-            task['faculty_resources'] = answer.get('textAnswer', '')
+        field = element_fields.get(answer.get('elementId'))
+        if field is not None:
+            task[field] = answer.get('textAnswer', '')
         elif answer.get('answerAttachmentId'):
-            task['attachment_url'] = f"https://api.nettskjema.no/v3/attachment/{answer.get('answerAttachmentId')}"
+            task['attachment_url'] = f"{NETTSKJEMA_API_URL}/attachment/{answer['answerAttachmentId']}"
     
     return task
 
+def negotiate_json(payload, accept_encodings, if_none_match):
+    """Pick the representation of ``payload`` to send: ``(body, etag, encoding)``.
+
+    ``body`` is None when If-None-Match already has it. Takes the parsed
+    Accept-Encoding and If-None-Match headers.
+    """
+    encoding = None
+    if len(payload.body) >= COMPRESS_MIN_SIZE:
+        offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+        encoding = accept_encodings.best_match(offers)
+    etag = f"{payload.etag}-{encoding}" if encoding else payload.etag
+    if if_none_match.contains(etag):
+        return None, etag, encoding
+    return payload.encoded(encoding) if encoding else payload.body, etag, encoding
+
+def json_response(payload, headers=None):
+    """Build a conditional, compressed 200 response for a cached JsonPayload.
+
+    A request whose If-None-Match matches the payload's ETag gets a 304 with
+    no body. Large bodies are sent br/gzip encoded when the client accepts it;
+    the encoding is part of the ETag so each representation validates on its own.
+    """
+    body, etag, encoding = negotiate_json(payload, request.accept_encodings, request.if_none_match)
+    if body is None:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.headers.update(headers or {})
+    return response
+
+def parse_task_columns(fields):
+    """Turn a ``?fields=`` value into a list of column names, or None for all."""
+    if not fields:
+        return None
+    columns = [column.strip() for column in fields.split(',') if column.strip()]
+    for column in columns:
+        if not COLUMN_NAME.match(column):
+            raise ValueError(f"Invalid field name: {column}")
+    return columns
+
+def task_list_query(client, args):
+    """Build the GET /tasks query for the query-string ``args`` on ``client``.
+
+    Returns ``(query, limit)``; raises ValueError for invalid parameters.
+    """
+    columns = parse_task_columns(args.get('fields'))
+    after = args.get('after')
+    after = int(after) if after is not None else None
+    limit = args.get('limit')
+    limit = min(int(limit), TASKS_PAGE_MAX) if limit is not None else None
+    if limit is not None and limit < 1:
+        raise ValueError('limit must be a positive integer')
+
+    paginated = after is not None or limit is not None
+    if columns and paginated and 'id' not in columns:
+        # The cursor is the task id, so it has to be part of the page
+        columns.append('id')
+
+    query = client.table('tasks').select(','.join(columns) if columns else '*')
+    for column in ('stage', 'completion_status'):
+        values = args.getlist(column)
+        if len(values) == 1:
+            query = query.eq(column, values[0])
+        elif values:
+            query = query.in_(column, values)
+    if paginated:
+        query = query.order('id')
+    if after is not None:
+        query = query.gt('id', after)
+    if limit is not None:
+        query = query.limit(limit)
+    return query, limit
+
+def task_list_cache_key(args):
+    # Only the parameters the query uses, so cache-busters and stray
+    # parameters don't each get an entry of their own
+    return ('tasks', tuple(sorted((name, value) for name, value in args.items(multi=True) if name in TASK_LIST_PARAMS)))
+
 @app.route('/tasks', methods=['GET'])
 def get_tasks():
-    response = supabase.table('tasks').select('*').execute()
-    tasks = response.data
-    return jsonify(tasks)
+    """List tasks, optionally paginated, projected and filtered.
+
+    Query parameters:
+        after: only return tasks with an id greater than this cursor
+        limit: page size (capped at TASKS_PAGE_MAX); enables pagination
+        fields: comma-separated columns to return, e.g. ``id,title,stage``
+        stage / completion_status: filter on these columns (repeatable)
+
+    Without ``limit`` every matching task is returned, as before. When a page
+    is full, the cursor for the next page is sent in the ``X-Next-Cursor``
+    header.
+    """
+    try:
+        query, limit = task_list_query(supabase, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    payload = read_cache.get_or_load(task_list_cache_key(request.args), lambda: JsonPayload(query.execute().data))
+    tasks = payload.data
+    headers = {}
+    if limit is not None and len(tasks) == limit:
+        headers['X-Next-Cursor'] = str(tasks[-1]['id'])
+    return json_response(payload, headers)
+
+def select_all(table, columns, page_size=1000):
+    """Yield every row of ``table``, read in keyset-paginated pages of ``page_size``."""
+    for rows in select_pages(table, columns, page_size):
+        yield from rows
+
+def select_pages(table, columns, page_size=1000):
+    after = 0
+    while True:
+        rows = supabase.table(table).select(columns).gt('id', after).order('id').limit(page_size).execute().data
+        yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]['id']
+
+def load_search_documents():
+    return select_all('tasks', ','.join(dict.fromkeys(RESULT_FIELDS + tuple(FIELD_WEIGHTS))))
+
+def create_search_index():
+    index = SearchIndex(load_search_documents, max_age=float(os.environ.get("SEARCH_INDEX_MAX_AGE", "3600")))
+    # Follow the change feed before the first load, so no write falls in between
+    event_log.listen(index.apply_event)
+    return index
+
+search_index = ProcessLocal(create_search_index)
+
+# Cached reads each change on the feed makes stale. The worker that handled
+# the write invalidates its own cache; the feed reaches all the others.
+CHANGE_INVALIDATES = {
+    'task.created': ('tasks',),
+    'task.updated': ('tasks', 'meetings'),
+    'task.deleted': ('tasks', 'meetings', 'task_meetings'),
+    'task.attachment_added': ('tasks', 'meetings'),
+    'tasks.imported': ('tasks', 'meetings'),
+    'meeting.created': ('meetings',),
+    'meeting.updated': ('meetings', 'task_meetings'),
+    'meeting.deleted': ('meetings', 'task_meetings'),
+    'meeting_task.added': ('meetings', 'task_meetings'),
+    'meeting_task.reordered': ('meetings',),
+    'meeting_task.removed': ('meetings', 'task_meetings'),
+    'reset': ('tasks', 'meetings', 'task_meetings'),
+}
+
+def create_read_cache():
+    cache = ReadCache(
+        ttl=float(os.environ.get("READ_CACHE_TTL", "30")),
+        maxsize=int(os.environ.get("READ_CACHE_SIZE", "256")),
+        max_bytes=int(os.environ.get("READ_CACHE_MAX_BYTES", str(64 * 1024 * 1024))) or None,
+    )
+    event_log.listen(lambda event_type, data: cache.invalidate(*CHANGE_INVALIDATES.get(event_type, ())))
+    return cache
+
+# Read cache for task and meeting listings, invalidated by this worker's
+# writes and by the change feed
+read_cache = ProcessLocal(create_read_cache)
+
+def load_pipeline_data():
+    return (
+        select_all('tasks', 'id,stage,completion_status'),
+        list(select_all('meetings', 'id,date')),
+        select_all('meeting_tasks', 'id,meeting_id,task_id,stage_at_meeting'),
+    )
+
+def create_pipeline_analytics():
+    analytics = PipelineAnalytics(load_pipeline_data, max_age=float(os.environ.get("ANALYTICS_MAX_AGE", "3600")))
+    event_log.listen(analytics.apply_event)
+    return analytics
+
+pipeline_analytics = ProcessLocal(create_pipeline_analytics)
+
+def warm_indexes():
+    """Build this worker's search index and analytics ahead of their first use."""
+    for index in (search_index, pipeline_analytics):
+        try:
+            index.get().ensure_fresh()
+        except Exception as e:
+            logging.error(f"Could not build {type(index.get()).__name__}: {str(e)}")
+
+@app.route('/tasks/search', methods=['GET'])
+def search_tasks():
+    """Ranked full-text search over the tasks' free-text fields.
+
+    Query parameters:
+        q: search terms; tasks matching any of them are ranked with BM25
+        limit / offset: page of results (limit capped at SEARCH_PAGE_MAX)
+        stage / completion_status: filter on these columns (repeatable)
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing search query (q)'}), 400
+    try:
+        limit = min(int(request.args.get('limit', 20)), SEARCH_PAGE_MAX)
+        offset = int(request.args.get('offset', 0))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({'error': 'limit must be positive and offset not negative'}), 400
+    where = {
+        column: set(request.args.getlist(column))
+        for column in ('stage', 'completion_status') if request.args.getlist(column)
+    }
+
+    index = search_index.get()
+    index.ensure_fresh()
+    total, results = index.search(query, limit=limit, offset=offset, where=where)
+    return jsonify({'query': query, 'total': total, 'offset': offset, 'results': results}), 200
+
+@app.route('/analytics', methods=['GET'])
+def get_analytics():
+    """Pipeline summary: tasks per stage and status, approval rate, stage
+    funnel, time spent in each stage and days between a task's meetings.
+
+    Times come from the meetings a task was on and its stage_at_meeting
+    there; a stage's time runs from the first meeting in that stage to the
+    first meeting in the next one, so the current stage isn't counted yet.
+    """
+    analytics = pipeline_analytics.get()
+    analytics.ensure_fresh()
+    return jsonify(analytics.summary()), 200
+
+def export_rows(table, columns, shape):
+    for rows in select_pages(table, columns, EXPORT_PAGE_SIZE):
+        yield from map(shape, rows)
+        del rows
+        # An httpx response and its stream refer to each other, so a page's
+        # body is only freed by the cycle collector, which may not run for
+        # many pages; collecting here keeps an export to one page in memory
+        gc.collect()
+
+def task_export_rows():
+    return export_rows('tasks', TASK_EXPORT_SELECT, task_export_row)
+
+def history_export_rows():
+    return export_rows('meeting_tasks', HISTORY_EXPORT_SELECT, history_export_row)
+
+@app.route('/export/tasks', methods=['GET'])
+def export_tasks():
+    """Download every task, or the meeting history, as a streamed CSV or XLSX file.
+
+    Query parameters:
+        format: ``csv`` (default) or ``xlsx``
+        history: with csv, export one row per task per meeting instead of
+            the tasks; the xlsx workbook always has both, on two sheets
+
+    Rows are read from Supabase EXPORT_PAGE_SIZE at a time and written out
+    as they arrive, so memory use doesn't grow with the size of the board.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    history = request.args.get('history', 'false').lower() in ('1', 'true', 'yes')
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d')
+    if export_format == 'csv':
+        if history:
+            chunks = csv_chunks(HISTORY_COLUMNS, history_export_rows())
+            filename = f'innovation_board_meeting_history_{stamp}.csv'
+        else:
+            chunks = csv_chunks(TASK_COLUMNS, task_export_rows())
+            filename = f'innovation_board_tasks_{stamp}.csv'
+        mimetype = 'text/csv'
+    elif export_format == 'xlsx':
+        chunks = xlsx_chunks([
+            ('Tasks', TASK_COLUMNS, task_export_rows()),
+            ('Meeting history', HISTORY_COLUMNS, history_export_rows()),
+        ])
+        filename = f'innovation_board_tasks_{stamp}.xlsx'
+        mimetype = XLSX_MIMETYPE
+    else:
+        return jsonify({'error': 'format must be csv or xlsx'}), 400
+    return Response(chunks, mimetype=mimetype, headers={'Content-Disposition': f'attachment; filename={filename}'})
 
 @app.route('/tasks', methods=['POST'])
 def add_task():
@@ -144,64 +657,146 @@ def add_task():
         del new_task['id']  # Remove the id if it's present
     new_task['completion_status'] = CompletionStatus.IN_PROGRESS.value
     response = supabase.table('tasks').insert(new_task).execute()
+    read_cache.invalidate('tasks')
+    publish_change('task.created', response.data[0])
     return jsonify(response.data[0]), 201
 
+def expected_task_version(data, if_match):
+    """The task version the client last read, from If-Match or a ``version`` field.
+
+    Raises ValueError when the one given can't be parsed.
+    """
+    if if_match and if_match.strip() != '*':
+        match = TASK_VERSION_TAG.match(if_match.strip())
+        if not match:
+            raise ValueError('If-Match must be the ETag of a task version')
+        return int(match.group(1))
+    version = data.get('version')
+    if version is None:
+        return None
+    try:
+        if isinstance(version, bool):
+            raise ValueError
+        return int(version)
+    except (TypeError, ValueError):
+        raise ValueError('version must be an integer') from None
+
+def update_task_columns(task_id, changes, version=None):
+    """Write ``changes`` to a task in one call and return ``(row, status)``.
+
+    With ``version`` the write only applies if the task is still at that
+    version. When nothing was updated a second read tells a missing task
+    (404) from a conflicting edit (409, with the current version).
+    """
+    response = task_update_query(supabase, task_id, changes, version).execute()
+    if response.data:
+        return task_updated(response.data[0])
+    return task_not_updated(supabase.table('tasks').select('version').eq('id', task_id).execute().data)
+
+def task_update_query(client, task_id, changes, version=None):
+    query = client.table('tasks').update(changes).eq('id', task_id)
+    if version is not None:
+        query = query.eq('version', version)
+    return query
+
+def task_updated(row):
+    read_cache.invalidate('tasks', 'meetings')
+    publish_change('task.updated', row)
+    return row, 200
+
+def task_not_updated(current_rows):
+    if not current_rows:
+        return None, 404
+    return current_rows[0], 409
+
+def publish_change(event_type, data):
+    # The change is already stored; a feed hiccup must not fail the request
+    try:
+        event_log.publish(event_type, data)
+    except Exception as e:
+        logging.error(f"Could not publish {event_type} event: {str(e)}")
+
+def task_update_body(row, status):
+    """``(body, headers)`` of the response to a task update."""
+    if status == 404:
+        return {'error': 'Task not found'}, {}
+    if status == 409:
+        return {'error': 'Task was changed by someone else', 'version': row['version']}, {}
+    return row, {'ETag': f'"{row["version"]}"'}
+
+def task_update_response(row, status):
+    body, headers = task_update_body(row, status)
+    return jsonify(body), status, headers
+
+def task_changes(data):
+    """The columns a task update body sets."""
+    changes = {column: value for column, value in data.items() if column not in ('id', 'version')}
+    # If the stage is being updated to 'Completed', update completion_status
+    if changes.get('stage') == 'Completed':
+        changes['completion_status'] = CompletionStatus.COMPLETED_APPROVED.value
+    return changes
+
 @app.route('/tasks/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
+    """Update the columns present in the body; other columns are left alone.
+
+    Send the task's ``version`` (or If-Match with the ETag of a previous
+    update) to have the write rejected with 409 if the task changed since.
+    """
     updated_data = request.json
     try:
-        # Get the current task data
-        current_task = supabase.table('tasks').select('*').eq('id', task_id).execute()
-        if not current_task.data:
-            return jsonify({'error': 'Task not found'}), 404
-        
-        # Merge the updated data with the current task data
-        task_data = current_task.data[0]
-        task_data.update(updated_data)
-        
-        # If the stage is being updated to 'Completed', update completion_status
-        if 'stage' in updated_data and updated_data['stage'] == 'Completed':
-            task_data['completion_status'] = CompletionStatus.COMPLETED_APPROVED.value
-        
-        # Update the task
-        response = supabase.table('tasks').update(task_data).eq('id', task_id).execute()
-        if response.data:
-            return jsonify(response.data[0]), 200
-        else:
-            return jsonify({'error': 'Failed to update task'}), 500
+        version = expected_task_version(updated_data, request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        changes = task_changes(updated_data)
+        if not changes:
+            return jsonify({'error': 'No fields to update'}), 400
+
+        return task_update_response(*update_task_columns(task_id, changes, version))
     except Exception as e:
-        print(f"Error updating task: {str(e)}")
+        logging.error(f"Error updating task: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/tasks/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
     supabase.table('tasks').delete().eq('id', task_id).execute()
+    read_cache.invalidate('tasks', 'meetings', ('task_meetings', task_id))
+    publish_change('task.deleted', {'id': task_id})
     return '', 204
 
 @app.route('/meetings', methods=['GET'])
 def get_meetings():
-    response = supabase.table('meetings').select('*').execute()
-    meetings = response.data
-    
+    payload = read_cache.get_or_load(('meetings',), lambda: JsonPayload(load_meetings()))
+    return json_response(payload)
+
+def load_meetings():
+    return shape_meetings(meetings_query(supabase).execute().data)
+
+def meetings_query(client):
+    # Fetch all meetings together with their tasks (and the stage each task had
+    # at the meeting) in one embedded select instead of one query per meeting
+    return client.table('meetings').select('*, meeting_tasks(task_id, task_order, stage_at_meeting, tasks(*))')
+
+def shape_meetings(meetings):
     for meeting in meetings:
-        # Fetch tasks for this meeting, including the stage_at_meeting
-        tasks_response = supabase.table('meeting_tasks')\
-            .select('task_id, stage_at_meeting, tasks(*)')\
-            .eq('meeting_id', meeting['id'])\
-            .execute()
-        
         meeting['tasks'] = []
-        for item in tasks_response.data:
+        items = meeting.pop('meeting_tasks', None) or []
+        # List each meeting's tasks in agenda order
+        items.sort(key=lambda item: (item['task_order'] is None, item['task_order'] or 0))
+        for item in items:
             task = item['tasks']
+            if task is None:
+                continue
             task['stage_at_meeting'] = item['stage_at_meeting']
             meeting['tasks'].append(task)
-    
-    return jsonify(meetings), 200
+
+    return meetings
 
 @app.route('/meetings', methods=['POST'])
 def add_meeting():
     new_meeting = request.json
-    print("Received meeting data:", new_meeting)
+    logging.debug("Received meeting data: %s", LazyJson(new_meeting))
 
     meeting_data = {
         'number': new_meeting.get('number'),
@@ -222,11 +817,13 @@ def add_meeting():
             return jsonify({'error': 'Invalid date format. Please use ISO format (YYYY-MM-DDTHH:MM:SS.sssZ)'}), 400
 
     try:
-        print("Inserting meeting data:", meeting_data)
+        logging.debug("Inserting meeting data: %s", LazyJson(meeting_data))
         response = supabase.table('meetings').insert(meeting_data).execute()
-        print("Supabase response:", response)
+        read_cache.invalidate('meetings')
+        logging.debug("Inserted meeting: %s", LazyJson(response.data))
         if response.data:
             new_meeting = response.data[0]
+            publish_change('meeting.created', new_meeting)
             return_data = {
                 'id': new_meeting['id'],
                 'number': new_meeting['number'],
@@ -237,85 +834,151 @@ def add_meeting():
         else:
             return jsonify({'error': 'Failed to create meeting'}), 500
     except Exception as e:
-        print("Error:", str(e))
+        logging.error(f"Error creating meeting: {str(e)}")
         return jsonify({'error': str(e)}), 400
     
 @app.route('/meetings/<int:meeting_id>', methods=['PUT'])
 def update_meeting(meeting_id):
     updated_data = request.json
     response = supabase.table('meetings').update(updated_data).eq('id', meeting_id).execute()
+    read_cache.invalidate('meetings', 'task_meetings')
+    publish_change('meeting.updated', response.data[0])
     return jsonify(response.data[0])
 
 @app.route('/meetings/<int:meeting_id>', methods=['DELETE'])
 def delete_meeting(meeting_id):
     supabase.table('meetings').delete().eq('id', meeting_id).execute()
+    read_cache.invalidate('meetings', 'task_meetings')
+    publish_change('meeting.deleted', {'id': meeting_id})
     return '', 204
 
 @app.route('/meetings/<int:meeting_id>/tasks', methods=['POST'])
 def add_task_to_meeting(meeting_id):
-    data = request.json
-    task_id = data['task_id']
-    
-    # Fetch the meeting
-    meeting_response = supabase.table('meetings').select('*').eq('id', meeting_id).execute()
-    if not meeting_response.data:
-        return jsonify({"error": "Meeting not found"}), 404
-    meeting = meeting_response.data[0]
-    
-    # Fetch the task
-    task_response = supabase.table('tasks').select('*').eq('id', task_id).execute()
-    if not task_response.data:
-        return jsonify({"error": "Task not found"}), 404
-    task = task_response.data[0]
-    
-    if not meeting.get('is_completed', False):
-        # Get the current number of tasks in the meeting
-        current_tasks_response = supabase.table('meeting_tasks').select('task_id').eq('meeting_id', meeting_id).execute()
-        new_order = len(current_tasks_response.data) + 1
-        
-        # Add the task to the meeting, including the current stage
-        meeting_task_data = {
-            'meeting_id': meeting_id,
-            'task_id': task_id,
-            'task_order': new_order,
-            'stage_at_meeting': task['stage']  # Store the current stage of the task
-        }
-        supabase.table('meeting_tasks').insert(meeting_task_data).execute()
-        
-        return jsonify({"message": "Task added to meeting", "stage_at_meeting": task['stage']}), 201
-    else:
-        return jsonify({"error": "Cannot add tasks to a completed meeting"}), 400
+    """Add one task (``task_id``) or several (``task_ids``) to the agenda.
+
+    The add_tasks_to_meeting function does everything in one call and one
+    transaction: it numbers the tasks after the agenda's current last item,
+    in the order given, and stores each task's current stage with it. Tasks
+    already on the agenda are skipped.
+    """
+    task_ids = meeting_task_ids(request.json)
+    if task_ids is None:
+        return jsonify({"error": "task_ids must be a non-empty list of task ids"}), 400
+    result = supabase.rpc('add_tasks_to_meeting', {'meeting_id': meeting_id, 'task_ids': task_ids}).execute().data
+    body, status = meeting_tasks_added(result, task_ids, bulk='task_ids' in request.json)
+    return jsonify(body), status
+
+def meeting_task_ids(data):
+    """The task ids of an add-to-meeting body, or None if they are invalid."""
+    if not isinstance(data, dict):
+        return None
+    task_ids = data['task_ids'] if 'task_ids' in data else [data.get('task_id')]
+    if not isinstance(task_ids, list) or not task_ids or not all(is_task_id(task_id) for task_id in task_ids):
+        return None
+    return task_ids
+
+def is_task_id(value):
+    # JSON true/false arrive as bools, which are ints to isinstance
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def meeting_tasks_added(result, task_ids, bulk):
+    """Act on the add_tasks_to_meeting result; returns ``(body, status)``."""
+    status = result['status']
+    if status == 'meeting_not_found':
+        return {"error": "Meeting not found"}, 404
+    if status == 'meeting_completed':
+        return {"error": "Cannot add tasks to a completed meeting"}, 400
+    if status == 'tasks_not_found':
+        return {"error": "Task not found", "task_ids": result['task_ids']}, 404
+
+    added = result['added']
+    if added:
+        read_cache.invalidate('meetings', *(('task_meetings', row['task_id']) for row in added))
+        for row in added:
+            publish_change('meeting_task.added', row)
+    added_ids = {row['task_id'] for row in added}
+    skipped = [task_id for task_id in dict.fromkeys(task_ids) if task_id not in added_ids]
+
+    if not bulk:
+        if not added:
+            return {"error": "Task is already in the meeting"}, 409
+        return {"message": "Task added to meeting", "stage_at_meeting": added[0]['stage_at_meeting']}, 201
+    return {"message": f"Added {len(added)} tasks to meeting", "added": added, "skipped": skipped}, 201
     
 @app.route('/meetings/<int:meeting_id>/complete', methods=['PUT'])
 def complete_meeting(meeting_id):
     response = supabase.table('meetings').update({'is_completed': True}).eq('id', meeting_id).execute()
+    read_cache.invalidate('meetings')
     if response.data:
+        publish_change('meeting.updated', response.data[0])
         return jsonify({"message": "Meeting marked as completed"}), 200
     else:
         return jsonify({"error": "Meeting not found"}), 404
 
 @app.route('/meetings/<int:meeting_id>/reorder', methods=['PUT'])
 def reorder_meeting_tasks(meeting_id):
+    """Apply a new agenda order in one bulk upsert.
+
+    Body: ``{"new_order": [task ids], "diff": false}``, where ``new_order``
+    lists every task on the agenda exactly once. With ``diff`` set, only the
+    rows whose position actually changed are written.
+    """
     data = request.json
-    new_order = data['new_order']  # List of task IDs in the new order
-    
-    meeting_response = supabase.table('meetings').select('*').eq('id', meeting_id).execute()
+    new_order = data.get('new_order') if isinstance(data, dict) else None  # List of task IDs in the new order
+    if not isinstance(new_order, list) or not all(is_task_id(task_id) for task_id in new_order):
+        return jsonify({"error": "new_order must be a list of task ids"}), 400
+    if len(set(new_order)) != len(new_order):
+        return jsonify({"error": "new_order lists a task more than once"}), 400
+    diff = bool(data.get('diff', False))
+
+    # One read gives us both the meeting state and the current agenda positions
+    meeting_response = supabase.table('meetings')\
+        .select('is_completed, meeting_tasks(task_id, task_order, stage_at_meeting)')\
+        .eq('id', meeting_id)\
+        .execute()
     if not meeting_response.data:
         return jsonify({"error": "Meeting not found"}), 404
     meeting = meeting_response.data[0]
-    
-    if not meeting.get('is_completed', False):
-        for index, task_id in enumerate(new_order, start=1):
-            # Update the order in meeting_tasks
-            supabase.table('meeting_tasks').update({'order': index}).eq('meeting_id', meeting_id).eq('task_id', task_id).execute()
-        
-        return jsonify({"message": "Tasks reordered successfully"}), 200
-    else:
+
+    if meeting.get('is_completed', False):
         return jsonify({"error": "Cannot reorder tasks in a completed meeting"}), 400
 
+    current = {item['task_id']: item for item in meeting.get('meeting_tasks') or []}
+    unknown = [task_id for task_id in new_order if task_id not in current]
+    if unknown:
+        return jsonify({"error": f"Tasks not in meeting: {unknown}"}), 400
+    # Positions of tasks left out would collide with the new ones
+    missing = sorted(current.keys() - set(new_order))
+    if missing:
+        return jsonify({"error": f"new_order is missing tasks in the meeting: {missing}"}), 400
+
+    rows = [
+        {
+            'meeting_id': meeting_id,
+            'task_id': task_id,
+            'task_order': index,
+            'stage_at_meeting': current[task_id]['stage_at_meeting']
+        }
+        for index, task_id in enumerate(new_order, start=1)
+        if not diff or current[task_id].get('task_order') != index
+    ]
+
+    if rows:
+        # Rows always exist, so the upsert only ever takes the update path;
+        # stage_at_meeting is sent along to satisfy the insert side's constraints
+        supabase.table('meeting_tasks')\
+            .upsert(rows, on_conflict='meeting_id,task_id', returning=ReturnMethod.minimal)\
+            .execute()
+        read_cache.invalidate('meetings')
+        publish_change('meeting_task.reordered', {'meeting_id': meeting_id, 'new_order': new_order})
+
+    return jsonify({"message": "Tasks reordered successfully", "updated": len(rows)}), 200
+
 @app.route('/meetings/<int:meeting_id>/tasks/<int:task_id>', methods=['DELETE'])
 def remove_task_from_meeting(meeting_id, task_id):
     supabase.table('meeting_tasks').delete().eq('meeting_id', meeting_id).eq('task_id', task_id).execute()
+    read_cache.invalidate('meetings', ('task_meetings', task_id))
+    publish_change('meeting_task.removed', {'meeting_id': meeting_id, 'task_id': task_id})
     return '', 204
 
 @app.route('/meetings/<int:meeting_id>/tasks/<int:task_id>', methods=['PUT'])
@@ -323,81 +986,139 @@ def update_meeting_task(meeting_id, task_id):
     data = request.json
     if 'minutes' in data:
         response = supabase.table('meeting_tasks').update({'minutes': data['minutes']}).eq('meeting_id', meeting_id).eq('task_id', task_id).execute()
+        if response.data:
+            publish_change('meeting_task.updated', response.data[0])
     return jsonify(response.data[0]), 200
 
+def load_meeting_document_data(meeting_id):
+    """Fetch a meeting and its agenda items (in agenda order) in one query.
+
+    Returns ``(meeting, tasks)``, where each item of ``tasks`` has the task
+    under ``'tasks'`` plus its ``stage_at_meeting`` and ``minutes``, or
+    ``(None, None)`` when the meeting does not exist.
+    """
+    return shape_meeting_document(meeting_document_query(supabase, meeting_id).execute().data)
+
+def meeting_document_query(client, meeting_id):
+    return client.table('meetings')\
+        .select('*, meeting_tasks(task_order, stage_at_meeting, minutes, tasks(*))')\
+        .eq('id', meeting_id)
+
+def shape_meeting_document(rows):
+    if not rows:
+        return None, None
+    meeting = rows[0]
+    tasks = [item for item in meeting.pop('meeting_tasks', None) or [] if item['tasks'] is not None]
+    tasks.sort(key=lambda item: (item['task_order'] is None, item['task_order'] or 0))
+    return meeting, tasks
+
+def document_job_id(kind, meeting, tasks):
+    """Artifact id for a meeting document: changes whenever its content would."""
+    content = json.dumps([DOCUMENT_RENDERER_VERSION, kind, meeting, tasks], sort_keys=True, default=str)
+    return f"{kind}-{meeting['id']}-{hashlib.sha256(content.encode('utf-8')).hexdigest()[:24]}"
+
+@lru_cache(maxsize=1)
+def get_docx_template():
+    """The .docx template documents are rendered into, parsed on first use."""
+    return DocxTemplate(os.environ.get("DOCX_TEMPLATE_PATH") or default_template_path())
+
+def render_document(kind, meeting, tasks):
+    """Return a callable that yields the ``kind`` document as byte chunks."""
+    template = get_docx_template()
+    if kind == 'report':
+        # 2.54 cm margins
+        return lambda: template.render(report_blocks(template, meeting, tasks), margin_twips=1440)
+    return lambda: template.render(minutes_blocks(template, meeting, tasks))
+
+def document_download_name(kind, meeting_id):
+    return 'innovation_board_sakspapirer.docx' if kind == 'report' else f'meeting_{meeting_id}_minutes.docx'
+
+def send_document(kind, meeting_id, path):
+    return send_file(path, as_attachment=True, download_name=document_download_name(kind, meeting_id), mimetype=DOCX_MIMETYPE)
+
+def generate_document(kind, meeting_id):
+    """Serve the rendered document from the artifact cache, or stream it while caching it."""
+    meeting, tasks = load_meeting_document_data(meeting_id)
+    if meeting is None:
+        return jsonify({'error': 'Meeting not found'}), 404
+    job_id = document_job_id(kind, meeting, tasks)
+    if document_jobs.exists(job_id):
+        return send_document(kind, meeting_id, document_jobs.path(job_id))
+    return Response(
+        document_jobs.stream(job_id, render_document(kind, meeting, tasks)),
+        mimetype=DOCX_MIMETYPE,
+        headers={'Content-Disposition': f'attachment; filename={document_download_name(kind, meeting_id)}'}
+    )
+
 @app.route('/meetings/<int:meeting_id>/generate_report', methods=['GET'])
 def generate_report(meeting_id):
-    meeting_response = supabase.table('meetings').select('*').eq('id', meeting_id).execute()
-    if not meeting_response.data:
+    return generate_document('report', meeting_id)
+
+@app.route('/meetings/<int:meeting_id>/documents/<kind>', methods=['POST'])
+def queue_meeting_document(meeting_id, kind):
+    """Start rendering the meeting's ``report`` or ``minutes`` in the background.
+
+    Responds 202 with a job id to poll at GET /jobs/<job_id>, or 200 when the
+    document for the meeting's current content has already been rendered.
+    """
+    if kind not in ('report', 'minutes'):
+        return jsonify({'error': 'Unknown document kind'}), 404
+    meeting, tasks = load_meeting_document_data(meeting_id)
+    if meeting is None:
         return jsonify({'error': 'Meeting not found'}), 404
-    
-    meeting = meeting_response.data[0]
-    
-    # Update this query to include stage_at_meeting
-    tasks_response = supabase.table('meeting_tasks').select('tasks(*), stage_at_meeting').eq('meeting_id', meeting_id).execute()
-    tasks = tasks_response.data
+    job_id = document_job_id(kind, meeting, tasks)
+    job = document_jobs.submit(job_id, render_document(kind, meeting, tasks))
+    job['result_url'] = f"/jobs/{job_id}/result"
+    return jsonify(job), 200 if job['status'] == 'done' else 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = document_jobs.status(job_id) if DOCUMENT_JOB_ID.match(job_id) else None
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    job['result_url'] = f"/jobs/{job_id}/result"
+    return jsonify(job), 200
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    match = DOCUMENT_JOB_ID.match(job_id)
+    if not match or not document_jobs.exists(job_id):
+        job = document_jobs.status(job_id) if match else None
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job), 500 if job['status'] == 'failed' else 409
+    return send_document(match.group('kind'), int(match.group('meeting_id')), document_jobs.path(job_id))
+
+def report_blocks(template, meeting, tasks):
+    """Body paragraphs of the board papers: front page, agenda, one page per item."""
+    yield template.paragraph("Innovation Board Executive", bold=True, size=14, center=True)
 
-    document = Document()
-    
-    sections = document.sections
-    for section in sections:
-        section.top_margin = Cm(2.54)
-        section.bottom_margin = Cm(2.54)
-        section.left_margin = Cm(2.54)
-        section.right_margin = Cm(2.54)
-
-    title = document.add_paragraph("Innovation Board Executive")
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title_run = title.runs[0]
-    title_run.bold = True
-    title_run.font.size = Pt(14)
-
-    meeting_date = meeting['date']
     details = [
         ("Place", "A4Y-117"),
-        ("Date and time", meeting_date)
+        ("Date and time", meeting['date'])
     ]
     for key, value in details:
-        p = document.add_paragraph()
-        p.add_run(f"{key}\n").bold = True
-        p.add_run(value)
-
-    members = [
-        ("Lars Olsen", "Dean Executive"),
-        ("Cecilie Asting", "Associate Dean Bachelor of Management"),
-        ("Geir Høidal Bjønnes", "Associate Dean Master of Management"),
-        ("Lise Hammergren", "Executive Vice President, BI Executive"),
-        ("Gry Varre", "Manager Open Enrolment"),
-        ("Wenche Martinussen", "Director Sales/Marketing"),
-        ("Tonje Omland", "Manager Programme administration - Executive"),
-        ("Jørgen Bjørnson Aanderaa", "Director Learning Center"),
-        ("Line Lervik-Olsen", "Head of Department, Marketing"),
-        ("Eivind Furseth", "Head of Department, Accounting and Operations Management")
-    ]
-    
-    document.add_paragraph("Members", style='Heading 1')
-    for name, title in members:
-        document.add_paragraph(f"{name} {title}")
-
-    document.add_paragraph("Programme Administration / Secretariat", style='Heading 1')
-    secretariat = [
-        ("Nora Iversen Røed", "Adviser"),
-        ("Haakon Tveter", "Senior Adviser")
-    ]
-    for name, title in secretariat:
-        document.add_paragraph(f"{name} {title}")
+        yield template.paragraph_runs([(f"{key}\n", True), (value, False)])
+
+    yield template.paragraph("Members", style='Heading 1')
+    for name, title in BOARD_MEMBERS:
+        yield template.paragraph(f"{name} {title}")
 
-    document.add_page_break()
+    yield template.paragraph("Programme Administration / Secretariat", style='Heading 1')
+    for name, title in SECRETARIAT:
+        yield template.paragraph(f"{name} {title}")
 
-    document.add_paragraph("Agenda", style='Heading 1')
+    yield PAGE_BREAK
+
+    yield template.paragraph("Agenda", style='Heading 1')
     for index, task in enumerate(tasks, start=1):
-        document.add_paragraph(f"{task['tasks']['casenumber']} {task['tasks']['title']} page {index}")
+        yield template.paragraph(f"{task['tasks']['casenumber']} {task['tasks']['title']} page {index}")
 
     for task in tasks:
-        document.add_page_break()
+        yield PAGE_BREAK
+
+        yield template.paragraph("Proposal – New course idea", style='Heading 2')
 
-        document.add_paragraph("Proposal – New course idea", style='Heading 2')
-        
         headings = [
             ("Item number", task['tasks']['casenumber']),
             ("Idea title", task['tasks']['title']),
@@ -414,58 +1135,60 @@ def generate_report(meeting_id):
         ]
 
         for heading, content in headings:
-            document.add_paragraph(heading, style='Heading 3')
-            document.add_paragraph(content)
-
-    f = BytesIO()
-    document.save(f)
-    f.seek(0)
-
-    return send_file(f, as_attachment=True, download_name='innovation_board_sakspapirer.docx', mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+            yield template.paragraph(heading, style='Heading 3')
+            yield template.paragraph(content)
 
 @app.route('/tasks/<int:task_id>/upload', methods=['POST'])
 def upload_file(task_id):
-    if 'file' not in request.files:
+    """Attach an uploaded file to a task.
+
+    Files are stored under the SHA-256 of their content, so a file attached
+    to several tasks is uploaded and stored once. The attachment is appended
+    to the task's list in a single database call.
+    """
+    try:
+        files = request.files
+    except UploadTooLarge:
+        return jsonify({'error': f'File is larger than {MAX_UPLOAD_SIZE} bytes'}), 413
+    if 'file' not in files:
         return jsonify({'error': 'No file part'}), 400
-    file = request.files['file']
+    file = files['file']
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
     if file:
         original_filename = file.filename
         filename = secure_filename(original_filename)
-        file_extension = os.path.splitext(filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        
+        file_extension = os.path.splitext(filename)[1].lower()
+        spool = file.stream
+        digest = spool.sha256.hexdigest()
+        object_name = f"{digest}{file_extension}"
+
         try:
-            # Upload to Supabase Storage
-            file_content = file.read()
-            upload_response = supabase.storage.from_('task-attachments').upload(unique_filename, file_content)
-            
-            # Get public URL
-            public_url = supabase.storage.from_('task-attachments').get_public_url(unique_filename)
-            
-            # Create attachment object
+            # Upload to Supabase Storage unless the same content is already there
+            deduplicated = attachments_bucket.exists(object_name)
+            if not deduplicated:
+                # Same name means same bytes, so overwriting a concurrent upload is harmless
+                attachments_bucket.upload(object_name, spool.chunks(), content_type=file.mimetype or None,
+                                          length=spool.size, upsert=True)
+
             new_attachment = {
-                'url': public_url,
-                'filename': original_filename
+                'url': attachments_bucket.public_url(object_name),
+                'filename': original_filename,
+                'sha256': digest,
+                'size': spool.size
             }
-            
-            # Fetch current task data
-            task_response = supabase.table('tasks').select('attachments').eq('id', task_id).execute()
-            if task_response.data:
-                current_attachments = task_response.data[0].get('attachments', []) or []
-            else:
-                current_attachments = []
-            
-            # Append new attachment
-            updated_attachments = current_attachments + [new_attachment]
-            
-            # Update task with new attachments
-            update_response = supabase.table('tasks').update({'attachments': updated_attachments}).eq('id', task_id).execute()
-            
+
+            response = supabase.rpc('append_task_attachment', {'task_id': task_id, 'attachment': new_attachment}).execute()
+            # NULL (no such task) comes back as an empty result
+            if not response.data:
+                return jsonify({'error': 'Task not found'}), 404
+            read_cache.invalidate('tasks', 'meetings')
+            publish_change('task.attachment_added', {'id': task_id, 'attachment': new_attachment})
+
             return jsonify({
                 'message': 'File uploaded successfully',
-                'attachment': new_attachment
+                'attachment': new_attachment,
+                'deduplicated': deduplicated
             }), 200
         except Exception as e:
             logging.error(f"Error uploading file: {str(e)}")
@@ -473,117 +1196,153 @@ def upload_file(task_id):
 
 @app.route('/meetings/<int:meeting_id>/generate_minutes', methods=['GET'])
 def generate_minutes(meeting_id):
-    meeting_response = supabase.table('meetings').select('*').eq('id', meeting_id).execute()
-    if not meeting_response.data:
-        return jsonify({'error': 'Meeting not found'}), 404
-    
-    meeting = meeting_response.data[0]
-    
-    tasks_response = supabase.table('meeting_tasks').select('tasks(*), minutes, stage_at_meeting').eq('meeting_id', meeting_id).execute()
-    tasks = tasks_response.data
-
-    document = Document()
-    
-    title = document.add_paragraph(f"Møtereferat for møte {meeting['number']}")
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title.runs[0].bold = True
-    title.runs[0].font.size = Pt(14)
+    return generate_document('minutes', meeting_id)
 
-    date_paragraph = document.add_paragraph(f"Dato: {meeting['date']}")
-    date_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+def minutes_blocks(template, meeting, tasks):
+    """Body paragraphs of the minutes: a heading and the minutes of each agenda item."""
+    yield template.paragraph(f"Møtereferat for møte {meeting['number']}", bold=True, size=14, center=True)
+    yield template.paragraph(f"Dato: {meeting['date']}", center=True)
 
     for task in tasks:
-        item_title = document.add_paragraph(f"{task['tasks']['casenumber']} - {task['tasks']['title']}")
-        item_title.runs[0].bold = True
-        
-        document.add_paragraph(f"Stage at meeting: {task['stage_at_meeting']}")
-        document.add_paragraph(f"Current stage: {task['tasks']['stage']}")
-        document.add_paragraph(f"Completion status: {task['tasks']['completion_status']}")
-        
+        yield template.paragraph(f"{task['tasks']['casenumber']} - {task['tasks']['title']}", bold=True)
+
+        yield template.paragraph(f"Stage at meeting: {task['stage_at_meeting']}")
+        yield template.paragraph(f"Current stage: {task['tasks']['stage']}")
+        yield template.paragraph(f"Completion status: {task['tasks']['completion_status']}")
+
         if task['minutes']:
-            document.add_paragraph(task['minutes'])
+            yield template.paragraph(task['minutes'])
         else:
-            document.add_paragraph("Ingen referat tilgjengelig for dette punktet.")
-        
-        document.add_paragraph()
+            yield template.paragraph("Ingen referat tilgjengelig for dette punktet.")
+
+        yield template.paragraph()
 
-    f = BytesIO()
-    document.save(f)
-    f.seek(0)
+def import_submissions(after_submission_id, element_fields, ordered, imported_tasks, attachment_report,
+                       overwrite=None):
+    """Import the form's submissions newer than ``after_submission_id``, batch by batch.
 
-    return send_file(f, as_attachment=True, download_name=f'meeting_{meeting_id}_minutes.docx', mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+    Created tasks and attachment reports are appended to ``imported_tasks``
+    and ``attachment_report``. Returns ``(received, insert_errors, safe_mark)``,
+    where ``safe_mark`` is the highest submission id up to which everything
+    is stored. Raises NettskjemaFeedError if ``ordered`` and the feed is not.
+
+    ``overwrite`` maps submission ids to rows an earlier pass stored from a
+    partial read of the feed; those rows are rewritten from this pass's
+    answers, keeping the attachment they already have.
+    """
+    overwrite = overwrite or {}
+    # Submissions arrive in ascending id order, so the mark can follow the
+    # last stored submission until the first failed insert
+    safe_mark = None
+    failed = False
+    received = 0
+    insert_errors = []
+
+    submissions = get_nettskjema_data(NETTSKJEMA_FORM_ID, after_submission_id=after_submission_id, ordered=ordered)
+    for batch in batched(submissions, IMPORT_BATCH_SIZE):
+        received += len(batch)
+        tasks = []
+        for submission in batch:
+            task = transform_submission_to_task(submission, element_fields)
+            logging.debug("Transformed submission %s: %s", task['submission_id'], LazyJson(task))
+            tasks.append(task)
+
+        if any(task['attachment_url'] for task in tasks):
+            # Don't copy attachments of submissions that are already stored
+            existing_ids = find_existing_submission_ids([task['submission_id'] for task in tasks])
+            for task in tasks:
+                stored = overwrite.get(task['submission_id'])
+                if stored is not None and not stored.get('attachment_url'):
+                    # Stored before its attachment answer arrived
+                    continue
+                if task['submission_id'] in existing_ids:
+                    logging.debug("Skipping attachment of duplicate submission %s", task['submission_id'])
+                    task['attachment_url'] = None
+            attachment_report.extend(transfer_attachments(tasks))
+
+        for task in tasks:
+            stored = overwrite.get(task['submission_id'])
+            if stored is not None and not task['attachment_url']:
+                task['attachment_url'] = stored.get('attachment_url')
+        inserted, errors = insert_imported_tasks([task for task in tasks if task['submission_id'] not in overwrite])
+        rewritten, rewrite_errors = insert_imported_tasks(
+            [task for task in tasks if task['submission_id'] in overwrite], overwrite=True)
+        inserted += rewritten
+        errors += rewrite_errors
+        imported_tasks.extend(inserted)
+        insert_errors.extend(errors)
+        failed_ids = {error['submission_id'] for error in errors}
+        for task in tasks:
+            if task['submission_id'] in failed_ids:
+                failed = True
+            elif not failed:
+                safe_mark = task['submission_id']
+        logging.info("Imported batch", extra={
+            'submissions': len(tasks), 'inserted': len(inserted), 'errors': len(errors),
+            'first_submission_id': tasks[0]['submission_id'], 'last_submission_id': tasks[-1]['submission_id']
+        })
+    return received, insert_errors, safe_mark
 
 @app.route('/import-nettskjema', methods=['POST'])
 def import_nettskjema():
+    """Import new Nettskjema submissions as tasks.
+
+    Only submissions newer than the stored high-water mark are processed;
+    ``?full=true`` ignores the mark and re-scans the whole form. Submissions
+    are handled in batches of IMPORT_BATCH_SIZE, and each batch's attachments
+    are transferred concurrently before its tasks are inserted.
+    """
     imported_tasks = []
+    attachment_report = []
+    full = request.args.get('full', 'false').lower() in ('1', 'true', 'yes')
     try:
-        logging.info("Starting Nettskjema import process")
-        
-        # Get form elements
+        started = time.perf_counter()
         form_elements = get_form_elements(NETTSKJEMA_FORM_ID)
-        logging.info(f"Form elements: {json.dumps(form_elements, indent=2)}")
-        
-        submissions = get_nettskjema_data(NETTSKJEMA_FORM_ID)
-        logging.info(f"Received {len(submissions)} submissions from Nettskjema")
-        
-        if not submissions:
-            logging.warning("No submissions received from Nettskjema")
-            return jsonify({"message": "No submissions to import"}), 200
 
-        existing_submission_ids = set(task['submission_id'] for task in supabase.table('tasks').select('submission_id').execute().data)
+        high_water_mark = None if full else get_import_high_water_mark(NETTSKJEMA_FORM_ID)
+        logging.info("Starting Nettskjema import", extra={'form_id': NETTSKJEMA_FORM_ID, 'after_submission_id': high_water_mark})
 
-        form_elements = get_form_elements(NETTSKJEMA_FORM_ID)
-        element_mapping = {element['text']: element['elementId'] for element in form_elements}
-        logging.info(f"Element mapping: {json.dumps(element_mapping, indent=2)}")
+        element_fields = compile_element_mapper(form_elements)
 
-        for submission in submissions:
-            logging.info(f"Processing submission: {submission[0]['submissionId']}")
-            task = transform_submission_to_task(submission, element_mapping)
-            logging.info(f"Transformed task: {json.dumps(task, indent=2)}")
+        try:
+            received, insert_errors, safe_mark = import_submissions(
+                high_water_mark, element_fields, NETTSKJEMA_ANSWERS_ORDERED, imported_tasks, attachment_report)
+        except NettskjemaFeedError as e:
+            # A submission the first pass stored may have had answers still to
+            # come, so the buffered pass rewrites what it stored; the mark and
+            # the reported tasks come from the buffered pass alone
+            logging.warning("Answers feed is out of order, importing again with the feed buffered",
+                            extra={'error': str(e)})
+            first_pass = {row['submission_id']: row for row in imported_tasks}
+            imported_tasks = []
+            received, insert_errors, safe_mark = import_submissions(
+                high_water_mark, element_fields, False, imported_tasks, attachment_report, overwrite=first_pass)
 
-            # Log each field separately
-            for key, value in task.items():
-                logging.info(f"{key}: {value}")
+        if imported_tasks:
+            read_cache.invalidate('tasks', 'meetings')
+            # One summary instead of an event per task; boards reload the list
+            publish_change('tasks.imported', {'count': len(imported_tasks)})
 
-            if task['submission_id'] in existing_submission_ids:
-                logging.info(f"Skipping duplicate submission: {task['submission_id']}")
-                continue
+        if not received:
+            logging.warning("No submissions received from Nettskjema")
+            return jsonify({"message": "No submissions to import", "last_submission_id": high_water_mark}), 200
 
-            # Handle attachment upload
-            if task['attachment_url']:
-                try:
-                    response = requests.get(task['attachment_url'])
-                    response.raise_for_status()
-                    file_content = BytesIO(response.content)
-                    file_name = f"{uuid.uuid4()}{os.path.splitext(response.headers.get('Content-Disposition', ''))[1]}"
-                    
-                    # Upload to Supabase Storage
-                    upload_response = supabase.storage.from_('task-attachments').upload(file_name, file_content)
-                    
-                    # Get public URL
-                    public_url = supabase.storage.from_('task-attachments').get_public_url(file_name)
-                    
-                    task['attachment_url'] = public_url
-                    logging.info(f"Uploaded attachment: {public_url}")
-                except Exception as e:
-                    logging.error(f"Error uploading attachment: {str(e)}")
-                    task['attachment_url'] = None
+        # Advance the mark only past submissions that are safely stored, so a
+        # failed insert is retried by the next incremental import
+        if safe_mark is not None and (high_water_mark is None or safe_mark > high_water_mark):
+            set_import_high_water_mark(NETTSKJEMA_FORM_ID, safe_mark)
+            high_water_mark = safe_mark
 
-            try:
-                response = supabase.table('tasks').insert(task).execute()
-                if response.data:
-                    imported_tasks.extend(response.data)
-                    logging.info(f"Successfully imported task: {task['title']}")
-                    logging.info(f"Imported task data: {json.dumps(response.data[0], indent=2)}")
-                else:
-                    logging.warning(f"No data returned when inserting task: {task}")
-            except Exception as e:
-                logging.error(f"Error inserting task into database: {str(e)}", exc_info=True)
-
-        logging.info(f"Successfully imported {len(imported_tasks)} tasks")
+        logging.info("Finished Nettskjema import", extra={
+            'received': received, 'imported': len(imported_tasks), 'errors': len(insert_errors),
+            'last_submission_id': high_water_mark, 'seconds': round(time.perf_counter() - started, 3)
+        })
         return jsonify({
             "message": f"Successfully imported {len(imported_tasks)} tasks",
-            "imported_tasks": imported_tasks
+            "imported_tasks": imported_tasks,
+            "attachments": attachment_report,
+            "errors": insert_errors,
+            "last_submission_id": high_water_mark
         }), 200
     except requests.RequestException as e:
         logging.error(f"Error fetching data from Nettskjema: {str(e)}", exc_info=True)
@@ -595,33 +1354,40 @@ def import_nettskjema():
 @app.route('/tasks/<int:task_id>/meetings', methods=['GET'])
 def get_task_meeting_history(task_id):
     try:
-        # Query to get all meetings for this task, along with the stage at each meeting
-        response = supabase.table('meeting_tasks')\
-            .select('meetings(id, date, number), stage_at_meeting')\
-            .eq('task_id', task_id)\
-            .execute()
-        
-        if not response.data:
-            return jsonify([]), 200
-        
-        # Format the response data
-        meeting_history = []
-        for entry in response.data:
-            meeting_info = entry['meetings']
-            meeting_history.append({
-                'date': meeting_info['date'],
-                'number': meeting_info['number'],
-                'stage_at_meeting': entry['stage_at_meeting']
-            })
-        
-        # Sort the meeting history by date
-        meeting_history.sort(key=lambda x: x['date'])
-        
-        return jsonify(meeting_history), 200
+        payload = read_cache.get_or_load(
+            ('task_meetings', task_id),
+            lambda: JsonPayload(load_task_meeting_history(task_id))
+        )
+        return json_response(payload)
     except Exception as e:
-        print(f"Error fetching meeting history: {str(e)}")
+        logging.error(f"Error fetching meeting history: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def load_task_meeting_history(task_id):
+    return shape_task_meeting_history(task_meetings_query(supabase, task_id).execute().data)
+
+def task_meetings_query(client, task_id):
+    # Query to get all meetings for this task, along with the stage at each meeting
+    return client.table('meeting_tasks')\
+        .select('meetings(id, date, number), stage_at_meeting')\
+        .eq('task_id', task_id)
+
+def shape_task_meeting_history(rows):
+    # Format the response data
+    meeting_history = []
+    for entry in rows:
+        meeting_info = entry['meetings']
+        meeting_history.append({
+            'date': meeting_info['date'],
+            'number': meeting_info['number'],
+            'stage_at_meeting': entry['stage_at_meeting']
+        })
+
+    # Sort the meeting history by date
+    meeting_history.sort(key=lambda x: x['date'])
+
+    return meeting_history
+
 @app.route('/tasks/<int:task_id>/status', methods=['PUT'])
 def update_task_status(task_id):
     new_status = request.json.get('status')
@@ -629,15 +1395,77 @@ def update_task_status(task_id):
         return jsonify({'error': 'Invalid status'}), 400
     
     try:
-        response = supabase.table('tasks').update({'completion_status': new_status}).eq('id', task_id).execute()
-        if response.data:
-            return jsonify(response.data[0]), 200
-        else:
-            return jsonify({'error': 'Failed to update task status'}), 500
+        version = expected_task_version(request.json, request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        return task_update_response(*update_task_columns(task_id, {'completion_status': new_status}, version))
     except Exception as e:
-        print(f"Error updating task status: {str(e)}")
+        logging.error(f"Error updating task status: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.before_request
+def start_request():
+    request_id_var.set(choose_request_id(request.headers.get('X-Request-ID')))
+    metrics.begin_request()
+
+def choose_request_id(header):
+    # Reuse the caller's (e.g. a proxy's) request id so log lines can be joined up
+    return header if header and REQUEST_ID.match(header) else uuid.uuid4().hex
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    stats = metrics.end_request(route, request.method, response.status_code)
+    log_if_slow(request.method, request.path, route, response.status_code, stats)
+    if request_id_var.get():
+        response.headers['X-Request-ID'] = request_id_var.get()
+    return response
+
+def log_if_slow(method, path, route, status, stats):
+    if stats is not None and SLOW_REQUEST_SECONDS and stats.seconds >= SLOW_REQUEST_SECONDS:
+        breakdown = ', '.join(
+            f"{service} {target} x{count} {seconds * 1000:.0f} ms"
+            for (service, target), (count, seconds) in sorted(stats.breakdown().items())
+        )
+        logging.warning(
+            f"Slow request: {method} {path} ({route}) {status} "
+            f"took {stats.seconds * 1000:.0f} ms; {len(stats.calls)} upstream calls: {breakdown or 'none'}"
+        )
+
+@app.teardown_request
+def finish_request(error=None):
+    request_id_var.set(None)
+
+@app.route('/events', methods=['GET'])
+def stream_events():
+    """Server-Sent Events feed of task, meeting and agenda changes.
+
+    Browsers reconnect with Last-Event-ID and get what they missed; a
+    ``reset`` event means that is no longer possible and the board should
+    reload. Each open stream holds a worker thread (gthread) or greenlet
+    (gevent), so a worker serves at most EVENT_STREAM_LIMIT of them and
+    answers 503 beyond that; WORKER_PROFILE=asgi has no such limit.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    chunks = event_streams.open(event_log.stream(last_event_id))
+    if chunks is None:
+        response = Response(f"retry: {EVENT_STREAM_RETRY_SECONDS * 1000}\n\n", status=503, mimetype='text/event-stream')
+        response.headers['Retry-After'] = str(EVENT_STREAM_RETRY_SECONDS)
+        return response
+    response = Response(chunks, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(read_cache.stats()), 200
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"error": "Not found"}), 404
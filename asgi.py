@@ -0,0 +1,279 @@
+"""ASGI entry point: ``WORKER_PROFILE=asgi gunicorn -c gunicorn.conf.py asgi:app``.
+
+The routes that only wait on Supabase (the listings the board polls, task
+edits, agenda adds and meeting documents) run here as coroutines on an async
+Supabase client with a pooled connection set, so one worker keeps any number
+of them in flight, and GET /events streams don't hold a thread each. Every
+other route falls through to the Flask app in app.py, which runs on a thread
+pool (WSGI_THREADS), so a long Nettskjema import or upload never holds up
+the event loop. Both sides share app.py's queries, read cache, change feed,
+CORS settings and metrics.
+"""
+import contextlib
+import json
+import logging
+import os
+
+from a2wsgi import WSGIMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.errors import ServerErrorMiddleware
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Match, Route, Router
+from supabase import acreate_client
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_accept_header, parse_etags
+
+from app import (
+    app as flask_app, url, key, metrics, read_cache, document_jobs, event_log, CORS_ORIGINS, CORS_EXPOSE_HEADERS,
+    CompletionStatus, DOCX_MIMETYPE, JsonPayload, request_id_var, choose_request_id, log_if_slow,
+    negotiate_json, task_list_query, task_list_cache_key, meetings_query, shape_meetings, task_meetings_query,
+    shape_task_meeting_history, meeting_document_query, shape_meeting_document, document_job_id,
+    document_download_name, render_document, expected_task_version, task_changes, task_update_query,
+    task_updated, task_not_updated, task_update_body, meeting_task_ids, meeting_tasks_added,
+)
+
+# Set up by the lifespan handler, once per worker process
+supabase = None
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    global supabase
+    supabase = await acreate_client(url, key)
+    for event, hooks in metrics.httpx_async_hooks('supabase').items():
+        supabase.postgrest.session.event_hooks[event] += hooks
+    # Building the read cache follows the change feed and waits until it has
+    # read the events file; do that now, off the loop, not on the first read
+    await run_in_threadpool(read_cache.get)
+    try:
+        yield
+    finally:
+        await supabase.postgrest.session.aclose()
+
+
+def json_response(request, payload, headers=None):
+    """app.json_response for Starlette: conditional, compressed 200 for a JsonPayload."""
+    body, etag, encoding = negotiate_json(payload, parse_accept_header(request.headers.get('Accept-Encoding')),
+                                          parse_etags(request.headers.get('If-None-Match')))
+    response_headers = {'ETag': f'"{etag}"', 'Vary': 'Accept-Encoding', **(headers or {})}
+    if body is None:
+        return Response(status_code=304, headers=response_headers)
+    if encoding:
+        response_headers['Content-Encoding'] = encoding
+    return Response(body, media_type='application/json', headers=response_headers)
+
+
+async def json_body(request):
+    """The request's JSON body, or None if it is not valid JSON (Flask answers those with 400)."""
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def invalid_json():
+    return JSONResponse({'error': 'Request body must be valid JSON'}, 400)
+
+
+async def get_tasks(request):
+    args = MultiDict(request.query_params.multi_items())
+    try:
+        query, limit = task_list_query(supabase, args)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, 400)
+
+    async def load():
+        return JsonPayload((await query.execute()).data)
+
+    payload = await read_cache.aget_or_load(task_list_cache_key(args), load)
+    headers = {}
+    if limit is not None and len(payload.data) == limit:
+        headers['X-Next-Cursor'] = str(payload.data[-1]['id'])
+    return json_response(request, payload, headers)
+
+
+async def get_meetings(request):
+    async def load():
+        return JsonPayload(shape_meetings((await meetings_query(supabase).execute()).data))
+
+    return json_response(request, await read_cache.aget_or_load(('meetings',), load))
+
+
+async def get_task_meeting_history(request):
+    task_id = request.path_params['task_id']
+
+    async def load():
+        return JsonPayload(shape_task_meeting_history((await task_meetings_query(supabase, task_id).execute()).data))
+
+    try:
+        return json_response(request, await read_cache.aget_or_load(('task_meetings', task_id), load))
+    except Exception as e:
+        logging.error(f"Error fetching meeting history: {str(e)}")
+        return JSONResponse({'error': str(e)}, 500)
+
+
+async def update_task_columns(task_id, changes, version=None):
+    response = await task_update_query(supabase, task_id, changes, version).execute()
+    if response.data:
+        # Publishing appends to the events file under a lock
+        return await run_in_threadpool(task_updated, response.data[0])
+    return task_not_updated((await supabase.table('tasks').select('version').eq('id', task_id).execute()).data)
+
+
+async def task_update_response(task_id, changes, version):
+    row, status = await update_task_columns(task_id, changes, version)
+    body, headers = task_update_body(row, status)
+    return JSONResponse(body, status, headers)
+
+
+async def update_task(request):
+    data = await json_body(request)
+    if data is None:
+        return invalid_json()
+    try:
+        version = expected_task_version(data, request.headers.get('If-Match'))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, 400)
+    try:
+        changes = task_changes(data)
+        if not changes:
+            return JSONResponse({'error': 'No fields to update'}, 400)
+        return await task_update_response(request.path_params['task_id'], changes, version)
+    except Exception as e:
+        logging.error(f"Error updating task: {str(e)}")
+        return JSONResponse({'error': str(e)}, 500)
+
+
+async def update_task_status(request):
+    data = await json_body(request)
+    if data is None:
+        return invalid_json()
+    new_status = data.get('status')
+    if new_status not in [status.value for status in CompletionStatus]:
+        return JSONResponse({'error': 'Invalid status'}, 400)
+    try:
+        version = expected_task_version(data, request.headers.get('If-Match'))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, 400)
+    try:
+        return await task_update_response(request.path_params['task_id'], {'completion_status': new_status}, version)
+    except Exception as e:
+        logging.error(f"Error updating task status: {str(e)}")
+        return JSONResponse({'error': str(e)}, 500)
+
+
+async def add_task_to_meeting(request):
+    data = await json_body(request)
+    if data is None:
+        return invalid_json()
+    task_ids = meeting_task_ids(data)
+    if task_ids is None:
+        return JSONResponse({"error": "task_ids must be a non-empty list of task ids"}, 400)
+    meeting_id = request.path_params['meeting_id']
+    result = (await supabase.rpc('add_tasks_to_meeting', {'meeting_id': meeting_id, 'task_ids': task_ids}).execute()).data
+    body, status = await run_in_threadpool(meeting_tasks_added, result, task_ids, bulk='task_ids' in data)
+    return JSONResponse(body, status)
+
+
+async def generate_document(kind, meeting_id):
+    meeting, tasks = shape_meeting_document((await meeting_document_query(supabase, meeting_id).execute()).data)
+    if meeting is None:
+        return JSONResponse({'error': 'Meeting not found'}, 404)
+    job_id = document_job_id(kind, meeting, tasks)
+    filename = document_download_name(kind, meeting_id)
+    if document_jobs.exists(job_id):
+        return FileResponse(document_jobs.path(job_id), media_type=DOCX_MIMETYPE, filename=filename)
+    # A plain iterator, so Starlette renders it on the thread pool
+    return StreamingResponse(document_jobs.stream(job_id, render_document(kind, meeting, tasks)),
+                             media_type=DOCX_MIMETYPE,
+                             headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+async def generate_report(request):
+    return await generate_document('report', request.path_params['meeting_id'])
+
+
+async def generate_minutes(request):
+    return await generate_document('minutes', request.path_params['meeting_id'])
+
+
+async def stream_events(request):
+    """GET /events without a thread per open stream; see app.stream_events."""
+    last_event_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+    return StreamingResponse(event_log.astream(last_event_id), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def internal_error(request, exc):
+    return JSONResponse({"error": "Internal server error"}, 500)
+
+
+# Names are the Flask rules, so metrics are labelled the same in both modes
+routes = [
+    Route('/tasks', get_tasks, methods=['GET'], name='/tasks'),
+    Route('/tasks/{task_id:int}', update_task, methods=['PUT'], name='/tasks/<int:task_id>'),
+    Route('/tasks/{task_id:int}/status', update_task_status, methods=['PUT'], name='/tasks/<int:task_id>/status'),
+    Route('/tasks/{task_id:int}/meetings', get_task_meeting_history, methods=['GET'],
+          name='/tasks/<int:task_id>/meetings'),
+    Route('/meetings', get_meetings, methods=['GET'], name='/meetings'),
+    Route('/meetings/{meeting_id:int}/tasks', add_task_to_meeting, methods=['POST'],
+          name='/meetings/<int:meeting_id>/tasks'),
+    Route('/meetings/{meeting_id:int}/generate_report', generate_report, methods=['GET'],
+          name='/meetings/<int:meeting_id>/generate_report'),
+    Route('/meetings/{meeting_id:int}/generate_minutes', generate_minutes, methods=['GET'],
+          name='/meetings/<int:meeting_id>/generate_minutes'),
+    Route('/events', stream_events, methods=['GET'], name='/events'),
+]
+
+
+class AsyncApp:
+    """Send requests for ``routes`` to their coroutines and the rest to Flask.
+
+    CORS preflights always go to Flask, whose flask-cors settings answer
+    them for every route.
+    """
+
+    def __init__(self, routes, fallback):
+        self.router = Router(routes, lifespan=lifespan)
+        self.routes_app = ServerErrorMiddleware(
+            CORSMiddleware(self.router, allow_origins=CORS_ORIGINS, expose_headers=CORS_EXPOSE_HEADERS),
+            handler=internal_error
+        )
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.router(scope, receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] != 'OPTIONS':
+            for route in self.router.routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    await self.tracked(route.name, scope, receive, send)
+                    return
+        await self.fallback(scope, receive, send)
+
+    async def tracked(self, route, scope, receive, send):
+        """Request id, metrics and slow-request log, as app.py's request hooks do for Flask."""
+        token = request_id_var.set(choose_request_id(Headers(scope=scope).get('X-Request-ID')))
+        metrics.begin_request()
+        status = 500
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                MutableHeaders(scope=message)['X-Request-ID'] = request_id_var.get()
+            await send(message)
+
+        try:
+            await self.routes_app(scope, receive, send_with_request_id)
+        finally:
+            stats = metrics.end_request(route, scope['method'], status)
+            log_if_slow(scope['method'], scope['path'], route, status, stats)
+            request_id_var.reset(token)
+
+
+app = AsyncApp(routes, WSGIMiddleware(flask_app, workers=int(os.environ.get("WSGI_THREADS", "8"))))
@@ -0,0 +1,70 @@
+"""Round trips and latency for building a meeting agenda.
+
+Adds the same number of tasks to a fresh meeting one POST at a time and with
+a single bulk POST (``task_ids``), and fails (exit code 1) if the bulk add
+needs more upstream round trips than the budget, however many tasks it adds.
+Before the add_tasks_to_meeting function every single add cost four.
+
+    python benchmarks/bench_agenda.py --items 30 --latency-ms 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_supabase import start_fake
+
+ROUND_TRIP_BUDGET = 1
+
+
+def new_meeting(fake):
+    return fake.insert_row('meetings', {'number': 1000 + len(fake.tables['meetings']),
+                                        'date': '2026-10-18T10:00:00+00:00', 'location': 'A4Y-117',
+                                        'is_completed': False})['id']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=30)
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    fake = start_fake(latency=args.latency_ms / 1000, tasks=max(args.items, 100), meetings=0)
+    from app import app
+
+    client = app.test_client()
+    task_ids = [task['id'] for task in fake.tables['tasks'][:args.items]]
+
+    meeting_id = new_meeting(fake)
+    fake.reset_calls()
+    started = time.perf_counter()
+    for task_id in task_ids:
+        response = client.post(f'/meetings/{meeting_id}/tasks', json={'task_id': task_id})
+        assert response.status_code == 201, response.get_data(as_text=True)
+    single_seconds = time.perf_counter() - started
+    single_calls = fake.call_count()
+
+    meeting_id = new_meeting(fake)
+    fake.reset_calls()
+    started = time.perf_counter()
+    response = client.post(f'/meetings/{meeting_id}/tasks', json={'task_ids': task_ids})
+    bulk_seconds = time.perf_counter() - started
+    bulk_calls = fake.call_count()
+    assert response.status_code == 201, response.get_data(as_text=True)
+    orders = [row['task_order'] for row in response.get_json()['added']]
+    assert orders == list(range(1, args.items + 1)), orders
+
+    print(f"{args.items} agenda items, {args.latency_ms:g} ms simulated Supabase latency")
+    print(f"  one at a time: {single_calls:4d} round trips  {single_seconds * 1000:8.1f} ms")
+    print(f"  bulk:          {bulk_calls:4d} round trips  {bulk_seconds * 1000:8.1f} ms")
+
+    if bulk_calls > ROUND_TRIP_BUDGET:
+        print(f"FAIL: bulk add made {bulk_calls} round trips (budget {ROUND_TRIP_BUDGET})")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
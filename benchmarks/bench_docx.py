@@ -0,0 +1,175 @@
+"""Benchmark for rendering meeting documents.
+
+Renders the board papers and minutes for a synthetic agenda with the
+template engine in docx_render.py and with the previous python-docx builder
+(kept below as a reference), reporting time and peak traced memory, and checks
+that both produce the same paragraphs, text and styles.
+
+    python benchmarks/bench_docx.py --items 200
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Pt, Cm
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from fake_supabase import start_fake
+
+
+def legacy_report(meeting, tasks, members, secretariat):
+    document = Document()
+    for section in document.sections:
+        section.top_margin = Cm(2.54)
+        section.bottom_margin = Cm(2.54)
+        section.left_margin = Cm(2.54)
+        section.right_margin = Cm(2.54)
+
+    title = document.add_paragraph("Innovation Board Executive")
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title.runs[0].bold = True
+    title.runs[0].font.size = Pt(14)
+
+    for key, value in [("Place", "A4Y-117"), ("Date and time", meeting['date'])]:
+        p = document.add_paragraph()
+        p.add_run(f"{key}\n").bold = True
+        p.add_run(value)
+
+    document.add_paragraph("Members", style='Heading 1')
+    for name, title in members:
+        document.add_paragraph(f"{name} {title}")
+    document.add_paragraph("Programme Administration / Secretariat", style='Heading 1')
+    for name, title in secretariat:
+        document.add_paragraph(f"{name} {title}")
+    document.add_page_break()
+
+    document.add_paragraph("Agenda", style='Heading 1')
+    for index, task in enumerate(tasks, start=1):
+        document.add_paragraph(f"{task['tasks']['casenumber']} {task['tasks']['title']} page {index}")
+
+    for task in tasks:
+        document.add_page_break()
+        document.add_paragraph("Proposal – New course idea", style='Heading 2')
+        headings = [
+            ("Item number", task['tasks']['casenumber']),
+            ("Idea title", task['tasks']['title']),
+            ("Idea owner", task['tasks']['owner']),
+            ("Stage at meeting", task['stage_at_meeting']),
+            ("Current stage", task['tasks']['stage']),
+            ("Completion status", task['tasks']['completion_status']),
+            ("Briefly describe the idea", task['tasks']['description']),
+            ("Why is this relevant for BI?", task['tasks'].get('relevance_for_bi', '')),
+            ("Why does individuals and/or organizations need such a course/idea?", task['tasks'].get('need_for_course', '')),
+            ("What would be the relevant target group?", task['tasks'].get('target_group', '')),
+            ("What are your thoughts on the future growth potential of the market for this course/idea?", task['tasks'].get('growth_potential', '')),
+            ("Faculty resources – which academic departments should be involved?", task['tasks'].get('faculty_resources', ''))
+        ]
+        for heading, content in headings:
+            document.add_paragraph(heading, style='Heading 3')
+            document.add_paragraph(content)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_minutes(meeting, tasks):
+    document = Document()
+    title = document.add_paragraph(f"Møtereferat for møte {meeting['number']}")
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title.runs[0].bold = True
+    title.runs[0].font.size = Pt(14)
+    document.add_paragraph(f"Dato: {meeting['date']}").alignment = WD_ALIGN_PARAGRAPH.CENTER
+    for task in tasks:
+        document.add_paragraph(f"{task['tasks']['casenumber']} - {task['tasks']['title']}").runs[0].bold = True
+        document.add_paragraph(f"Stage at meeting: {task['stage_at_meeting']}")
+        document.add_paragraph(f"Current stage: {task['tasks']['stage']}")
+        document.add_paragraph(f"Completion status: {task['tasks']['completion_status']}")
+        document.add_paragraph(task['minutes'] or "Ingen referat tilgjengelig for dette punktet.")
+        document.add_paragraph()
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def agenda(items, text_size):
+    text = ("Lorem ipsum dolor sit amet & <consectetur> æøå. " * (text_size // 48 + 1))[:text_size]
+    meeting = {'id': 1, 'number': 7, 'date': '2026-10-18T10:00:00+00:00', 'is_completed': False}
+    tasks = [{
+        'task_order': i,
+        'stage_at_meeting': 'Idea Description',
+        'minutes': f"Decision for item {i}\n{text}" if i % 2 else None,
+        'tasks': {
+            'id': i, 'casenumber': f"IB-{i:04d}", 'title': f"Idea {i}", 'owner': f"Owner {i}",
+            'stage': 'Business Case', 'completion_status': 'In Progress', 'description': text,
+            'relevance_for_bi': text, 'need_for_course': text, 'target_group': text,
+            'growth_potential': text, 'faculty_resources': text,
+        },
+    } for i in range(1, items + 1)]
+    return meeting, tasks
+
+
+def measure(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak, result
+
+
+def paragraphs(data):
+    document = Document(io.BytesIO(data))
+    return [(p.style.name, p.text, p.alignment, [r.bold for r in p.runs]) for p in document.paragraphs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--text-size', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    start_fake()
+    import app
+
+    meeting, tasks = agenda(args.items, args.text_size)
+    app.get_docx_template()
+
+    cases = [
+        ('report', lambda: legacy_report(meeting, tasks, app.BOARD_MEMBERS, app.SECRETARIAT)),
+        ('minutes', lambda: legacy_minutes(meeting, tasks)),
+    ]
+    print(f"{args.items} agenda items, {args.text_size} characters per answer")
+    for kind, legacy in cases:
+        render = app.render_document(kind, meeting, tasks)
+        legacy_time, legacy_peak, legacy_data = measure(args.repeat, legacy)
+        engine_time, engine_peak, engine_data = measure(args.repeat, lambda: b''.join(render()))
+        assert paragraphs(engine_data) == paragraphs(legacy_data), f"{kind}: documents differ"
+
+        # Streaming: only one chunk has to be held at a time
+        tracemalloc.start()
+        largest = max(len(chunk) for chunk in render())
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{kind}")
+        print(f"  python-docx : {legacy_time * 1000:8.1f} ms  peak {legacy_peak / 2**20:6.1f} MiB  {len(legacy_data) / 1024:7.1f} KiB")
+        print(f"  template    : {engine_time * 1000:8.1f} ms  peak {engine_peak / 2**20:6.1f} MiB  {len(engine_data) / 1024:7.1f} KiB")
+        print(f"  streamed    : peak {stream_peak / 2**20:6.1f} MiB, largest chunk {largest / 1024:.1f} KiB")
+        print(f"  speedup     : {legacy_time / engine_time:8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
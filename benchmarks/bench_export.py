@@ -0,0 +1,141 @@
+"""Time to first byte and peak memory of GET /export/tasks.
+
+Exports the board as CSV, as the meeting history CSV and as XLSX at two
+dataset sizes, and reports the time to the first byte, the total time, the
+size of the file and the traced allocation peak while it streams. The fake
+Supabase runs in its own process, so only the app's memory is counted, and
+each dataset size gets a fresh app process. Fails
+(exit code 1) if the peak grows with the number of tasks by more than
+MEMORY_GROWTH_BUDGET, i.e. if an export stops streaming, or if a CSV takes
+longer than FIRST_BYTE_BUDGET_MS to start.
+
+    python benchmarks/bench_export.py --tasks 2000 10000 --latency-ms 2
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_supabase import start_fake
+
+MEMORY_GROWTH_BUDGET = 1.5
+FIRST_BYTE_BUDGET_MS = 50
+EXPORTS = (
+    ('csv', '/export/tasks?format=csv'),
+    ('history csv', '/export/tasks?format=csv&history=true'),
+    ('xlsx', '/export/tasks?format=xlsx'),
+)
+
+
+def measure(client, path):
+    """Time one export untraced, then trace a second one for its allocation peak."""
+    result = stream(client, path)
+    tracemalloc.start()
+    stream(client, path)
+    result['peak_mib'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+    tracemalloc.stop()
+    return result
+
+
+def stream(client, path):
+    started = time.perf_counter()
+    response = client.get(path, buffered=False)
+    chunks = iter(response.response)
+    first = next(chunks)
+    first_byte = time.perf_counter() - started
+    size = len(first)
+    head = first
+    for chunk in chunks:
+        size += len(chunk)
+        if len(head) < 4096:
+            head += chunk
+    elapsed = time.perf_counter() - started
+    response.close()
+    assert response.status_code == 200, response.status_code
+    check_output(path, head)
+    return {'first_byte_ms': round(first_byte * 1000, 1), 'seconds': round(elapsed, 2),
+            'mib': round(size / 2 ** 20, 1)}
+
+
+def check_output(path, head):
+    if 'xlsx' in path:
+        assert head.startswith(b'PK'), head[:4]
+        return
+    rows = list(csv.reader(io.StringIO(head.decode('utf-8-sig', errors='ignore'))))
+    assert rows[0][0] in ('Id', 'Task id'), rows[0]
+
+
+def serve_fake(tasks, tasks_per_meeting, latency):
+    fake = start_fake(latency=latency, tasks=tasks, meetings=tasks // 20, tasks_per_meeting=tasks_per_meeting)
+    print(json.dumps({'url': fake.url, 'key': os.environ['SUPABASE_KEY']}), flush=True)
+    threading.Event().wait()
+
+
+def run_size(tasks, tasks_per_meeting, latency):
+    fake = subprocess.Popen([sys.executable, __file__, '--serve-fake', '--tasks', str(tasks),
+                             '--tasks-per-meeting', str(tasks_per_meeting), '--latency-ms', str(latency * 1000)],
+                            stdout=subprocess.PIPE, text=True)
+    try:
+        upstream = json.loads(fake.stdout.readline())
+        os.environ.update(SUPABASE_URL=upstream['url'], SUPABASE_KEY=upstream['key'], LOG_LEVEL='WARNING',
+                          EVENTS_FILE=os.path.join(tempfile.mkdtemp(prefix='bench-export-'), 'events.log'))
+        from app import app
+
+        client = app.test_client()
+        print(json.dumps({kind: measure(client, path) for kind, path in EXPORTS}))
+    finally:
+        fake.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[2000, 10000])
+    parser.add_argument('--tasks-per-meeting', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=2.0)
+    parser.add_argument('--serve-fake', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_fake:
+        serve_fake(args.tasks[0], args.tasks_per_meeting, args.latency_ms / 1000)
+    if args.run:
+        run_size(args.tasks[0], args.tasks_per_meeting, args.latency_ms / 1000)
+        return 0
+
+    results = {}
+    for tasks in args.tasks:
+        output = subprocess.run(
+            [sys.executable, __file__, '--run', '--tasks', str(tasks), '--tasks-per-meeting',
+             str(args.tasks_per_meeting), '--latency-ms', str(args.latency_ms)],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        ).stdout
+        for kind, result in json.loads(output.strip().splitlines()[-1]).items():
+            results[(kind, tasks)] = result
+            print(f"{kind:>12} {tasks:6d} tasks: first byte {result['first_byte_ms']:8.1f} ms  "
+                  f"total {result['seconds']:6.2f} s  {result['mib']:7.1f} MiB  "
+                  f"peak {result['peak_mib']:6.1f} MiB traced")
+
+    status = 0
+    smallest, largest = min(args.tasks), max(args.tasks)
+    for kind, _ in EXPORTS:
+        growth = results[(kind, largest)]['peak_mib'] / results[(kind, smallest)]['peak_mib']
+        if largest > smallest and growth > MEMORY_GROWTH_BUDGET:
+            print(f"FAIL: {kind} peak memory grew {growth:.1f}x from {smallest} to {largest} tasks")
+            status = 1
+        if kind != 'xlsx' and results[(kind, largest)]['first_byte_ms'] > FIRST_BYTE_BUDGET_MS:
+            print(f"FAIL: {kind} took {results[(kind, largest)]['first_byte_ms']:.0f} ms to start")
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
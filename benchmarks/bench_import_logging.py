@@ -0,0 +1,100 @@
+"""Import throughput under different logging setups.
+
+Runs POST /import-nettskjema against the fake Nettskjema and Supabase and
+reports submissions per second and bytes logged. Each mode runs in its own
+process, with stderr (where logs go) redirected to a file:
+
+    legacy   root logger at DEBUG through a synchronous StreamHandler, plus
+             the per-submission json.dumps(indent=2) and per-field lines the
+             import used to write (re-created below)
+    debug    LOG_LEVEL=DEBUG, JSON lines through the background queue
+    info     LOG_LEVEL=INFO (production), JSON lines through the queue
+    warning  LOG_LEVEL=WARNING
+
+    python benchmarks/bench_import_logging.py --submissions 5000
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_nettskjema import start_fake_nettskjema
+from fake_supabase import start_fake
+
+MODES = ('legacy', 'debug', 'info', 'warning')
+
+
+def run_mode(mode, submissions):
+    start_fake()
+    start_fake_nettskjema(submissions=submissions, first_submission_id=100_000, text_size=300)
+    os.environ['LOG_LEVEL'] = 'DEBUG' if mode == 'legacy' else mode.upper()
+    os.environ['READ_CACHE_TTL'] = '0'
+    import app
+
+    if mode == 'legacy':
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        logging.basicConfig(level=logging.DEBUG)
+        logging.getLogger('httpx').setLevel(logging.DEBUG)
+        transform = app.transform_submission_to_task
+
+        def logged_transform(submission, element_fields):
+            logging.info(f"Processing submission: {submission[0]['submissionId']}")
+            task = transform(submission, element_fields)
+            for key, value in task.items():
+                logging.info(f"{key}: {value}")
+            logging.info(f"Task: {json.dumps(task, indent=2)}")
+            return task
+
+        app.transform_submission_to_task = logged_transform
+
+    client = app.app.test_client()
+    start = time.perf_counter()
+    response = client.post('/import-nettskjema')
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.get_data(as_text=True)
+    logging.shutdown()
+    print(json.dumps({
+        'mode': mode,
+        'imported': len(response.get_json()['imported_tasks']),
+        'seconds': round(elapsed, 3),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--submissions', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per mode (fastest is reported)')
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.submissions)
+        return 0
+
+    print(f"{args.submissions} submissions, best of {args.repeat}")
+    for mode in MODES:
+        runs = []
+        for _ in range(args.repeat):
+            with tempfile.TemporaryFile() as log:
+                output = subprocess.run(
+                    [sys.executable, __file__, '--mode', mode, '--submissions', str(args.submissions)],
+                    check=True, stdout=subprocess.PIPE, stderr=log, text=True
+                ).stdout
+                log_bytes = log.tell()
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        result = min(runs, key=lambda run: run['seconds'])
+        print(f"{mode:>8}: {result['imported'] / result['seconds']:8.0f} submissions/s "
+              f"({result['seconds']:6.2f} s), {log_bytes / 2**20:7.2f} MiB logged")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
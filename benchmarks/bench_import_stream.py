@@ -0,0 +1,123 @@
+"""Peak-memory benchmark for the Nettskjema import pipeline.
+
+Imports a synthetic form end to end: the fake Nettskjema streams its NDJSON
+answers feed over HTTP, and get_nettskjema_data -> group_submissions ->
+transform_submission_to_task -> insert_imported_tasks store the tasks in the
+fake Supabase, batch by batch, through import_submissions. Reports peak RSS
+and peak traced allocations. The fakes run in their own process and each
+mode in another, so the figures are the app's alone:
+
+    streaming  ordered feed, one submission in memory at a time
+    buffered   every answer grouped in memory first (the previous behaviour)
+
+The rows the import creates are counted rather than collected, so what is
+measured is what the pipeline itself holds. Fails (exit code 1) if the
+streaming peak is more than STREAMING_SHARE_BUDGET of the buffered one, i.e.
+if the feed or the batches stop streaming.
+
+    python benchmarks/bench_import_stream.py --answers 100000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STREAMING_SHARE_BUDGET = 0.25
+QUESTIONS_PER_SUBMISSION = 8
+
+
+class Counted:
+    """Stands in for the import's result lists and only counts what is added."""
+
+    def __init__(self):
+        self.count = 0
+
+    def extend(self, items):
+        self.count += len(items)
+
+
+def serve_fakes(submissions):
+    from fake_nettskjema import start_fake_nettskjema
+    from fake_supabase import start_fake
+
+    start_fake()
+    start_fake_nettskjema(submissions=submissions, first_submission_id=100_000, text_size=300)
+    print(json.dumps({name: value for name, value in os.environ.items()
+                      if name.startswith(('SUPABASE_', 'NETTSKJEMA_', 'OAUTHLIB_'))}), flush=True)
+    threading.Event().wait()
+
+
+def run_mode(mode, submissions):
+    fakes = subprocess.Popen([sys.executable, __file__, '--serve-fakes', '--answers',
+                              str(submissions * QUESTIONS_PER_SUBMISSION)], stdout=subprocess.PIPE, text=True)
+    try:
+        os.environ.update(json.loads(fakes.stdout.readline()))
+        os.environ['LOG_LEVEL'] = 'WARNING'
+        import app
+
+        element_fields = app.compile_element_mapper(app.get_form_elements(app.NETTSKJEMA_FORM_ID))
+        imported, attachments = Counted(), Counted()
+
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        start = time.perf_counter()
+        received, errors, _ = app.import_submissions(None, element_fields, mode == 'streaming', imported, attachments)
+        elapsed = time.perf_counter() - start
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    finally:
+        fakes.kill()
+    assert received == submissions and imported.count == submissions and not errors, (received, imported.count, errors)
+    print(json.dumps({
+        'mode': mode,
+        'answers': received * QUESTIONS_PER_SUBMISSION,
+        'submissions': received,
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': round(peak / 1024, 1),
+        'rss_growth_mb': round((peak - baseline) / 1024, 1),
+        'traced_peak_mb': round(traced_peak / 2 ** 20, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--answers', type=int, default=100_000)
+    parser.add_argument('--mode', choices=['streaming', 'buffered'])
+    parser.add_argument('--serve-fakes', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    submissions = args.answers // QUESTIONS_PER_SUBMISSION
+    if args.serve_fakes:
+        serve_fakes(submissions)
+    if args.mode:
+        run_mode(args.mode, submissions)
+        return 0
+
+    results = {}
+    for mode in ('streaming', 'buffered'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--answers', str(args.answers)],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        ).stdout
+        result = results[mode] = json.loads(output.strip().splitlines()[-1])
+        print(f"{result['mode']:>9}: {result['submissions']} submissions in {result['seconds']}s, "
+              f"peak RSS {result['peak_rss_mb']} MB (+{result['rss_growth_mb']} MB), "
+              f"traced peak {result['traced_peak_mb']} MB")
+
+    share = results['streaming']['traced_peak_mb'] / results['buffered']['traced_peak_mb']
+    if share > STREAMING_SHARE_BUDGET:
+        print(f"FAIL: streaming peaks at {share:.0%} of the buffered import")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
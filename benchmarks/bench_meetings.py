@@ -0,0 +1,63 @@
+"""Round-trip and latency benchmark for GET /meetings.
+
+Runs the route against the local PostgREST stand-in and fails (exit code 1) if
+the listing needs more upstream round trips than the budget, so an N+1 query
+pattern cannot creep back in.
+
+    python benchmarks/bench_meetings.py --meetings 300 --latency-ms 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_supabase import start_fake
+
+ROUND_TRIP_BUDGET = 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--meetings', type=int, default=300)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--tasks-per-meeting', type=int, default=15)
+    parser.add_argument('--latency-ms', type=float, default=2.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    fake = start_fake(
+        latency=args.latency_ms / 1000,
+        tasks=args.tasks,
+        meetings=args.meetings,
+        tasks_per_meeting=args.tasks_per_meeting,
+    )
+    # Every repeat has to reach the upstream, not the read cache
+    os.environ['READ_CACHE_TTL'] = '0'
+    from app import app
+
+    client = app.test_client()
+    timings, round_trips = [], []
+    for _ in range(args.repeat):
+        fake.reset_calls()
+        start = time.perf_counter()
+        response = client.get('/meetings')
+        timings.append(time.perf_counter() - start)
+        round_trips.append(fake.call_count('/rest/v1/'))
+        assert response.status_code == 200, response.data
+    meetings = response.get_json()
+    fake.stop()
+
+    print(f"meetings={len(meetings)} tasks/meeting={args.tasks_per_meeting} latency={args.latency_ms}ms")
+    print(f"round trips per request: {max(round_trips)} (budget {ROUND_TRIP_BUDGET})")
+    print(f"median latency: {statistics.median(timings) * 1000:.1f} ms")
+    if max(round_trips) > ROUND_TRIP_BUDGET:
+        print("FAIL: GET /meetings exceeds its round-trip budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
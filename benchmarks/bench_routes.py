@@ -0,0 +1,425 @@
+"""End-to-end benchmark of every route in app.py against the local stand-ins.
+
+Starts the fake Supabase (PostgREST tables, RPCs, storage) and the fake
+Nettskjema (OAuth, elements, answers, attachments) in this process, seeds
+them, and drives each route through the Flask test client from concurrent
+threads. Per route it reports:
+
+    rps            requests per second over the timed run
+    p50/p95/p99    latency of the timed requests, ms
+    first_ms       the route's first request (index builds, template loads,
+                   the full Nettskjema import)
+    supabase       upstream round trips per timed request
+    nettskjema     the same for Nettskjema
+    alloc_kib      traced allocation peak of one request
+    rss_mb         peak RSS of the process after the route
+
+The results are written as JSON, so runs on two commits can be compared:
+
+    python benchmarks/bench_routes.py --output before.json
+    python benchmarks/bench_routes.py --output after.json --compare before.json
+
+With --compare the exit code is 1 if a route got slower (p95) or lost
+throughput by more than --tolerance, or needs more upstream calls. The run
+also fails if a route in app.py has no scenario here. The read cache is off
+by default so reads measure their upstream path.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_nettskjema import QUESTIONS, start_fake_nettskjema
+from fake_supabase import STAGES, start_fake
+
+UPLOAD_SIZE = 256 * 1024
+
+
+class Scenario:
+    """One route under load: ``send(client, arg)`` makes a request and returns the response.
+
+    ``setup(bench, count)`` returns one argument per request, for routes
+    that need fresh rows (a delete can only delete once); otherwise the
+    request number is passed. ``share`` scales the number of requests for
+    routes that are too slow to run --requests times.
+    """
+
+    def __init__(self, rule, send, setup=None, expect=(200,), share=1.0, concurrency=None, label=None):
+        self.rule = rule
+        self.send = send
+        self.setup = setup
+        self.expect = expect
+        self.share = share
+        self.concurrency = concurrency
+        self.label = label or rule
+
+
+def read(response):
+    response.get_data()
+    response.close()
+    return response
+
+
+def first_event_chunk(client):
+    """Open the change feed, read its first chunk and hang up, as a board reconnecting does."""
+    response = client.get('/events', buffered=False)
+    next(iter(response.response))
+    response.close()
+    return response
+
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.supabase = start_fake(latency=args.latency_ms / 1000, tasks=args.tasks, meetings=args.meetings,
+                                   tasks_per_meeting=args.tasks_per_meeting, text_size=args.text_size)
+        self.nettskjema = start_fake_nettskjema(
+            submissions=args.answers // len(QUESTIONS),
+            first_submission_id=1001 + args.tasks,
+            attachment_every=args.attachment_every,
+            latency=args.latency_ms / 1000,
+        )
+        self.task_ids = [task['id'] for task in self.supabase.tables['tasks']]
+        self.meeting_ids = [meeting['id'] for meeting in self.supabase.tables['meetings']]
+
+    # -- fixtures ------------------------------------------------------------
+
+    def cycle(self, values, count, start=0):
+        return [values[(start + index) % len(values)] for index in range(count)]
+
+    def new_tasks(self, count):
+        return [self.supabase.insert_row('tasks', {
+            'submission_id': None, 'casenumber': f'BENCH-{index}', 'title': 'Benchmark task',
+            'owner': 'Bench', 'stage': STAGES[0], 'completion_status': 'In Progress', 'attachments': [],
+        })['id'] for index in range(count)]
+
+    def new_meetings(self, count):
+        return [self.supabase.insert_row('meetings', {
+            'number': 10_000 + index, 'date': '2026-10-18T10:00:00+00:00', 'location': 'A4Y-117',
+            'is_completed': False,
+        })['id'] for index in range(count)]
+
+    def agenda(self, meeting_id):
+        rows = self.supabase.lookup('meeting_tasks', ('meeting_id',), (meeting_id,))
+        return [row['task_id'] for row in sorted(rows, key=lambda row: row['task_order'])]
+
+    def new_agenda_items(self, count):
+        meeting_id = self.new_meetings(1)[0]
+        task_ids = self.cycle(self.task_ids, count)
+        for order, task_id in enumerate(task_ids, start=1):
+            self.supabase.insert_row('meeting_tasks', {'meeting_id': meeting_id, 'task_id': task_id,
+                                                       'task_order': order, 'stage_at_meeting': STAGES[0],
+                                                       'minutes': None})
+        return [(meeting_id, task_id) for task_id in task_ids]
+
+    def rendered_jobs(self, client, count):
+        """Job ids of documents rendered in the background, waiting until they are done."""
+        jobs = []
+        for meeting_id in self.cycle(self.meeting_ids, min(count, 10), start=len(self.meeting_ids) // 2):
+            jobs.append(client.post(f'/meetings/{meeting_id}/documents/minutes').get_json()['id'])
+        for job_id in jobs:
+            while client.get(f'/jobs/{job_id}').get_json()['status'] not in ('done', 'failed'):
+                time.sleep(0.05)
+        return self.cycle(jobs, count)
+
+    # -- scenarios -----------------------------------------------------------
+
+    def scenarios(self):
+        tasks, meetings, cycle = self.task_ids, self.meeting_ids, self.cycle
+        middle = len(meetings) // 2
+        words = ' '.join(f'idea {index}' for index in range(3))
+        return [
+            # Reads
+            Scenario('GET /tasks', lambda c, _: read(c.get('/tasks')), share=0.1),
+            Scenario('GET /tasks', lambda c, after: read(c.get(f'/tasks?limit=50&after={after}')),
+                     setup=lambda b, n: cycle(tasks, n), label='GET /tasks?limit=50'),
+            Scenario('GET /tasks/search', lambda c, _: read(c.get('/tasks/search', query_string={'q': words}))),
+            Scenario('GET /analytics', lambda c, _: read(c.get('/analytics'))),
+            Scenario('GET /meetings', lambda c, _: read(c.get('/meetings')), share=0.2),
+            Scenario('GET /tasks/<int:task_id>/meetings', lambda c, task_id: read(c.get(f'/tasks/{task_id}/meetings')),
+                     setup=lambda b, n: cycle(tasks, n)),
+            Scenario('GET /meetings/<int:meeting_id>/generate_report',
+                     lambda c, meeting_id: read(c.get(f'/meetings/{meeting_id}/generate_report')),
+                     setup=lambda b, n: cycle(meetings, n), share=0.5),
+            Scenario('GET /meetings/<int:meeting_id>/generate_minutes',
+                     lambda c, meeting_id: read(c.get(f'/meetings/{meeting_id}/generate_minutes')),
+                     setup=lambda b, n: cycle(meetings, n), share=0.5),
+            Scenario('POST /meetings/<int:meeting_id>/documents/<kind>',
+                     lambda c, meeting_id: read(c.post(f'/meetings/{meeting_id}/documents/report')),
+                     setup=lambda b, n: cycle(meetings, n, start=middle), expect=(200, 202), share=0.5),
+            Scenario('GET /jobs/<job_id>', lambda c, job_id: read(c.get(f'/jobs/{job_id}')),
+                     setup=lambda b, n: b.rendered_jobs(b.client, n)),
+            Scenario('GET /jobs/<job_id>/result', lambda c, job_id: read(c.get(f'/jobs/{job_id}/result')),
+                     setup=lambda b, n: b.rendered_jobs(b.client, n)),
+            Scenario('GET /events', lambda c, _: first_event_chunk(c)),
+            Scenario('GET /metrics', lambda c, _: read(c.get('/metrics'))),
+            Scenario('GET /cache/stats', lambda c, _: read(c.get('/cache/stats'))),
+            Scenario('GET /export/tasks', lambda c, _: read(c.get('/export/tasks')), share=0.03,
+                     label='GET /export/tasks?format=csv'),
+            Scenario('GET /export/tasks', lambda c, _: read(c.get('/export/tasks?format=xlsx')), share=0.03,
+                     label='GET /export/tasks?format=xlsx'),
+            # Writes
+            Scenario('POST /tasks', lambda c, index: read(c.post('/tasks', json={
+                'casenumber': f'NEW-{index}', 'title': f'New idea {index}', 'owner': 'Bench',
+                'description': 'Benchmark', 'stage': STAGES[0],
+            })), expect=(201,)),
+            Scenario('PUT /tasks/<int:task_id>', lambda c, task_id: read(c.put(f'/tasks/{task_id}', json={
+                'title': f'Renamed {task_id}'})), setup=lambda b, n: cycle(tasks, n)),
+            Scenario('PUT /tasks/<int:task_id>/status', lambda c, task_id: read(c.put(
+                f'/tasks/{task_id}/status', json={'status': 'In Progress'})), setup=lambda b, n: cycle(tasks, n)),
+            Scenario('POST /tasks/<int:task_id>/upload', lambda c, task_id: read(c.post(
+                f'/tasks/{task_id}/upload', content_type='multipart/form-data',
+                data={'file': (io.BytesIO(os.urandom(UPLOAD_SIZE)), 'idea.pdf', 'application/pdf')},
+            )), setup=lambda b, n: cycle(tasks, n)),
+            Scenario('POST /meetings', lambda c, index: read(c.post('/meetings', json={
+                'number': 20_000 + index, 'date': '2026-11-01T10:00:00Z', 'location': 'A4Y-117',
+            })), expect=(201,)),
+            Scenario('PUT /meetings/<int:meeting_id>', lambda c, meeting_id: read(c.put(
+                f'/meetings/{meeting_id}', json={'location': 'A2-015'})), setup=lambda b, n: cycle(meetings, n)),
+            Scenario('POST /meetings/<int:meeting_id>/tasks', lambda c, meeting_id: read(c.post(
+                f'/meetings/{meeting_id}/tasks', json={'task_id': tasks[meeting_id % len(tasks)]})),
+                setup=lambda b, n: b.new_meetings(n), expect=(201,)),
+            Scenario('PUT /meetings/<int:meeting_id>/reorder', lambda c, meeting_id: read(c.put(
+                f'/meetings/{meeting_id}/reorder', json={'new_order': self.agenda(meeting_id)[::-1], 'diff': True})),
+                setup=lambda b, n: cycle(meetings, n)),
+            Scenario('PUT /meetings/<int:meeting_id>/tasks/<int:task_id>', lambda c, item: read(c.put(
+                f'/meetings/{item[0]}/tasks/{item[1]}', json={'minutes': 'Discussed; revisit next meeting.'})),
+                setup=lambda b, n: [(meeting_id, b.agenda(meeting_id)[0]) for meeting_id in cycle(meetings, n)]),
+            Scenario('PUT /meetings/<int:meeting_id>/complete', lambda c, meeting_id: read(c.put(
+                f'/meetings/{meeting_id}/complete')), setup=lambda b, n: b.new_meetings(n)),
+            # Deletes, of rows made for the purpose
+            Scenario('DELETE /meetings/<int:meeting_id>/tasks/<int:task_id>', lambda c, item: read(c.delete(
+                f'/meetings/{item[0]}/tasks/{item[1]}')), setup=lambda b, n: b.new_agenda_items(n), expect=(204,)),
+            Scenario('DELETE /meetings/<int:meeting_id>', lambda c, meeting_id: read(c.delete(
+                f'/meetings/{meeting_id}')), setup=lambda b, n: b.new_meetings(n), expect=(204,)),
+            Scenario('DELETE /tasks/<int:task_id>', lambda c, task_id: read(c.delete(f'/tasks/{task_id}')),
+                     setup=lambda b, n: b.new_tasks(n), expect=(204,)),
+            # Last, as it adds every submission as a task: the first request is
+            # the full import, the rest are incremental imports with nothing new
+            Scenario('POST /import-nettskjema', lambda c, _: read(c.post('/import-nettskjema')),
+                     share=0.05, concurrency=1),
+        ]
+
+    # -- measuring -------------------------------------------------------------
+
+    def upstream_calls(self):
+        return len(self.supabase.calls), len(self.nettskjema.calls)
+
+    def run(self, scenario, app):
+        count = max(1, round(self.args.requests * scenario.share))
+        requests = scenario.setup(self, count + 2) if scenario.setup else list(range(count + 2))
+        local = threading.local()
+
+        def send(arg):
+            if not hasattr(local, 'client'):
+                local.client = app.test_client()
+            started = time.perf_counter()
+            response = scenario.send(local.client, arg)
+            return time.perf_counter() - started, response.status_code
+
+        def check(status):
+            if status not in scenario.expect:
+                raise AssertionError(f"{scenario.label}: status {status}, expected {scenario.expect}")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        calls_before = self.upstream_calls()
+        first_seconds, status = send(requests[0])
+        check(status)
+        first_calls = [after - before for after, before in zip(self.upstream_calls(), calls_before)]
+
+        tracemalloc.start()
+        _, status = send(requests[1])
+        alloc_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        check(status)
+
+        calls_before = self.upstream_calls()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(scenario.concurrency or self.args.concurrency) as pool:
+            results = list(pool.map(send, requests[2:]))
+        elapsed = time.perf_counter() - started
+        calls = [after - before for after, before in zip(self.upstream_calls(), calls_before)]
+
+        latencies = sorted(seconds for seconds, _ in results)
+        errors = sum(1 for _, status in results if status not in scenario.expect)
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 \
+            else latencies * 99
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {
+            'route': scenario.label,
+            'requests': len(results),
+            'errors': errors,
+            'rps': round(len(results) / elapsed, 1),
+            'p50_ms': round(quantiles[49] * 1000, 2),
+            'p95_ms': round(quantiles[94] * 1000, 2),
+            'p99_ms': round(quantiles[98] * 1000, 2),
+            'first_ms': round(first_seconds * 1000, 2),
+            'first_supabase_calls': first_calls[0],
+            'first_nettskjema_calls': first_calls[1],
+            'supabase_calls': round(calls[0] / len(results), 2),
+            'nettskjema_calls': round(calls[1] / len(results), 2),
+            'alloc_kib': round(alloc_peak / 1024, 1),
+            'rss_mb': round(rss / 1024, 1),
+            'rss_growth_mb': round((rss - rss_before) / 1024, 1),
+        }
+
+
+def missing_routes(app, scenarios):
+    covered = {scenario.rule for scenario in scenarios}
+    return sorted(
+        f'{method} {rule.rule}'
+        for rule in app.url_map.iter_rules() if rule.endpoint != 'static'
+        for method in rule.methods - {'HEAD', 'OPTIONS'}
+        if f'{method} {rule.rule}' not in covered
+    )
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                                  capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f'{revision}-dirty' if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, out):
+    print(f"{'route':<56} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'first':>9} "
+          f"{'sb':>6} {'ns':>6} {'alloc KiB':>10} {'err':>4}", file=out)
+    for r in results:
+        print(f"{r['route']:<56} {r['rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} "
+              f"{r['first_ms']:9.1f} {r['supabase_calls']:6.2f} {r['nettskjema_calls']:6.2f} "
+              f"{r['alloc_kib']:10.1f} {r['errors']:4d}", file=out)
+
+
+def compare(report, baseline, tolerance, min_delta_ms, out):
+    """Print each route's change from ``baseline`` and return the regressions.
+
+    A p95 only counts as slower if it grew by more than ``min_delta_ms``
+    as well, so sub-millisecond routes don't fail on scheduling noise.
+    """
+    before = {result['route']: result for result in baseline['routes']}
+    regressions = []
+    print(f"\nagainst {baseline.get('revision')} ({tolerance:.0%} tolerance)", file=out)
+    for setting in ('dataset', 'latency_ms', 'concurrency', 'read_cache_ttl', 'cpus'):
+        if baseline.get(setting) != report.get(setting):
+            print(f"warning: {setting} differs: {baseline.get(setting)} -> {report.get(setting)}", file=out)
+    print(f"{'route':<56} {'rps':>17} {'p95 ms':>18} {'supabase':>13} {'alloc KiB':>21}", file=out)
+    for result in report['routes']:
+        old = before.get(result['route'])
+        if old is None:
+            print(f"{result['route']:<56} (new)", file=out)
+            continue
+        slower = result['p95_ms'] > max(old['p95_ms'] * (1 + tolerance), old['p95_ms'] + min_delta_ms)
+        fewer = result['rps'] < old['rps'] * (1 - tolerance)
+        chattier = result['supabase_calls'] > old['supabase_calls'] or \
+            result['nettskjema_calls'] > old['nettskjema_calls']
+        flag = ' <-' if slower or fewer or chattier else ''
+        if flag:
+            regressions.append(result['route'])
+        print(f"{result['route']:<56} {old['rps']:7.1f} {result['rps']:8.1f} {old['p95_ms']:9.1f} "
+              f"{result['p95_ms']:8.1f} {old['supabase_calls']:6.2f} {result['supabase_calls']:6.2f} "
+              f"{old['alloc_kib']:10.1f} {result['alloc_kib']:10.1f}{flag}", file=out)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10_000)
+    parser.add_argument('--meetings', type=int, default=500)
+    parser.add_argument('--tasks-per-meeting', type=int, default=20)
+    parser.add_argument('--answers', type=int, default=100_000, help='Nettskjema answers in the feed')
+    parser.add_argument('--attachment-every', type=int, default=50, help='one submission in N has an attachment')
+    parser.add_argument('--text-size', type=int, default=400)
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='per call, both upstreams')
+    parser.add_argument('--requests', type=int, default=100, help='timed requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--read-cache-ttl', type=float, default=0.0)
+    parser.add_argument('--routes', nargs='*', help='only routes containing one of these')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='JSON report of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='smallest p95 increase that counts')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-routes-')
+    os.environ.update({
+        'READ_CACHE_TTL': str(args.read_cache_ttl),
+        'LOG_LEVEL': 'WARNING',
+        'ARTIFACT_DIR': os.path.join(workdir, 'artifacts'),
+        'EVENTS_FILE': os.path.join(workdir, 'events', 'events.log'),
+        # Every client may hold a change feed open at once
+        'EVENT_STREAM_LIMIT': str(args.concurrency),
+    })
+    started = time.perf_counter()
+    bench = Bench(args)
+    seeded = time.perf_counter() - started
+    table_out = sys.stdout if args.output else sys.stderr
+    from app import app
+
+    scenarios = bench.scenarios()
+    missing = missing_routes(app, scenarios)
+    bench.client = app.test_client()
+    if args.routes:
+        scenarios = [s for s in scenarios if any(part in s.label for part in args.routes)]
+    results = []
+    for scenario in scenarios:
+        results.append(bench.run(scenario, app))
+        print(f"{scenario.label}: {results[-1]['rps']} req/s", file=sys.stderr)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'dataset': {'tasks': args.tasks, 'meetings': args.meetings, 'tasks_per_meeting': args.tasks_per_meeting,
+                    'answers': args.answers, 'attachment_every': args.attachment_every,
+                    'text_size': args.text_size},
+        'latency_ms': args.latency_ms,
+        'concurrency': args.concurrency,
+        'read_cache_ttl': args.read_cache_ttl,
+        'seed_seconds': round(seeded, 2),
+        'routes': results,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    print_table(results, table_out)
+    print(f"peak RSS {report['peak_rss_mb']} MiB", file=table_out)
+    status = 0
+    if missing:
+        print(f"FAIL: no scenario for {', '.join(missing)}", file=table_out)
+        status = 1
+    if any(result['errors'] for result in results):
+        print("FAIL: unexpected statuses", file=table_out)
+        status = 1
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta_ms, table_out)
+        if regressions:
+            print(f"FAIL: {len(regressions)} routes regressed", file=table_out)
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
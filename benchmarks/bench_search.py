@@ -0,0 +1,123 @@
+"""Search latency: GET /tasks/search against downloading every task and filtering.
+
+The baseline is what the board does today: fetch GET /tasks and keep the
+tasks whose free-text fields contain every query word. The indexed path asks
+GET /tasks/search for the first page of ranked results. Task texts are drawn
+from a Zipf-distributed vocabulary so common and rare words both occur.
+
+    python benchmarks/bench_search.py --tasks 20000 --latency-ms 2
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_supabase import start_fake
+from search import FIELD_WEIGHTS, tokenize
+
+SEARCH_BUDGET_MS = 50
+TEXT_FIELDS = ('title', 'description', 'relevance_for_bi', 'need_for_course', 'target_group',
+               'growth_potential', 'faculty_resources')
+
+
+def make_vocabulary(rng, size):
+    letters = 'abcdefghijklmnopqrstuvwxyzæøå'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def fill_texts(fake, rng, vocabulary, words_per_field):
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    for task in fake.tables['tasks']:
+        for field in TEXT_FIELDS:
+            count = 4 if field == 'title' else words_per_field
+            task[field] = ' '.join(rng.choices(vocabulary, weights, k=count))
+
+
+def client_side_search(client, words):
+    tasks = client.get('/tasks').get_json()
+    return [
+        task for task in tasks
+        if all(any(word in (task.get(field) or '').lower() for field in TEXT_FIELDS) for word in words)
+    ]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--words-per-field', type=int, default=40)
+    parser.add_argument('--latency-ms', type=float, default=2.0)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--baseline-queries', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    fake = start_fake(latency=args.latency_ms / 1000, tasks=args.tasks, meetings=0)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    fill_texts(fake, rng, vocabulary, args.words_per_field)
+    os.environ['EVENTS_FILE'] = os.path.join(tempfile.mkdtemp(), 'events.log')
+    os.environ['LOG_LEVEL'] = 'WARNING'
+    from app import app
+
+    client = app.test_client()
+    # Mix of frequent, mid-frequency and rare words, one or two per query
+    queries = [
+        ' '.join(rng.sample(vocabulary[:50] if n % 3 == 0 else vocabulary[50:1000] if n % 3 == 1 else vocabulary[1000:],
+                            1 + n % 2))
+        for n in range(args.queries)
+    ]
+
+    started = time.perf_counter()
+    response = client.get('/tasks/search', query_string={'q': queries[0]})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    build_seconds = time.perf_counter() - started
+
+    timings, sizes = [], []
+    for query in queries:
+        started = time.perf_counter()
+        response = client.get('/tasks/search', query_string={'q': query})
+        timings.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(response.data))
+
+    # The index must find exactly the tasks that contain a query word
+    for query in queries[:5]:
+        words = set(query.split())
+        expected = sum(
+            1 for task in fake.tables['tasks']
+            if words & {token for field in FIELD_WEIGHTS for token in tokenize(task.get(field))}
+        )
+        total = client.get('/tasks/search', query_string={'q': query}).get_json()['total']
+        assert total == expected, (query, total, expected)
+
+    baseline_timings, baseline_size = [], 0
+    for query in queries[:args.baseline_queries]:
+        started = time.perf_counter()
+        client_side_search(client, query.split())
+        baseline_timings.append((time.perf_counter() - started) * 1000)
+    baseline_size = len(client.get('/tasks').data)
+
+    print(f"{args.tasks} tasks, {args.latency_ms:g} ms simulated Supabase latency")
+    print(f"  index build (first search): {build_seconds * 1000:8.0f} ms")
+    print(f"  /tasks/search   p50 {statistics.median(timings):7.2f} ms  p95 {percentile(timings, 0.95):7.2f} ms  "
+          f"max {max(timings):7.2f} ms  ~{statistics.mean(sizes) / 1024:.1f} KiB per response")
+    print(f"  fetch + filter  p50 {statistics.median(baseline_timings):7.2f} ms  "
+          f"max {max(baseline_timings):7.2f} ms  {baseline_size / 2**20:.1f} MiB per search")
+
+    if percentile(timings, 0.95) > SEARCH_BUDGET_MS:
+        print(f"FAIL: p95 search latency above {SEARCH_BUDGET_MS} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Cold-start and throughput benchmark for the gunicorn worker profiles.
+
+The asgi profile runs asgi:app (async routes, Flask for the rest) under
+uvicorn workers; the others run the Flask app:app.
+
+Runs the app under gunicorn with gunicorn.conf.py against the fake Supabase
+(in its own process, with a configurable per-call latency) and reports:
+
+    startup  seconds from launching gunicorn to the first 200, per worker
+             profile, with and without preload; plus a bare `import app`
+    load     requests per second and latency percentiles for concurrent
+             clients reading GET /tasks with the read cache disabled, so
+             every request waits on the upstream
+
+    python benchmarks/bench_server.py --profiles gthread gevent sync asgi --seconds 10
+"""
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve_fake(latency):
+    from fake_supabase import start_fake
+
+    fake = start_fake(latency=latency, tasks=500, meetings=20, tasks_per_meeting=15, text_size=300)
+    print(json.dumps({'url': fake.url, 'key': os.environ['SUPABASE_KEY']}), flush=True)
+    threading.Event().wait()
+
+
+def start_fake_process(latency):
+    process = subprocess.Popen([sys.executable, __file__, '--serve-fake', '--latency', str(latency)],
+                               stdout=subprocess.PIPE, text=True)
+    return process, json.loads(process.stdout.readline())
+
+
+def app_env(fake, **extra):
+    env = dict(os.environ, SUPABASE_URL=fake['url'], SUPABASE_KEY=fake['key'], LOG_LEVEL='warning',
+               GUNICORN_ACCESS_LOG='', READ_CACHE_TTL='0', INDEX_WARMUP='false')
+    env.update({name: str(value) for name, value in extra.items()})
+    return env
+
+
+def start_gunicorn(env):
+    port = free_port()
+    env = dict(env, PORT=str(port))
+    module = 'asgi:app' if env.get('WORKER_PROFILE') == 'asgi' else 'app:app'
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', module],
+                               cwd=ROOT, env=env, stderr=subprocess.DEVNULL)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_ready(base_url, process, deadline=60):
+    start = time.perf_counter()
+    while time.perf_counter() - start < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            if requests.get(f"{base_url}/tasks?limit=1", timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except requests.RequestException:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError('gunicorn did not become ready')
+
+
+def stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def available(profile):
+    needs = {'gevent': 'gevent', 'asgi': 'uvicorn'}.get(profile)
+    return needs is None or importlib.util.find_spec(needs) is not None
+
+
+def bench_startup(fake, profiles, workers, repeat):
+    results = []
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import app'], cwd=ROOT, env=app_env(fake), check=True,
+                       stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    results.append({'case': 'python -c "import app"', 'seconds': round(min(timings), 3)})
+
+    for profile in profiles:
+        for preload in ('true', 'false'):
+            timings = []
+            for _ in range(repeat):
+                process, base_url = start_gunicorn(app_env(
+                    fake, WORKER_PROFILE=profile, WEB_CONCURRENCY=workers, GUNICORN_PRELOAD=preload))
+                try:
+                    timings.append(wait_ready(base_url, process))
+                finally:
+                    stop(process)
+            results.append({'case': f"{profile} preload={preload}", 'seconds': round(min(timings), 3)})
+    return results
+
+
+def client_loop(base_url, path, until, latencies, errors):
+    session = requests.Session()
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        try:
+            response = session.get(f"{base_url}{path}", timeout=30)
+            response.content
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except requests.RequestException as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def bench_load(fake, profiles, workers, clients, seconds, path):
+    results = []
+    for profile in profiles:
+        process, base_url = start_gunicorn(app_env(fake, WORKER_PROFILE=profile, WEB_CONCURRENCY=workers))
+        try:
+            wait_ready(base_url, process)
+            # Warm every worker's connections before measuring
+            warm_until = time.perf_counter() + 1
+            threads = [threading.Thread(target=client_loop, args=(base_url, path, warm_until, [], []))
+                       for _ in range(clients)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            latencies, errors = [], []
+            until = time.perf_counter() + seconds
+            threads = [threading.Thread(target=client_loop, args=(base_url, path, until, latencies, errors))
+                       for _ in range(clients)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            stop(process)
+        latencies.sort()
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+        results.append({
+            'profile': profile,
+            'requests': len(latencies),
+            'errors': len(errors),
+            'rps': round(len(latencies) / seconds, 1),
+            'p50_ms': round(quantiles[49] * 1000, 1),
+            'p95_ms': round(quantiles[94] * 1000, 1),
+            'p99_ms': round(quantiles[98] * 1000, 1),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', default=['sync', 'gthread', 'gevent', 'asgi'])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--latency', type=float, default=0.02, help='fake Supabase latency per call, seconds')
+    parser.add_argument('--path', default='/tasks?limit=50')
+    parser.add_argument('--repeat', type=int, default=3, help='startup runs per case (best is reported)')
+    parser.add_argument('--skip', choices=['startup', 'load'])
+    parser.add_argument('--serve-fake', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_fake:
+        serve_fake(args.latency)
+        return 0
+
+    profiles = [profile for profile in args.profiles if available(profile)]
+    for profile in set(args.profiles) - set(profiles):
+        print(f"skipping {profile}: not installed")
+
+    fake_process, fake = start_fake_process(args.latency)
+    try:
+        if args.skip != 'startup':
+            print(f"startup ({args.workers} workers, best of {args.repeat})")
+            for result in bench_startup(fake, profiles, args.workers, args.repeat):
+                print(f"  {result['case']:<28} {result['seconds']:6.3f} s")
+        if args.skip != 'load':
+            print(f"load: GET {args.path}, {args.clients} clients, {args.seconds:g}s, "
+                  f"{args.workers} workers, upstream latency {args.latency * 1000:g} ms")
+            for result in bench_load(fake, profiles, args.workers, args.clients, args.seconds, args.path):
+                print(f"  {result['profile']:<8} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:6.1f} ms  "
+                      f"p95 {result['p95_ms']:6.1f} ms  p99 {result['p99_ms']:6.1f} ms  errors {result['errors']}")
+    finally:
+        stop(fake_process)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Micro-benchmark for transform_submission_to_task.
+
+Compares the compiled elementId -> field lookup with the previous chain of
+elif branches (kept below as a reference) over synthetic submissions, and
+checks that both produce identical tasks.
+
+    python benchmarks/bench_transform.py --submissions 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_nettskjema import FakeNettskjema
+from fake_supabase import start_fake
+
+
+def legacy_transform(submission, element_mapping, api_url):
+    task = {
+        "submission_id": submission[0]['submissionId'],
+        "title": "",
+        "owner": "",
+        "description": "",
+        "relevance_for_bi": "",
+        "need_for_course": "",
+        "target_group": "",
+        "growth_potential": "",
+        "faculty_resources": "",
+        "stage": "Idea Description",
+        "completion_status": 'In Progress',
+        "attachment_url": None
+    }
+    for answer in submission:
+        element_id = str(answer.get('elementId'))
+        if element_id == str(element_mapping.get('Idea title')):
+            task['title'] = answer.get('textAnswer', '')
+        elif element_id == str(element_mapping.get('Idea Owner')):
+            task['owner'] = answer.get('textAnswer', '')
+        elif element_id == str(element_mapping.get('Briefly describe the idea:')):
+            task['description'] = answer.get('textAnswer', '')
+        elif element_id == str(element_mapping.get('Why is this relevant for BI?')):
+            task['relevance_for_bi'] = answer.get('textAnswer', '')
+        elif element_id == str(element_mapping.get('Why does individuals and/or organizations need such a course/idea?')):
+            task['need_for_course'] = answer.get('textAnswer', '')
+        elif element_id == str(element_mapping.get('What would be the relevant target group?')):
+            task['target_group'] = answer.get('textAnswer', '')
+        elif element_id == str(element_mapping.get('What are your thoughts on the future growth potential of the market for this course/idea?')):
+            task['growth_potential'] = answer.get('textAnswer', '')
+        elif element_id == str(element_mapping.get('Faculty resources – which academic departments should be involved?')):
+            task['faculty_resources'] = answer.get('textAnswer', '')
+        elif answer.get('answerAttachmentId'):
+            task['attachment_url'] = f"{api_url}/attachment/{answer.get('answerAttachmentId')}"
+    return task
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--submissions', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    start_fake()
+    import app
+
+    feed = FakeNettskjema(submissions=args.submissions, attachment_every=3, text_size=40)
+    submissions, current = [], []
+    for answer in feed.iter_answers():
+        if current and current[0]['submissionId'] != answer['submissionId']:
+            submissions.append(current)
+            current = []
+        current.append(answer)
+    submissions.append(current)
+
+    element_mapping = {element['text']: element['elementId'] for element in feed.elements}
+    element_fields = app.compile_element_mapper(feed.elements)
+    for submission in submissions[:100]:
+        expected = legacy_transform(submission, element_mapping, app.NETTSKJEMA_API_URL)
+        assert app.transform_submission_to_task(submission, element_fields) == expected
+
+    legacy = best_of(args.repeat, lambda: [
+        legacy_transform(s, element_mapping, app.NETTSKJEMA_API_URL) for s in submissions
+    ])
+    compiled = best_of(args.repeat, lambda: [
+        app.transform_submission_to_task(s, element_fields) for s in submissions
+    ])
+    compile_cost = best_of(args.repeat, lambda: app.compile_element_mapper(feed.elements))
+
+    answers = sum(len(s) for s in submissions)
+    print(f"{len(submissions)} submissions, {answers} answers")
+    print(f"elif chain : {legacy * 1000:8.1f} ms  ({legacy / answers * 1e9:6.0f} ns/answer)")
+    print(f"compiled   : {compiled * 1000:8.1f} ms  ({compiled / answers * 1e9:6.0f} ns/answer)")
+    print(f"speedup    : {legacy / compiled:8.1f}x")
+    print(f"cached compile_element_mapper call: {compile_cost * 1e6:.1f} us")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
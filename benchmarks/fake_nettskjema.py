@@ -0,0 +1,154 @@
+"""In-process stand-in for the Nettskjema OAuth, elements, answers and attachment APIs.
+
+Answers are generated lazily from a seed and streamed as NDJSON, so a feed of
+100k answers costs the fake no memory.
+"""
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+QUESTIONS = [
+    'Idea title',
+    'Idea Owner',
+    'Briefly describe the idea:',
+    'Why is this relevant for BI?',
+    'Why does individuals and/or organizations need such a course/idea?',
+    'What would be the relevant target group?',
+    'What are your thoughts on the future growth potential of the market for this course/idea?',
+    'Faculty resources – which academic departments should be involved?',
+]
+ATTACHMENT_ELEMENT = 'Attachment'
+
+
+class FakeNettskjema:
+    def __init__(self, submissions=100, first_submission_id=1, attachment_every=0,
+                 attachment_size=64 * 1024, text_size=300, latency=0.0, attachment_latency=0.0):
+        self.submissions = submissions
+        self.first_submission_id = first_submission_id
+        self.attachment_every = attachment_every
+        self.attachment_size = attachment_size
+        self.text_size = text_size
+        self.latency = latency
+        self.attachment_latency = attachment_latency
+        self.elements = [{'elementId': 100 + index, 'text': text} for index, text in enumerate(QUESTIONS)]
+        self.elements.append({'elementId': 200, 'text': ATTACHMENT_ELEMENT})
+        self.calls = []
+        self.tokens_issued = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def answers_per_submission(self):
+        return len(QUESTIONS) + (1 if self.attachment_every else 0)
+
+    def iter_answers(self):
+        rng = random.Random(42)
+        words = 'idea course market learning leadership data analytics sustainability finance'.split()
+        for offset in range(self.submissions):
+            submission_id = self.first_submission_id + offset
+            for element in self.elements[:len(QUESTIONS)]:
+                text = ' '.join(rng.choice(words) for _ in range(self.text_size // 8))
+                yield {'submissionId': submission_id, 'elementId': element['elementId'], 'textAnswer': text}
+            if self.attachment_every and offset % self.attachment_every == 0:
+                yield {'submissionId': submission_id, 'elementId': 200, 'answerAttachmentId': submission_id}
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # As in fake_supabase: no 40 ms delayed-ACK stall per response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type='application/json', headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                fake._record('POST', self.path)
+                with fake._lock:
+                    fake.tokens_issued += 1
+                token = {'access_token': f'token-{fake.tokens_issued}', 'token_type': 'Bearer', 'expires_in': 3600}
+                self._send(200, json.dumps(token).encode())
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                fake._record('GET', path)
+                if path.endswith('/elements'):
+                    self._send(200, json.dumps(fake.elements).encode())
+                elif path.endswith('/answers'):
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-ndjson')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    batch = []
+                    for answer in fake.iter_answers():
+                        batch.append(json.dumps(answer))
+                        if len(batch) == 200:
+                            self._chunk('\n'.join(batch) + '\n')
+                            batch = []
+                    if batch:
+                        self._chunk('\n'.join(batch) + '\n')
+                    self.wfile.write(b'0\r\n\r\n')
+                elif '/attachment/' in path:
+                    if fake.attachment_latency:
+                        time.sleep(fake.attachment_latency)
+                    name = path.rsplit('/', 1)[1]
+                    body = os.urandom(16) * (fake.attachment_size // 16)
+                    self._send(200, body, 'application/pdf',
+                               {'Content-Disposition': f'attachment; filename="idea-{name}.pdf"'})
+                else:
+                    self._send(404, b'{}')
+
+            def _chunk(self, text):
+                data = text.encode('utf-8')
+                self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def _record(self, method, path):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((method, path))
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+
+def start_fake_nettskjema(**options):
+    """Start the fake and point the NETTSKJEMA_* environment at it.
+
+    Must run before ``app`` is imported.
+    """
+    fake = FakeNettskjema(**options).start()
+    os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
+    os.environ['NETTSKJEMA_API_URL'] = f'{fake.url}/v3'
+    os.environ['NETTSKJEMA_AUTH_URL'] = f'{fake.url}/oauth2/token'
+    os.environ['NETTSKJEMA_CLIENT_ID'] = 'bench'
+    os.environ['NETTSKJEMA_CLIENT_SECRET'] = 'bench'
+    os.environ['NETTSKJEMA_FORM_ID'] = '1'
+    return fake
@@ -0,0 +1,543 @@
+"""In-process stand-in for the parts of Supabase/PostgREST that app.py uses.
+
+The fake serves real HTTP on localhost so the supabase client goes through its
+normal request path, and counts every round trip it receives. It only knows the
+three tables of the innovation board and the relationships between them.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+# (table, column) -> referenced table
+FOREIGN_KEYS = {
+    ('meeting_tasks', 'task_id'): 'tasks',
+    ('meeting_tasks', 'meeting_id'): 'meetings',
+}
+
+UNIQUE_KEYS = {
+    'tasks': [('id',), ('submission_id',)],
+    'meetings': [('id',)],
+    'meeting_tasks': [('id',), ('meeting_id', 'task_id')],
+    'nettskjema_imports': [('form_id',)],
+}
+
+STAGES = ['Idea Description', 'Market Analysis', 'Business Case', 'Completed']
+STATUSES = ['In Progress', 'Completed and Approved', 'Stopped', 'Not Approved']
+
+# A dummy JWT-shaped key; create_client only checks the format
+FAKE_KEY = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.ZmFrZQ'
+
+
+class FakeError(Exception):
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _split_top_level(value, sep=','):
+    parts, depth, current = [], 0, ''
+    for char in value:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == sep and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _coerce(raw, like):
+    if raw == 'null':
+        return None
+    if isinstance(like, bool):
+        return raw == 'true'
+    if isinstance(like, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    if isinstance(like, float):
+        return float(raw)
+    return raw.strip('"')
+
+
+def _matches(row, column, expression):
+    negate = expression.startswith('not.')
+    if negate:
+        expression = expression[4:]
+    operator, _, raw = expression.partition('.')
+    value = row.get(column)
+    if operator == 'is':
+        result = value is None if raw == 'null' else value is (raw == 'true')
+    elif operator == 'in':
+        options = [_coerce(item, value) for item in _split_top_level(raw.strip('()'))]
+        result = value in options
+    else:
+        target = _coerce(raw, value)
+        if operator in ('eq', 'neq'):
+            result = value == target
+            if operator == 'neq':
+                result = not result
+        elif value is None or target is None:
+            result = False
+        elif operator == 'gt':
+            result = value > target
+        elif operator == 'gte':
+            result = value >= target
+        elif operator == 'lt':
+            result = value < target
+        elif operator == 'lte':
+            result = value <= target
+        else:
+            raise FakeError(400, 'PGRST100', f'Unsupported operator: {operator}')
+    return not result if negate else result
+
+
+def _is_float(raw):
+    if raw.lstrip('-').isdigit():
+        return False
+    try:
+        float(raw)
+        return True
+    except ValueError:
+        return False
+
+
+def bump_task_version(row):
+    row['version'] = row.get('version', 1) + 1
+
+
+# Column defaults and BEFORE UPDATE triggers from supabase/migrations, by table
+DEFAULTS = {
+    'tasks': {'version': 1},
+}
+TRIGGERS = {
+    'tasks': bump_task_version,
+}
+
+
+def append_task_attachment(fake, task_id, attachment):
+    for row in fake.lookup('tasks', ('id',), (task_id,)):
+        row['attachments'] = (row.get('attachments') or []) + [attachment]
+        bump_task_version(row)
+        return row['attachments']
+    return None
+
+
+def add_tasks_to_meeting(fake, meeting_id, task_ids):
+    meeting = next(iter(fake.lookup('meetings', ('id',), (meeting_id,))), None)
+    if meeting is None:
+        return {'status': 'meeting_not_found'}
+    if meeting.get('is_completed'):
+        return {'status': 'meeting_completed'}
+    tasks = {task_id: row for task_id in task_ids for row in fake.lookup('tasks', ('id',), (task_id,))}
+    missing = sorted({task_id for task_id in task_ids if task_id not in tasks})
+    if missing:
+        return {'status': 'tasks_not_found', 'task_ids': missing}
+    agenda = list(fake.lookup('meeting_tasks', ('meeting_id',), (meeting_id,)))
+    present = {row['task_id'] for row in agenda}
+    last_order = max((row['task_order'] for row in agenda), default=0)
+    added = []
+    for task_id in task_ids:
+        if task_id in present:
+            continue
+        present.add(task_id)
+        last_order += 1
+        added.append(dict(fake.insert_row('meeting_tasks', {
+            'meeting_id': meeting_id,
+            'task_id': task_id,
+            'task_order': last_order,
+            'stage_at_meeting': tasks[task_id]['stage'],
+            'minutes': None,
+        })))
+    return {'status': 'ok', 'added': added}
+
+
+# Emulations of the functions in supabase/migrations, by name
+RPCS = {
+    'append_task_attachment': append_task_attachment,
+    'add_tasks_to_meeting': add_tasks_to_meeting,
+}
+
+
+class FakeSupabase:
+    """Table store plus a localhost HTTP server speaking the PostgREST dialect."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = {table: [] for table in UNIQUE_KEYS}
+        self.rpcs = dict(RPCS)
+        # (bucket, path) -> (size, content type); object bodies are not kept
+        self.objects = {}
+        self.calls = []
+        self._next_id = {}
+        # (table, columns) -> {values: [rows]}, built on first lookup and
+        # kept up to date by every write, so seeded datasets of 10k+ rows
+        # don't make conflict checks and embeds quadratic
+        self._indexes = {}
+        self._lock = threading.RLock()
+        self._server = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; don't hold the body
+            # back until the client's delayed ACK of the headers
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _read_body(self):
+                if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                    body = bytearray()
+                    while True:
+                        size = int(self.rfile.readline().split(b';')[0], 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return bytes(body)
+                        body += self.rfile.read(size)
+                        self.rfile.readline()
+                length = int(self.headers.get('Content-Length') or 0)
+                return self.rfile.read(length) if length else b''
+
+            def _dispatch(self):
+                body = self._read_body()
+                status, headers, payload = fake.handle(self.command, self.path, self.headers, body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = do_PUT = _dispatch
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    # -- round trip accounting --------------------------------------------
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls = []
+
+    def call_count(self, prefix=''):
+        return sum(1 for _, path in self.calls if path.startswith(prefix))
+
+    # -- data --------------------------------------------------------------
+
+    def insert_row(self, table, row):
+        with self._lock:
+            row = {**DEFAULTS.get(table, {}), **row}
+            if 'id' not in row or row['id'] is None:
+                row['id'] = self._next_id.get(table, 1)
+            self._next_id[table] = max(self._next_id.get(table, 1), row['id'] + 1)
+            self.tables[table].append(row)
+            self._index_add(table, row)
+            return row
+
+    def update_row(self, table, row, changes):
+        with self._lock:
+            self._index_remove(table, row)
+            row.update(changes)
+            if table in TRIGGERS:
+                TRIGGERS[table](row)
+            self._index_add(table, row)
+
+    def lookup(self, table, columns, values):
+        """Rows of ``table`` whose ``columns`` equal ``values`` (both tuples)."""
+        with self._lock:
+            index = self._indexes.get((table, columns))
+            if index is None:
+                index = self._indexes[(table, columns)] = {}
+                for row in self.tables[table]:
+                    index.setdefault(tuple(row.get(column) for column in columns), []).append(row)
+            return index.get(values, [])
+
+    def _index_add(self, table, row):
+        for (indexed, columns), index in self._indexes.items():
+            if indexed == table:
+                index.setdefault(tuple(row.get(column) for column in columns), []).append(row)
+
+    def _index_remove(self, table, row):
+        for (indexed, columns), index in self._indexes.items():
+            if indexed == table:
+                rows = index.get(tuple(row.get(column) for column in columns), [])
+                for position, candidate in enumerate(rows):
+                    if candidate is row:
+                        del rows[position]
+                        break
+
+    def seed(self, tasks=100, meetings=10, tasks_per_meeting=10, text_size=400, rng=None):
+        rng = rng or random.Random(1234)
+        filler = ('lorem ipsum dolor sit amet consectetur adipiscing elit ' * (text_size // 50 + 1))[:text_size]
+        for number in range(1, tasks + 1):
+            self.insert_row('tasks', {
+                'submission_id': 1000 + number,
+                'casenumber': f'IB-{number:05d}',
+                'title': f'Idea {number}',
+                'owner': f'Owner {number % 37}',
+                'description': filler,
+                'relevance_for_bi': filler,
+                'need_for_course': filler,
+                'target_group': filler,
+                'growth_potential': filler,
+                'faculty_resources': filler,
+                'stage': rng.choice(STAGES),
+                'completion_status': rng.choice(STATUSES),
+                'attachment_url': None,
+                'attachments': [],
+            })
+        task_ids = [task['id'] for task in self.tables['tasks']]
+        for number in range(1, meetings + 1):
+            meeting = self.insert_row('meetings', {
+                'number': number,
+                'date': f'{2020 + number // 12:04d}-{number % 12 + 1:02d}-15T10:00:00+00:00',
+                'location': 'A4Y-117',
+                'is_completed': False,
+            })
+            for order, task_id in enumerate(rng.sample(task_ids, min(tasks_per_meeting, len(task_ids))), start=1):
+                self.insert_row('meeting_tasks', {
+                    'meeting_id': meeting['id'],
+                    'task_id': task_id,
+                    'task_order': order,
+                    'stage_at_meeting': rng.choice(STAGES),
+                    'minutes': None,
+                })
+        return self
+
+    # -- request handling --------------------------------------------------
+
+    def handle(self, method, raw_path, headers, body):
+        if self.latency:
+            time.sleep(self.latency)
+        parts = urlsplit(raw_path)
+        path = unquote(parts.path)
+        with self._lock:
+            self.calls.append((method, path))
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        try:
+            if path.startswith('/storage/v1/'):
+                status, result = self._storage(method, path[len('/storage/v1/'):], headers, body)
+                return status, {'Content-Type': 'application/json'}, json.dumps(result).encode()
+            payload = json.loads(body) if body else None
+            if path.startswith('/rest/v1/rpc/'):
+                status, result = self._rpc(path.rsplit('/', 1)[1], payload or {})
+            elif path.startswith('/rest/v1/'):
+                status, result = self._rest(method, path[len('/rest/v1/'):], params, headers, payload)
+            else:
+                raise FakeError(404, 'PGRST000', f'Unknown path {path}')
+        except FakeError as e:
+            error = {'code': e.code, 'message': e.message, 'details': None, 'hint': None}
+            return e.status, {'Content-Type': 'application/json'}, json.dumps(error).encode()
+        if result is None:
+            return status, {}, b''
+        return status, {'Content-Type': 'application/json'}, json.dumps(result).encode()
+
+    def _storage(self, method, path, headers, body):
+        kind, _, rest = path.partition('/')
+        if kind != 'object':
+            raise FakeError(404, '404', f'Unknown storage path {path}')
+        bucket, _, name = rest.partition('/')
+        with self._lock:
+            if method == 'POST':
+                if (bucket, name) in self.objects and headers.get('x-upsert') != 'true':
+                    raise FakeError(409, 'Duplicate', 'The resource already exists')
+                self.objects[(bucket, name)] = (len(body), headers.get('Content-Type'))
+                return 200, {'Key': f'{bucket}/{name}'}
+            if method in ('GET', 'HEAD') and (bucket, name) in self.objects:
+                size, content_type = self.objects[(bucket, name)]
+                return 200, {'name': name, 'size': size, 'contentType': content_type}
+        raise FakeError(404, 'not_found', 'Object not found')
+
+    def _rpc(self, name, payload):
+        if name not in self.rpcs:
+            raise FakeError(404, 'PGRST202', f'Could not find the function {name}')
+        with self._lock:
+            return 200, self.rpcs[name](self, **payload)
+
+    def _rest(self, method, table, params, headers, payload):
+        if table not in self.tables:
+            raise FakeError(404, '42P01', f'relation "{table}" does not exist')
+        prefer = headers.get('Prefer', '') or ''
+        select = '*'
+        filters, order, limit, offset, on_conflict = [], None, None, 0, None
+        for name, value in params:
+            if name == 'select':
+                select = value
+            elif name == 'order':
+                order = value
+            elif name == 'limit':
+                limit = int(value)
+            elif name == 'offset':
+                offset = int(value)
+            elif name == 'on_conflict':
+                on_conflict = tuple(column.strip() for column in value.split(','))
+            elif name == 'columns' or '.' in name:
+                continue
+            else:
+                filters.append((name, value))
+
+        with self._lock:
+            if method in ('GET', 'HEAD'):
+                rows = [row for row in self._candidates(table, filters) if all(_matches(row, c, e) for c, e in filters)]
+                rows = self._order(rows, order)
+                rows = rows[offset:offset + limit if limit is not None else None]
+                return 200, [self._project(table, row, select) for row in rows]
+            if method == 'POST':
+                rows = payload if isinstance(payload, list) else [payload]
+                written = self._insert(table, rows, prefer, on_conflict)
+            elif method == 'PATCH':
+                written = []
+                for row in self._candidates(table, filters):
+                    if all(_matches(row, c, e) for c, e in filters):
+                        self.update_row(table, row, payload)
+                        written.append(row)
+            elif method == 'DELETE':
+                written = [row for row in self._candidates(table, filters) if all(_matches(row, c, e) for c, e in filters)]
+                for row in written:
+                    self._delete(table, row)
+            else:
+                raise FakeError(405, 'PGRST117', f'Unsupported method {method}')
+            status = 201 if method == 'POST' else 200
+            if 'return=minimal' in prefer:
+                return status, None
+            return status, [self._project(table, row, select) for row in written]
+
+    def _candidates(self, table, filters):
+        """The rows ``filters`` can match, narrowed through an index by the first
+        ``eq`` or ``in`` filter on integer or plain string values."""
+        for column, expression in filters:
+            operator, _, raw = expression.partition('.')
+            if operator == 'eq':
+                values = [raw]
+            elif operator == 'in':
+                values = _split_top_level(raw.strip('()'))
+            else:
+                continue
+            values = [value.strip('"') for value in values]
+            if any(value in ('true', 'false', 'null') or _is_float(value) for value in values):
+                continue
+            rows = {}
+            for value in values:
+                # Ids are numbers in the table but text in the query string
+                keys = [value, int(value)] if value.lstrip('-').isdigit() else [value]
+                for key in keys:
+                    for row in self.lookup(table, (column,), (key,)):
+                        rows[id(row)] = row
+            return list(rows.values())
+        return list(self.tables[table])
+
+    def _insert(self, table, rows, prefer, on_conflict):
+        written = []
+        for row in rows:
+            existing = self._find_conflict(table, row, on_conflict)
+            if existing is None:
+                written.append(self.insert_row(table, row))
+            elif 'resolution=ignore-duplicates' in prefer:
+                continue
+            elif 'resolution=merge-duplicates' in prefer:
+                self.update_row(table, existing, row)
+                written.append(existing)
+            else:
+                raise FakeError(409, '23505', f'duplicate key value violates unique constraint on "{table}"')
+        return written
+
+    def _find_conflict(self, table, row, on_conflict):
+        keys = [on_conflict] if on_conflict else UNIQUE_KEYS[table]
+        for key in keys:
+            if any(row.get(column) is None for column in key):
+                continue
+            for existing in self.lookup(table, key, tuple(row[column] for column in key)):
+                return existing
+        return None
+
+    def _delete(self, table, row):
+        self.tables[table].remove(row)
+        self._index_remove(table, row)
+        for (child, column), parent in FOREIGN_KEYS.items():
+            if parent == table:
+                for dependent in list(self.lookup(child, (column,), (row['id'],))):
+                    self._delete(child, dependent)
+
+    @staticmethod
+    def _order(rows, order):
+        if not order:
+            return rows
+        for term in reversed(_split_top_level(order)):
+            if '(' in term:
+                continue
+            column, *modifiers = term.split('.')
+            rows = sorted(
+                rows,
+                key=lambda r: (r.get(column) is None, r.get(column) if r.get(column) is not None else 0),
+                reverse='desc' in modifiers,
+            )
+        return rows
+
+    def _project(self, table, row, select):
+        result = {}
+        for item in _split_top_level(select):
+            if '(' in item:
+                name, inner = item.split('(', 1)
+                alias, _, relation = name.rpartition(':')
+                relation = relation.split('!')[0].strip()
+                result[alias or relation] = self._embed(table, row, relation, inner[:-1])
+            elif item == '*':
+                result.update(row)
+            else:
+                alias, _, column = item.rpartition(':')
+                result[alias or column] = row.get(column)
+        return result
+
+    def _embed(self, table, row, relation, select):
+        for (child, column), parent in FOREIGN_KEYS.items():
+            if child == table and parent == relation:
+                target = next(iter(self.lookup(relation, ('id',), (row.get(column),))), None)
+                return self._project(relation, target, select) if target else None
+            if child == relation and parent == table:
+                return [self._project(relation, r, select) for r in self.lookup(relation, (column,), (row['id'],))]
+        raise FakeError(400, 'PGRST200', f'Could not find a relationship between {table} and {relation}')
+
+
+def start_fake(latency=0.0, **dataset):
+    """Start a seeded fake and point the SUPABASE_* environment at it.
+
+    Must run before ``app`` is imported so the module-level client picks it up.
+    """
+    import os
+
+    fake = FakeSupabase(latency=latency).start()
+    if dataset:
+        fake.seed(**dataset)
+    os.environ['SUPABASE_URL'] = fake.url
+    os.environ['SUPABASE_KEY'] = FAKE_KEY
+    return fake
@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # optional; responses fall back to gzip
+    brotli = None
+
+
+class JsonPayload:
+    """A query result with its JSON body, strong ETag and compressed bodies.
+
+    Each of these is computed at most once and kept with the payload in the
+    cache, so a repeated poll only costs a dictionary lookup.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._body = None
+        self._etag = None
+        self._encoded = {}
+
+    @property
+    def body(self):
+        if self._body is None:
+            self._body = json.dumps(self.data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        return self._body
+
+    @property
+    def nbytes(self):
+        """Size of the JSON body, the measure ReadCache's ``max_bytes`` counts."""
+        return len(self.body)
+
+    @property
+    def etag(self):
+        """Content hash of the JSON body, unquoted."""
+        if self._etag is None:
+            self._etag = hashlib.sha256(self.body).hexdigest()[:32]
+        return self._etag
+
+    def encoded(self, encoding):
+        """Return the body compressed with ``'br'`` or ``'gzip'``."""
+        if encoding not in self._encoded:
+            if encoding == 'br':
+                self._encoded[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self._encoded[encoding]
+
+
+class ReadCache:
+    """Thread-safe TTL + LRU cache for the results of read queries.
+
+    Keys are tuples whose first element is a namespace such as ``'tasks'`` or
+    ``'meetings'``. Mutation handlers call :meth:`invalidate` with the
+    namespaces (or exact keys) they touch. Every namespace has a generation
+    counter, so a load that was already running when its namespace was
+    invalidated is returned to its caller but not stored.
+
+    ``maxsize`` bounds the number of entries and ``max_bytes`` (when set)
+    the sum of the values' ``nbytes``; least recently used entries go first,
+    and a value larger than ``max_bytes`` on its own is not stored.
+
+    The cache lives in one worker process; other workers only see a change
+    once their own entries expire, so ``ttl`` bounds how stale a read can be
+    unless they are told to invalidate too (app.py does that from the change
+    feed).
+    """
+
+    def __init__(self, ttl=30.0, maxsize=256, max_bytes=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for ``key``, or None when absent/expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss."""
+        if self.ttl <= 0:
+            return loader()
+        value, generation = self._lookup(key)
+        if value is None:
+            value = loader()
+            self._store(key, generation, value)
+        return value
+
+    async def aget_or_load(self, key, loader):
+        """:meth:`get_or_load` for a coroutine function ``loader``."""
+        if self.ttl <= 0:
+            return await loader()
+        value, generation = self._lookup(key)
+        if value is None:
+            value = await loader()
+            self._store(key, generation, value)
+        return value
+
+    def _lookup(self, key):
+        value = self.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                return value, None
+            self.misses += 1
+            return None, self._generations.get(key[0], 0)
+
+    def _store(self, key, generation, value):
+        nbytes = value.nbytes if self.max_bytes else 0
+        if self.max_bytes and nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if self._generations.get(key[0], 0) == generation:
+                self._drop(key)
+                self._entries[key] = (time.monotonic() + self.ttl, value, nbytes)
+                self._bytes += nbytes
+                while len(self._entries) > self.maxsize or (self.max_bytes and self._bytes > self.max_bytes):
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+
+    def _drop(self, key):
+        # Called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def invalidate(self, *targets):
+        """Drop cached entries.
+
+        Each target is either a namespace string, which drops every key in it,
+        or a full key tuple, which drops just that entry.
+        """
+        with self._lock:
+            for target in targets:
+                self.invalidations += 1
+                namespace = target[0] if isinstance(target, tuple) else target
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                if isinstance(target, tuple):
+                    self._drop(target)
+                else:
+                    for key in [k for k in self._entries if k[0] == target]:
+                        self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            for namespace in {key[0] for key in self._entries}:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+            }
@@ -0,0 +1,169 @@
+import os
+import re
+import struct
+import time
+import zipfile
+import zlib
+from importlib.util import find_spec
+from xml.sax.saxutils import escape
+
+CHUNK_SIZE = 64 * 1024
+DOCUMENT_PART = 'word/document.xml'
+INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f￾￿]')
+PAGE_BREAK = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+
+def default_template_path():
+    """The blank template that ships with python-docx (same styles as Document())."""
+    return os.path.join(find_spec('docx').submodule_search_locations[0], 'templates', 'default.docx')
+
+
+def _dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+class DocxTemplate:
+    """A .docx template parsed once and rendered many times by streaming.
+
+    Every part of the template except ``word/document.xml`` is kept as the raw
+    compressed bytes from the template archive, so rendering never touches
+    styles, themes or fonts again. The document body is written as
+    WordprocessingML straight into a deflate stream, and the archive is
+    produced as a sequence of byte chunks that can be sent as they are made.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parts = []
+        with open(path, 'rb') as f, zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.filename == DOCUMENT_PART:
+                    document = archive.read(info).decode('utf-8')
+                    continue
+                f.seek(info.header_offset)
+                header = f.read(30)
+                name_length, extra_length = struct.unpack('<HH', header[26:30])
+                f.seek(info.header_offset + 30 + name_length + extra_length)
+                raw = f.read(info.compress_size)
+                self.parts.append((info.filename.encode('utf-8'), info.compress_type, info.CRC,
+                                   info.compress_size, info.file_size, raw))
+            styles = archive.read('word/styles.xml').decode('utf-8')
+
+        body_start = document.index('<w:body>') + len('<w:body>')
+        self.document_head = document[:body_start]
+        self.section = re.search(r'<w:sectPr\b.*?</w:sectPr>', document, re.S).group(0)
+        self.style_ids = {
+            name.lower(): style_id
+            for style_id, name in re.findall(
+                r'<w:style\b[^>]*w:styleId="([^"]+)"[^>]*>\s*<w:name w:val="([^"]+)"', styles
+            )
+        }
+
+    # -- body markup -------------------------------------------------------
+
+    def style_id(self, name):
+        return self.style_ids.get(name.lower(), name.replace(' ', ''))
+
+    @staticmethod
+    def _run(text, bold=False, size=None):
+        props = ''
+        if bold:
+            props += '<w:b/>'
+        if size:
+            props += f'<w:sz w:val="{int(size * 2)}"/>'
+        text = INVALID_XML_CHARS.sub('', '' if text is None else str(text))
+        pieces = '<w:br/>'.join(
+            f'<w:t xml:space="preserve">{escape(line)}</w:t>' if line else ''
+            for line in text.split('\n')
+        )
+        return f'<w:r>{f"<w:rPr>{props}</w:rPr>" if props else ""}{pieces}</w:r>'
+
+    def paragraph(self, text=None, style=None, bold=False, size=None, center=False):
+        """One paragraph with a single run, like ``Document.add_paragraph``."""
+        return self.paragraph_runs([(text, bold)] if text not in (None, '') else [],
+                                   style=style, size=size, center=center)
+
+    def paragraph_runs(self, runs, style=None, size=None, center=False):
+        """One paragraph made of ``(text, bold)`` runs."""
+        props = ''
+        if style:
+            props += f'<w:pStyle w:val="{self.style_id(style)}"/>'
+        if center:
+            props += '<w:jc w:val="center"/>'
+        body = ''.join(self._run(text, bold, size) for text, bold in runs)
+        return f'<w:p>{f"<w:pPr>{props}</w:pPr>" if props else ""}{body}</w:p>'
+
+    def section_properties(self, margin_twips=None):
+        if margin_twips is None:
+            return self.section
+        return re.sub(
+            r'(<w:pgMar\b[^>]*?)w:top="\d+"([^>]*?)w:right="\d+"([^>]*?)w:bottom="\d+"([^>]*?)w:left="\d+"',
+            lambda m: (f'{m.group(1)}w:top="{margin_twips}"{m.group(2)}w:right="{margin_twips}"'
+                       f'{m.group(3)}w:bottom="{margin_twips}"{m.group(4)}w:left="{margin_twips}"'),
+            self.section
+        )
+
+    # -- archive -----------------------------------------------------------
+
+    def render(self, blocks, margin_twips=None):
+        """Yield the bytes of a .docx whose body is the XML strings in ``blocks``."""
+        dos_time, dos_date = _dos_datetime(time.time())
+        offset = 0
+        central = []
+
+        for name, method, crc, compressed_size, size, raw in self.parts:
+            header = struct.pack('<IHHHHHIIIHH', 0x04034b50, 20, 0, method, dos_time, dos_date,
+                                 crc, compressed_size, size, len(name), 0) + name
+            central.append((name, 0, method, crc, compressed_size, size, offset))
+            yield header + raw
+            offset += len(header) + compressed_size
+
+        # The document part is deflated as it is generated; its CRC and sizes
+        # follow the data in a descriptor (general purpose flag bit 3)
+        name = DOCUMENT_PART.encode('utf-8')
+        header = struct.pack('<IHHHHHIIIHH', 0x04034b50, 20, 0x08, zipfile.ZIP_DEFLATED, dos_time, dos_date,
+                             0, 0, 0, len(name), 0) + name
+        yield header
+        document_offset = offset
+        offset += len(header)
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        crc, size, compressed_size = 0, 0, 0
+        pending = []
+        pending_size = 0
+
+        def pieces():
+            yield self.document_head
+            yield from blocks
+            yield self.section_properties(margin_twips)
+            yield '</w:body></w:document>'
+
+        for piece in pieces():
+            data = piece.encode('utf-8')
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+            out = compressor.compress(data)
+            if out:
+                pending.append(out)
+                pending_size += len(out)
+            if pending_size >= CHUNK_SIZE:
+                chunk = b''.join(pending)
+                compressed_size += len(chunk)
+                yield chunk
+                pending, pending_size = [], 0
+        pending.append(compressor.flush())
+        chunk = b''.join(pending)
+        compressed_size += len(chunk)
+        descriptor = struct.pack('<IIII', 0x08074b50, crc, compressed_size, size)
+        yield chunk + descriptor
+        offset += compressed_size + len(descriptor)
+        central.append((name, 0x08, zipfile.ZIP_DEFLATED, crc, compressed_size, size, document_offset))
+
+        directory = b''.join(
+            struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, 20, 20, flags, method, dos_time, dos_date,
+                        crc, compressed_size, size, len(name), 0, 0, 0, 0, 0, header_offset) + name
+            for name, flags, method, crc, compressed_size, size, header_offset in central
+        )
+        yield directory + struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, len(central), len(central),
+                                      len(directory), offset, 0)
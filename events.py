@@ -0,0 +1,275 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from process_local import ProcessLocal
+
+
+class EventLog:
+    """Change events shared by every worker process through an append-only file.
+
+    ``publish`` appends one JSON line under an exclusive lock. Each process
+    runs a follower thread that tails the file into a short in-memory history
+    and wakes the Server-Sent Events streams waiting in that process, so an
+    edit served by one gunicorn worker reaches clients connected to any other.
+
+    Event ids are ``<log id>-<byte offset>``: the log id comes from the file's
+    header line and the offset is where the event's line ends, so ids are
+    ordered and mean the same thing in every process. A client resuming with
+    Last-Event-ID gets the events after it, or a ``reset`` event (telling it
+    to reload) when they are no longer available, e.g. after the file
+    rotated past ``max_bytes``.
+
+    In-process consumers (e.g. the search index) can :meth:`listen` for the
+    same events instead of streaming them.
+    """
+
+    def __init__(self, path, history=500, max_bytes=8 * 1024 * 1024, poll_interval=0.25, keepalive=15):
+        self.path = path
+        self.history = history
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self.keepalive = keepalive
+        self._condition = threading.Condition()
+        self._entries = []
+        self._log_id = None
+        self._trimmed_to = 0
+        self._follower = ProcessLocal(self._start_follower)
+        self._caught_up = False
+        self._listeners = []
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    # -- writing -----------------------------------------------------------
+
+    def publish(self, event_type, data):
+        line = json.dumps({'type': event_type, 'data': data}, separators=(',', ':'), default=str) + '\n'
+        self._append(line.encode('utf-8'))
+
+    def _append(self, line):
+        while True:
+            with open(self.path, 'ab') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    # Another writer may have rotated the file while we waited
+                    if os.fstat(f.fileno()).st_ino != os.stat(self.path).st_ino:
+                        continue
+                    size = f.seek(0, os.SEEK_END)
+                    if size and size + len(line) > self.max_bytes:
+                        os.replace(self.path, f"{self.path}.1")
+                        continue
+                    if not size:
+                        f.write((json.dumps({'log': uuid.uuid4().hex}) + '\n').encode('utf-8'))
+                    f.write(line)
+                    return
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # -- following ---------------------------------------------------------
+
+    def _ensure_follower(self):
+        self._follower.get()
+
+    def _start_follower(self):
+        with self._condition:
+            self._entries, self._log_id, self._trimmed_to = [], None, 0
+            self._caught_up = False
+        # Make sure the file and its header exist before following it
+        self._append(b'')
+        follower = threading.Thread(target=self._follow, name='event-log', daemon=True)
+        follower.start()
+        return follower
+
+    def _follow(self):
+        while True:
+            try:
+                self._follow_file()
+            except FileNotFoundError:
+                # Between a rotation and the next write
+                time.sleep(self.poll_interval)
+            except Exception as e:
+                logging.error(f"Event log follower failed: {str(e)}", exc_info=True)
+                time.sleep(1)
+
+    def _follow_file(self):
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                time.sleep(self.poll_interval)
+                return
+            log_id = json.loads(header)['log']
+            with self._condition:
+                rotated = self._log_id is not None and self._log_id != log_id
+                if rotated:
+                    # Streams notice the new log id and send a reset
+                    self._entries, self._trimmed_to = [], 0
+                self._log_id = log_id
+                self._trimmed_to = max(self._trimmed_to, f.tell())
+                self._condition.notify_all()
+            if rotated:
+                self._dispatch('reset', {})
+            while True:
+                position = f.tell()
+                line = f.readline()
+                if line.endswith(b'\n'):
+                    event = json.loads(line)
+                    with self._condition:
+                        self._entries.append((f.tell(), event['type'], event['data']))
+                        if len(self._entries) > self.history:
+                            self._trimmed_to = self._entries[0][0]
+                            del self._entries[0]
+                        self._condition.notify_all()
+                    self._dispatch(event['type'], event['data'])
+                    continue
+                f.seek(position)
+                if not self._caught_up:
+                    with self._condition:
+                        self._caught_up = True
+                        self._condition.notify_all()
+                try:
+                    if os.stat(self.path).st_ino != os.fstat(f.fileno()).st_ino:
+                        if f.read(1):
+                            f.seek(position)
+                            continue
+                        return
+                except FileNotFoundError:
+                    pass
+                time.sleep(self.poll_interval)
+
+    def listen(self, callback):
+        """Call ``callback(event_type, data)`` on the follower thread for every
+        event published from now on.
+
+        Returns once the follower has read the events already in the file, so
+        anything published before that was stored before the call returned.
+        A ``reset`` event means events may have been missed (the log rotated).
+        """
+        self._listeners.append(callback)
+        self._ensure_follower()
+        with self._condition:
+            self._condition.wait_for(lambda: self._caught_up, timeout=5)
+
+    def _dispatch(self, event_type, data):
+        if not self._caught_up:
+            return
+        for callback in self._listeners:
+            try:
+                callback(event_type, data)
+            except Exception as e:
+                logging.error(f"Event listener failed on {event_type}: {str(e)}", exc_info=True)
+
+    # -- streaming ---------------------------------------------------------
+
+    def _parse_id(self, event_id):
+        log_id, _, offset = (event_id or '').rpartition('-')
+        return (log_id, int(offset)) if log_id and offset.isdigit() else (None, None)
+
+    def _open(self, last_event_id):
+        """Where a stream resuming after ``last_event_id`` starts: ``(log_id, position, reset)``."""
+        log_id = self._log_id
+        resume_log, resume_offset = self._parse_id(last_event_id)
+        latest = self._entries[-1][0] if self._entries else self._trimmed_to
+        if last_event_id is None:
+            return log_id, latest, False
+        if resume_log == log_id and resume_offset >= self._trimmed_to:
+            return log_id, resume_offset, False
+        return log_id, latest, True
+
+    def _has_news(self, log_id, position):
+        return self._log_id != log_id or (self._entries and self._entries[-1][0] > position)
+
+    def _take(self, log_id, position):
+        """Events after ``position``: ``(log_id, position, reset, events)``."""
+        if self._log_id != log_id:
+            log_id, events = self._log_id, list(self._entries)
+            return log_id, (events[-1][0] if events else 0), True, events
+        events = [entry for entry in self._entries if entry[0] > position]
+        return log_id, (events[-1][0] if events else position), False, events
+
+    @staticmethod
+    def _format(log_id, reset, events, reset_position=0):
+        chunks = [f"id: {log_id}-{reset_position}\nevent: reset\ndata: {{}}\n\n"] if reset else []
+        for offset, event_type, data in events:
+            chunks.append(f"id: {log_id}-{offset}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n")
+        return chunks
+
+    def stream(self, last_event_id=None):
+        """Yield Server-Sent Events text: events after ``last_event_id`` (or from now)."""
+        self._ensure_follower()
+        with self._condition:
+            self._condition.wait_for(lambda: self._log_id is not None, timeout=5)
+            log_id, position, reset = self._open(last_event_id)
+        yield 'retry: 3000\n\n'
+        yield from self._format(log_id, reset, [], position)
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._has_news(log_id, position), timeout=self.keepalive)
+                log_id, position, reset, events = self._take(log_id, position)
+            yield from self._format(log_id, reset, events) or [': keepalive\n\n']
+
+    async def astream(self, last_event_id=None):
+        """:meth:`stream` for an event loop: checks for events every ``poll_interval``
+        instead of holding a thread per client."""
+        self._ensure_follower()
+        for _ in range(int(5 / self.poll_interval)):
+            if self._log_id is not None:
+                break
+            await asyncio.sleep(self.poll_interval)
+        with self._condition:
+            log_id, position, reset = self._open(last_event_id)
+        yield 'retry: 3000\n\n'
+        for chunk in self._format(log_id, reset, [], position):
+            yield chunk
+
+        idle = 0.0
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            with self._condition:
+                log_id, position, reset, events = self._take(log_id, position)
+            chunks = self._format(log_id, reset, events)
+            idle = 0.0 if chunks else idle + self.poll_interval
+            if idle >= self.keepalive:
+                chunks, idle = [': keepalive\n\n'], 0.0
+            for chunk in chunks:
+                yield chunk
+
+
+class StreamSlots:
+    """At most ``limit`` open streams per process.
+
+    Under thread-per-request workers every open stream holds a thread until
+    its client goes away, so streams beyond the limit are turned away rather
+    than left to starve the other routes.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    def open(self, chunks):
+        """Return ``chunks`` wrapped to free its slot when closed, or None if all slots are taken."""
+        if self._semaphore is None or not self._semaphore.acquire(blocking=False):
+            return None
+        return _SlotStream(chunks, self._semaphore)
+
+
+class _SlotStream:
+    # The WSGI server closes the response iterable when the client is gone,
+    # whether or not it was ever iterated
+    def __init__(self, chunks, semaphore):
+        self._chunks = chunks
+        self._semaphore = semaphore
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def close(self):
+        semaphore, self._semaphore = self._semaphore, None
+        if semaphore is not None:
+            self._chunks.close()
+            semaphore.release()
@@ -0,0 +1,150 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime
+
+import xlsxwriter
+
+CHUNK_SIZE = 64 * 1024
+
+# (key, header, column width in the spreadsheet)
+TASK_COLUMNS = (
+    ('id', 'Id', 8),
+    ('casenumber', 'Case number', 14),
+    ('submission_id', 'Submission', 12),
+    ('title', 'Title', 40),
+    ('owner', 'Owner', 24),
+    ('stage', 'Stage', 18),
+    ('completion_status', 'Completion status', 22),
+    ('description', 'Description', 60),
+    ('relevance_for_bi', 'Relevance for BI', 60),
+    ('need_for_course', 'Need for course', 60),
+    ('target_group', 'Target group', 40),
+    ('growth_potential', 'Growth potential', 60),
+    ('faculty_resources', 'Faculty resources', 40),
+    ('attachments', 'Attachments', 60),
+)
+HISTORY_COLUMNS = (
+    ('task_id', 'Task id', 8),
+    ('casenumber', 'Case number', 14),
+    ('title', 'Title', 40),
+    ('meeting_number', 'Meeting', 10),
+    ('meeting_date', 'Meeting date', 18),
+    ('task_order', 'Agenda item', 12),
+    ('stage_at_meeting', 'Stage at meeting', 18),
+    ('minutes', 'Minutes', 80),
+)
+# Columns read from Supabase for each export
+TASK_EXPORT_SELECT = ','.join([key for key, _, _ in TASK_COLUMNS if key != 'attachments'] +
+                              ['attachment_url', 'attachments'])
+HISTORY_EXPORT_SELECT = 'id,task_id,task_order,stage_at_meeting,minutes,meetings(number,date),tasks(casenumber,title)'
+
+# A cell starting with one of these is run as a formula by spreadsheet apps
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def task_export_row(task):
+    urls = [attachment.get('url') for attachment in task.get('attachments') or [] if attachment.get('url')]
+    if task.get('attachment_url') and task['attachment_url'] not in urls:
+        urls.insert(0, task['attachment_url'])
+    return {**task, 'attachments': '\n'.join(urls)}
+
+
+def history_export_row(item):
+    meeting = item.get('meetings') or {}
+    task = item.get('tasks') or {}
+    return {
+        'task_id': item.get('task_id'),
+        'casenumber': task.get('casenumber'),
+        'title': task.get('title'),
+        'meeting_number': meeting.get('number'),
+        'meeting_date': parse_timestamp(meeting.get('date')),
+        'task_order': item.get('task_order'),
+        'stage_at_meeting': item.get('stage_at_meeting'),
+        'minutes': item.get('minutes'),
+    }
+
+
+def parse_timestamp(value):
+    """A datetime for an ISO timestamp string, or the value unchanged if it isn't one."""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(columns, rows, chunk_size=CHUNK_SIZE):
+    """Yield ``rows`` (dicts) as UTF-8 CSV in chunks of about ``chunk_size`` bytes.
+
+    The header goes out first, before ``rows`` is read from, with a BOM so
+    Excel reads æøå correctly. Text that a spreadsheet would run as a
+    formula is prefixed with a quote.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header, _ in columns])
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([csv_value(row.get(key)) for key, _, _ in columns])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def xlsx_chunks(sheets, chunk_size=CHUNK_SIZE):
+    """Yield an .xlsx workbook with a worksheet per ``(name, columns, rows)`` in ``sheets``.
+
+    In XlsxWriter's constant_memory mode each row is flushed to a temporary
+    file when the next one starts, so memory stays flat however many rows
+    there are. The zip container is only assembled when the workbook is
+    closed, so it is built in a temporary directory and then read back in
+    chunks; the directory is removed when the generator finishes or is closed.
+    """
+    with tempfile.TemporaryDirectory(prefix='export-') as directory:
+        path = os.path.join(directory, 'export.xlsx')
+        workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'tmpdir': directory,
+            'remove_timezone': True,
+            # Write user text as text, never as formulas, links or numbers
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+            'strings_to_numbers': False,
+        })
+        bold = workbook.add_format({'bold': True})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm'})
+        for name, columns, rows in sheets:
+            sheet = workbook.add_worksheet(name)
+            for index, (_, _, width) in enumerate(columns):
+                sheet.set_column(index, index, width)
+            sheet.freeze_panes(1, 0)
+            sheet.write_row(0, 0, [header for _, header, _ in columns], bold)
+            row_number = 0
+            for row_number, row in enumerate(rows, start=1):
+                for index, (key, _, _) in enumerate(columns):
+                    value = row.get(key)
+                    if isinstance(value, datetime):
+                        sheet.write_datetime(row_number, index, value, date_format)
+                    elif value is not None and value != '':
+                        sheet.write(row_number, index, value)
+            sheet.autofilter(0, 0, row_number, len(columns) - 1)
+        workbook.close()
+        with open(path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
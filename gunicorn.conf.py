@@ -0,0 +1,83 @@
+"""Gunicorn settings: ``gunicorn -c gunicorn.conf.py app:app``.
+
+WORKER_PROFILE picks the worker model:
+
+    gthread (default)  WEB_CONCURRENCY processes with GUNICORN_THREADS threads each
+    gevent             WEB_CONCURRENCY processes with up to
+                       GUNICORN_WORKER_CONNECTIONS greenlets each
+    sync               WEB_CONCURRENCY single-request processes
+    asgi               WEB_CONCURRENCY uvicorn event loops; run with
+                       ``asgi:app`` instead of ``app:app`` (see asgi.py)
+
+Requests spend most of their time waiting on Supabase and Nettskjema, so a
+few processes with many threads or greenlets serve far more clients than
+sync workers. The app is preloaded in the master (GUNICORN_PRELOAD=false
+turns that off) so workers fork with everything imported; clients that hold
+connections are built per process on first use.
+
+Every open GET /events stream keeps a thread (gthread) or greenlet (gevent)
+busy, so each worker caps them at EVENT_STREAM_LIMIT (half its threads under
+gthread, none under sync) and answers 503 beyond that; prefer gevent or asgi
+when many boards stay open.
+"""
+import glob
+import multiprocessing
+import os
+
+profile = os.environ.get("WORKER_PROFILE", "gthread").lower()
+if profile not in ("gthread", "gevent", "sync", "asgi"):
+    raise RuntimeError(f"Unknown WORKER_PROFILE: {profile}")
+
+if profile == "gevent":
+    import sys
+
+    # httpcore imports trio when it is installed (selenium pulls it in), and
+    # trio's import needs select.epoll, which gevent removes; the app never
+    # runs trio, so make it look absent
+    sys.modules.setdefault("trio", None)
+
+    # Patch before the app is preloaded, so the sockets and locks it creates
+    # at import time are cooperative too
+    from gevent import monkey
+    monkey.patch_all()
+
+cpus = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker" if profile == "asgi" else profile
+workers = int(os.environ.get("WEB_CONCURRENCY", 2 * cpus + 1 if profile == "sync" else max(2, cpus)))
+threads = int(os.environ.get("GUNICORN_THREADS", "8")) if profile == "gthread" else 1
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "200"))
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Sync workers are killed when a single request outlives the timeout, and a
+# full Nettskjema import can take minutes
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then to bound slow leaks; jitter avoids all of
+# them restarting at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-") or None
+
+
+def on_starting(server):
+    # Workers of a previous run left snapshots that /metrics would still sum
+    directory = os.environ.get("METRICS_DIR")
+    if directory:
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+
+
+def post_worker_init(worker):
+    # Loading every task into the search index and analytics takes a while,
+    # so start on it before the first request that needs them
+    if os.environ.get("INDEX_WARMUP", "true").lower() == "true":
+        import threading
+        from app import warm_indexes
+        threading.Thread(target=warm_indexes, name="index-warmup", daemon=True).start()
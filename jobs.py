@@ -0,0 +1,194 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from process_local import ProcessLocal
+
+STATE_SUFFIX = '.state'
+
+
+class ArtifactJobs:
+    """Background rendering of files into a content-addressed artifact cache.
+
+    A job id names its artifact: callers derive it from a hash of everything
+    the file is rendered from, so unchanged input maps to the same id and a
+    finished artifact is served straight from disk. Artifacts are written to
+    a temporary name and renamed into place, which lets any worker process
+    sharing the directory serve them. A job's queued/running/failed state is
+    kept next to its artifact in ``<job_id>.state``, so every worker gives the
+    same answer and a job already queued by one is not rendered again by
+    another; the state of a job whose process died (workers sharing the
+    directory are assumed to share a host) is treated as gone. State
+    files of finished or failed jobs are removed ``job_ttl`` seconds after
+    the job ends, or when its artifact is pruned. A renderer is a callable
+    that returns an iterable of byte chunks.
+    """
+
+    def __init__(self, directory, max_workers=2, max_files=200, suffix='', job_ttl=3600):
+        self.directory = directory
+        self.max_files = max_files
+        self.suffix = suffix
+        self.job_ttl = job_ttl
+        self._pool = ProcessLocal(
+            lambda: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='artifact'))
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def pool(self):
+        return self._pool.get()
+
+    def path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}{self.suffix}")
+
+    def exists(self, job_id):
+        return os.path.exists(self.path(job_id))
+
+    def _tmp_path(self, path):
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def render(self, job_id, render):
+        """Write the chunks of ``render()`` now unless the artifact exists; returns its path."""
+        path = self.path(job_id)
+        if os.path.exists(path):
+            return path
+        tmp_path = self._tmp_path(path)
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in render():
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._prune()
+        return path
+
+    def stream(self, job_id, render):
+        """Yield the chunks of ``render()`` while also saving them as the artifact.
+
+        The artifact is only renamed into place once the last chunk has been
+        produced; a client that disconnects early leaves nothing behind.
+        """
+        path = self.path(job_id)
+        tmp_path = self._tmp_path(path)
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in render():
+                    f.write(chunk)
+                    yield chunk
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._prune()
+
+    def submit(self, job_id, render):
+        """Queue ``render`` for ``job_id`` unless it is done or already queued by any worker."""
+        with self._locked():
+            self._forget_finished()
+            state = self._read_state(job_id)
+            if self.exists(job_id) or (state and state['status'] in ('queued', 'running')):
+                return self.status(job_id)
+            self._write_state(job_id, {'status': 'queued', 'error': None, 'submitted_at': time.time(),
+                                       'pid': os.getpid()})
+        self.pool.submit(self._run, job_id, render)
+        return self.status(job_id)
+
+    def _run(self, job_id, render):
+        self._update_state(job_id, status='running')
+        started = time.perf_counter()
+        try:
+            self.render(job_id, render)
+            status, error = 'done', None
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+            status, error = 'failed', str(e)
+        self._update_state(job_id, status=status, error=error, seconds=round(time.perf_counter() - started, 3),
+                           finished_at=time.time())
+
+    def status(self, job_id):
+        """Return the job's state, or None if no worker has it queued, running or recently ended."""
+        state = self._read_state(job_id)
+        if self.exists(job_id):
+            return {'id': job_id, 'status': 'done', 'error': None, 'seconds': state.get('seconds') if state else None}
+        if state is None:
+            return None
+        return {'id': job_id, 'status': state['status'], 'error': state['error'], 'seconds': state.get('seconds')}
+
+    # -- shared state ------------------------------------------------------
+
+    def _state_path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}{STATE_SUFFIX}")
+
+    def _locked(self):
+        # Serialises submits across the worker processes sharing the directory
+        lock = open(os.path.join(self.directory, '.jobs.lock'), 'a')
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def _read_state(self, job_id):
+        """The job's state file, or None if there is none or its process has died."""
+        try:
+            with open(self._state_path(job_id)) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if state['status'] in ('queued', 'running') and not _process_alive(state['pid']):
+            return None
+        return state
+
+    def _write_state(self, job_id, state):
+        path = self._state_path(job_id)
+        tmp_path = self._tmp_path(path)
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def _update_state(self, job_id, **changes):
+        # Only the process running the job writes its state after the submit
+        state = self._read_state(job_id) or {'error': None, 'pid': os.getpid()}
+        self._write_state(job_id, {**state, **changes})
+
+    def _forget_finished(self):
+        expired = time.time() - self.job_ttl
+        for name in os.listdir(self.directory):
+            if not name.endswith(STATE_SUFFIX):
+                continue
+            job_id = name[:-len(STATE_SUFFIX)]
+            state = self._read_state(job_id)
+            if state is None or ('finished_at' in state and state['finished_at'] < expired):
+                self._remove(self._state_path(job_id))
+
+    def _prune(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith(self.suffix) and not name.endswith(('.tmp', '.lock', STATE_SUFFIX))]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_files]:
+            self._remove(path)
+            job_id = os.path.basename(path)[:-len(self.suffix) or None]
+            state = self._read_state(job_id)
+            if state and 'finished_at' in state:
+                self._remove(self._state_path(job_id))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
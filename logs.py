@@ -0,0 +1,122 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from process_local import ProcessLocal
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+class LazyJson:
+    """Log argument that is only serialised if the record is emitted.
+
+    ``logging.debug("Task: %s", LazyJson(task))`` costs nothing unless DEBUG
+    is enabled.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return json.dumps(self.value, ensure_ascii=False, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the id of the request being served, if any."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id,
+    any ``extra`` fields and the formatted exception."""
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s')
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """QueueHandler whose listener thread writes to ``handlers``.
+
+    Callers only format the message and enqueue it; encoding and writing
+    happen on the listener thread. Each worker process starts its own
+    listener on its first record.
+    """
+
+    def __init__(self, handlers):
+        super().__init__(queue.SimpleQueue())
+        self.handlers = handlers
+        self._listener = ProcessLocal(self._start_listener)
+
+    def _start_listener(self):
+        self.queue = queue.SimpleQueue()
+        listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        return listener
+
+    def _ensure_listener(self):
+        self._listener.get()
+
+    def prepare(self, record):
+        # Merge the arguments now, while they still hold what the caller
+        # logged, but leave the traceback separate for the formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+
+def setup_logging(level='INFO', fmt='json', stream=None):
+    """Route the root logger through a background queue to ``stream`` (stderr)."""
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+    handler = BackgroundQueueHandler([output])
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    return handler
@@ -0,0 +1,282 @@
+import bisect
+import contextvars
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Seconds; covers cached reads through to full imports
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestStats:
+    """Upstream calls made while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def add(self, service, target, seconds):
+        # Attachment transfers report from pool threads, hence the lock
+        with self._lock:
+            self.calls.append((service, target, seconds))
+
+    def breakdown(self):
+        """``{(service, target): [count, seconds]}`` for the calls so far."""
+        totals = {}
+        for service, target, seconds in self.calls:
+            entry = totals.setdefault((service, target), [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+        return totals
+
+
+def upstream_target(url):
+    """A low-cardinality label for an upstream URL: table, function or bucket."""
+    path = urlsplit(str(url)).path
+    parts = [part for part in path.split('/') if part]
+    if parts[:3] == ['rest', 'v1', 'rpc'] and len(parts) > 3:
+        return f"rpc:{parts[3]}"
+    if parts[:2] == ['rest', 'v1'] and len(parts) > 2:
+        return parts[2]
+    if parts[:3] == ['storage', 'v1', 'object'] and len(parts) > 3:
+        bucket = parts[4] if parts[3] in ('public', 'sign', 'authenticated', 'info') and len(parts) > 4 else parts[3]
+        return f"storage:{bucket}"
+    if 'token' in parts:
+        return 'token'
+    if 'answers' in parts:
+        return 'answers'
+    if 'elements' in parts:
+        return 'elements'
+    if 'attachment' in parts:
+        return 'attachment'
+    return parts[0] if parts else '/'
+
+
+class Metrics:
+    """Counters and histograms rendered in the Prometheus text format.
+
+    Values live in the worker process. With ``directory`` set, each worker
+    also writes a snapshot of its values there (at most every
+    ``flush_interval`` seconds and before every scrape), and :meth:`render`
+    sums the snapshots of all workers, so a scrape that lands on any worker
+    sees the whole server. Snapshots of exited workers are kept so totals
+    never go backwards; clear the directory when the server starts.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._dirty = False
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def describe(self, name, kind, help_text, buckets=None):
+        self._help[name] = (kind, help_text, tuple(buckets or DEFAULT_BUCKETS))
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._dirty = True
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self._help[name][2]
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+            self._dirty = True
+
+    # -- multi-process snapshots -------------------------------------------
+
+    def _snapshot(self):
+        with self._lock:
+            self._dirty = False
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, labels, counts[:], total, count]
+                               for (name, labels), (counts, total, count) in self._histograms.items()],
+            }
+
+    def flush(self, force=False):
+        """Write this worker's snapshot if due (or ``force``) and anything changed."""
+        if not self.directory or not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not write metrics snapshot: {e}")
+
+    def _collect(self):
+        if not self.directory:
+            snapshots = [self._snapshot()]
+        else:
+            self.flush(force=True)
+            snapshots = []
+            for path in glob.glob(os.path.join(self.directory, '*.json')):
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+            if not snapshots:
+                snapshots = [self._snapshot()]
+        counters, histograms = {}, {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, counts, total, count in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+                merged[2] += count
+        return counters, histograms
+
+    # -- exposition --------------------------------------------------------
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        counters, histograms = self._collect()
+        lines = []
+        for name in sorted({key[0] for key in counters} | {key[0] for key in histograms}):
+            kind, help_text, buckets = self._help.get(name, ('untyped', '', DEFAULT_BUCKETS))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'histogram':
+                for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{self._labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{self._labels(labels)} {total:.6f}")
+                    lines.append(f"{name}_count{self._labels(labels)} {count}")
+            else:
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{self._labels(labels)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+    # -- request tracking --------------------------------------------------
+
+    def begin_request(self):
+        stats = RequestStats()
+        _current.set(stats)
+        return stats
+
+    @staticmethod
+    def current_request():
+        return _current.get()
+
+    def end_request(self, route, method, status):
+        """Record the request's latency and upstream calls; returns its stats."""
+        stats = _current.get()
+        if stats is None:
+            return None
+        _current.set(None)
+        seconds = time.perf_counter() - stats.started
+        self.observe('http_request_duration_seconds',
+                     {'route': route, 'method': method, 'status': str(status)}, seconds)
+        calls = {}
+        for service, _, _ in stats.calls:
+            calls[service] = calls.get(service, 0) + 1
+        for service in ('supabase', 'nettskjema'):
+            self.observe('http_request_upstream_calls', {'route': route, 'service': service}, calls.get(service, 0))
+        self.flush()
+        stats.seconds = seconds
+        return stats
+
+    def record_upstream(self, service, method, url, status, seconds):
+        target = upstream_target(url)
+        self.observe('upstream_request_duration_seconds',
+                     {'service': service, 'target': target, 'method': method, 'status': str(status)}, seconds)
+        stats = _current.get()
+        if stats is not None:
+            stats.add(service, target, seconds)
+
+    # -- client hooks ------------------------------------------------------
+
+    def httpx_hooks(self, service):
+        """``event_hooks`` for an httpx.Client that record every call."""
+        def on_request(request):
+            request.extensions['metrics_started'] = time.perf_counter()
+
+        def on_response(response):
+            started = response.request.extensions.get('metrics_started')
+            if started is not None:
+                self.record_upstream(service, response.request.method, response.request.url,
+                                     response.status_code, time.perf_counter() - started)
+
+        return {'request': [on_request], 'response': [on_response]}
+
+    def httpx_async_hooks(self, service):
+        """``event_hooks`` for an httpx.AsyncClient that record every call."""
+        hooks = self.httpx_hooks(service)
+
+        def wrap(hook):
+            async def run(message):
+                hook(message)
+            return run
+
+        return {event: [wrap(hook) for hook in event_hooks] for event, event_hooks in hooks.items()}
+
+    def requests_hook(self, service):
+        """A requests ``response`` hook that records every call."""
+        def on_response(response, *args, **kwargs):
+            self.record_upstream(service, response.request.method, response.request.url,
+                                 response.status_code, response.elapsed.total_seconds())
+            return response
+
+        return on_response
+
+
+def default_metrics(directory=None):
+    metrics = Metrics(directory)
+    metrics.describe('http_request_duration_seconds', 'histogram',
+                     'Time spent handling requests, by route, method and status.')
+    metrics.describe('http_request_upstream_calls', 'histogram',
+                     'Upstream calls made while handling one request, by route and service.',
+                     buckets=CALL_COUNT_BUCKETS)
+    metrics.describe('upstream_request_duration_seconds', 'histogram',
+                     'Time until response headers for calls to Supabase and Nettskjema.')
+    return metrics
@@ -0,0 +1,126 @@
+import json
+import logging
+import threading
+import time
+from itertools import groupby
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from process_local import ProcessLocal
+
+
+class NettskjemaFeedError(Exception):
+    """The answers feed did not arrive in the order the parser relies on."""
+
+
+def iter_answers(lines):
+    """Decode an NDJSON answers feed one line at a time, skipping bad lines."""
+    for line in lines:
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logging.error(f"Error decoding JSON line: {e}")
+            logging.error(f"Problematic line: {line}")
+
+
+def group_submissions(answers, ordered=True):
+    """Yield the answers of each submission as a list, in submission id order.
+
+    With ``ordered`` the feed is assumed to list each submission's answers
+    together and in ascending submission id, so only the current submission is
+    held in memory; a feed that breaks that assumption raises
+    NettskjemaFeedError. Without it all answers are buffered and sorted first.
+    """
+    if not ordered:
+        submissions = {}
+        for answer in answers:
+            submissions.setdefault(answer['submissionId'], []).append(answer)
+        for submission_id in sorted(submissions):
+            yield submissions.pop(submission_id)
+        return
+
+    previous_id = None
+    for submission_id, group in groupby(answers, key=lambda answer: answer['submissionId']):
+        if previous_id is not None and submission_id <= previous_id:
+            raise NettskjemaFeedError(
+                f"Answers feed is not ordered by submission: {submission_id} after {previous_id}"
+            )
+        previous_id = submission_id
+        yield list(group)
+
+
+class NettskjemaClient:
+    """Client-credentials API client for Nettskjema.
+
+    Keeps one ``OAuth2Session`` (and with it one connection pool) per worker
+    process, reuses the access token until shortly before it expires, and
+    retries idempotent calls with exponential backoff on 429 and 5xx replies.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, client_id, client_secret, api_url, auth_url,
+                 token_margin=60, retries=4, backoff_factor=0.5, pool_size=10, response_hook=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.api_url = api_url.rstrip('/')
+        self.auth_url = auth_url
+        self.token_margin = token_margin
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self.response_hook = response_hook
+        # A session inherited across fork would share sockets with the parent
+        self._session = ProcessLocal(self._new_session)
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        # Only imports and form sync talk to Nettskjema, so the OAuth stack is
+        # loaded on first use rather than at worker boot
+        from oauthlib.oauth2 import BackendApplicationClient
+        from requests_oauthlib import OAuth2Session
+
+        session = OAuth2Session(client=BackendApplicationClient(client_id=self.client_id))
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'HEAD', 'POST'}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if self.response_hook:
+            session.hooks['response'].append(self.response_hook)
+        return session
+
+    def _token_expired(self, session):
+        expires_at = session.token.get('expires_at') if session.token else None
+        return expires_at is None or time.time() >= expires_at - self.token_margin
+
+    def session(self, force_refresh=False):
+        """Return this process's session, fetching a new token when needed."""
+        session = self._session.get()
+        with self._lock:
+            if force_refresh or self._token_expired(session):
+                logging.info("Fetching Nettskjema access token")
+                session.fetch_token(
+                    token_url=self.auth_url,
+                    client_id=self.client_id,
+                    client_secret=self.client_secret
+                )
+            return session
+
+    def get(self, path, **kwargs):
+        """GET ``path`` relative to the API root; refreshes the token once on 401."""
+        url = path if path.startswith('http') else f"{self.api_url}/{path.lstrip('/')}"
+        response = self.session().get(url, **kwargs)
+        if response.status_code == 401:
+            response.close()
+            response = self.session(force_refresh=True).get(url, **kwargs)
+        response.raise_for_status()
+        return response
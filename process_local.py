@@ -0,0 +1,28 @@
+import os
+import threading
+
+
+class ProcessLocal:
+    """Proxy to an object that is built on first use in each process.
+
+    gunicorn's preload imports the app once in the master and then forks;
+    clients holding connection pools must not be shared across that fork,
+    and threads don't survive it, so each worker builds its own on first use.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._value = self._factory()
+                    self._pid = os.getpid()
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
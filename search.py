@@ -0,0 +1,198 @@
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+# Free-text task columns and how much a match in each counts
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'casenumber': 3.0,
+    'owner': 2.0,
+    'description': 1.0,
+    'relevance_for_bi': 1.0,
+    'need_for_course': 1.0,
+    'target_group': 1.0,
+    'growth_potential': 1.0,
+    'faculty_resources': 1.0,
+}
+# Returned with each hit, so a result list needs no further lookups
+RESULT_FIELDS = ('id', 'casenumber', 'title', 'owner', 'stage', 'completion_status')
+
+TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """In-memory inverted index over tasks, ranked with BM25.
+
+    ``postings`` maps each term to ``{task id: weighted term frequency}``, so
+    a query only visits the tasks that contain one of its terms. Tasks are
+    added, replaced and removed one at a time as they change; :meth:`rebuild`
+    loads everything from ``loader`` (an iterable of task rows) when the
+    index is first used, after events were missed, or once it is older than
+    ``max_age`` seconds, which also picks up edits made outside the API.
+    """
+
+    def __init__(self, loader, max_age=600.0, k1=1.2, b=0.75):
+        self.loader = loader
+        self.max_age = max_age
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._clear()
+        self._built_at = None
+        self._stale = True
+        self._pending = None
+
+    def _clear(self):
+        self.postings = {}
+        self._terms = {}
+        self._lengths = {}
+        self._documents = {}
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._documents)
+
+    # -- maintenance -------------------------------------------------------
+
+    def _add(self, row):
+        terms = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token, count in Counter(tokenize(row.get(field))).items():
+                terms[token] = terms.get(token, 0.0) + count * weight
+        task_id = row['id']
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[task_id] = frequency
+        self._terms[task_id] = tuple(terms)
+        self._lengths[task_id] = length = sum(terms.values())
+        self._total_length += length
+        self._documents[task_id] = {field: row.get(field) for field in RESULT_FIELDS}
+
+    def _remove(self, task_id):
+        for term in self._terms.pop(task_id, ()):
+            postings = self.postings[term]
+            del postings[task_id]
+            if not postings:
+                del self.postings[term]
+        self._total_length -= self._lengths.pop(task_id, 0.0)
+        self._documents.pop(task_id, None)
+
+    def upsert(self, row):
+        """Index a task row, replacing the task's previous version."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(('upsert', row))
+            self._remove(row['id'])
+            self._add(row)
+
+    def remove(self, task_id):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(('remove', task_id))
+            self._remove(task_id)
+
+    def invalidate(self):
+        """Rebuild before the next search, e.g. after a bulk import."""
+        self._stale = True
+
+    def rebuild(self, only_if_stale=False):
+        """Reload every task; changes that arrive meanwhile are replayed on top."""
+        with self._rebuild_lock:
+            if only_if_stale and self._built_at is not None and not self._stale:
+                # Another thread rebuilt it while we waited
+                return
+            started = time.perf_counter()
+            with self._lock:
+                self._pending = []
+                self._stale = False
+            try:
+                fresh = SearchIndex(self.loader, self.max_age, self.k1, self.b)
+                for row in self.loader():
+                    fresh._add(row)
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                    self._stale = True
+                raise
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self.postings, self._terms, self._lengths = fresh.postings, fresh._terms, fresh._lengths
+                self._documents, self._total_length = fresh._documents, fresh._total_length
+                for action, value in pending:
+                    if action == 'upsert':
+                        self._remove(value['id'])
+                        self._add(value)
+                    else:
+                        self._remove(value)
+                self._built_at = time.monotonic()
+            logging.info("Rebuilt search index", extra={
+                'tasks': len(self._documents), 'terms': len(self.postings),
+                'seconds': round(time.perf_counter() - started, 3)
+            })
+
+    def ensure_fresh(self):
+        if self._built_at is None or self._stale:
+            self.rebuild(only_if_stale=True)
+        elif self.max_age and time.monotonic() - self._built_at > self.max_age and not self._rebuild_lock.locked():
+            # Serve the current index while a fresh one loads
+            self._built_at = time.monotonic()
+            threading.Thread(target=self._rebuild_quietly, name='search-index', daemon=True).start()
+
+    def _rebuild_quietly(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logging.error(f"Search index rebuild failed: {str(e)}")
+
+    # -- querying ----------------------------------------------------------
+
+    def search(self, query, limit=20, offset=0, where=None):
+        """Return ``(total, hits)`` for tasks matching any term of ``query``.
+
+        Hits are the RESULT_FIELDS of each task plus its ``score``, best
+        first. ``where`` optionally filters on those fields.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._documents)
+            if not terms or not count:
+                return 0, []
+            average_length = self._total_length / count
+            k1, b = self.k1, self.b
+            scores = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for task_id, frequency in postings.items():
+                    norm = k1 * (1 - b + b * self._lengths[task_id] / average_length)
+                    scores[task_id] = scores.get(task_id, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+            if where:
+                scores = {
+                    task_id: score for task_id, score in scores.items()
+                    if all(self._documents[task_id].get(field) in values for field, values in where.items())
+                }
+            # Ties go to the newest task
+            best = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], item[0]))
+            hits = [dict(self._documents[task_id], score=round(score, 4)) for task_id, score in best[offset:]]
+        return len(scores), hits
+
+    # -- change feed -------------------------------------------------------
+
+    def apply_event(self, event_type, data):
+        """EventLog listener that keeps the index in step with the API's writes."""
+        if event_type in ('task.created', 'task.updated'):
+            self.upsert(data)
+        elif event_type == 'task.deleted':
+            self.remove(data['id'])
+        elif event_type in ('tasks.imported', 'reset'):
+            self.invalidate()
@@ -0,0 +1,125 @@
+import hashlib
+import tempfile
+from urllib.parse import quote
+
+import requests
+
+from process_local import ProcessLocal
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """An incoming file grew past the size limit of its HashingSpool."""
+
+
+class HashingSpool:
+    """Writable buffer for an incoming upload that hashes it on the way in.
+
+    The SHA-256 and size are updated with every chunk written, so they are
+    known as soon as the upload has been received. Content is kept in memory
+    up to ``spool_size`` and on disk after that; writing more than
+    ``max_size`` bytes raises UploadTooLarge.
+    """
+
+    def __init__(self, max_size=None, spool_size=512 * 1024):
+        self.max_size = max_size
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+b')
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise UploadTooLarge(f"Upload exceeds {self.max_size} bytes")
+        self.sha256.update(data)
+        return self._file.write(data)
+
+    def chunks(self, size=CHUNK_SIZE):
+        """Yield the content from the start in ``size`` byte chunks."""
+        self._file.seek(0)
+        while chunk := self._file.read(size):
+            yield chunk
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class ByteStream:
+    """Iterable request body that counts the bytes passing through it.
+
+    Given a ``length`` it also reports ``len()``, which lets requests send a
+    Content-Length header instead of falling back to chunked encoding.
+    """
+
+    def __init__(self, chunks, length=None):
+        self._chunks = chunks
+        self._length = length
+        self.bytes_sent = 0
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if chunk:
+                self.bytes_sent += len(chunk)
+                yield chunk
+
+    def __len__(self):
+        if self._length is None:
+            raise TypeError("length unknown")
+        return self._length
+
+
+class StorageBucket:
+    """Streaming access to one Supabase Storage bucket over the REST API.
+
+    storage3's ``upload()`` needs the whole file as bytes; this posts an
+    iterable body instead, so a file never has to sit in worker memory. Each
+    worker process keeps its own pooled HTTP session.
+    """
+
+    def __init__(self, supabase_url, supabase_key, bucket, timeout=60, response_hook=None):
+        self.base_url = f"{supabase_url.rstrip('/')}/storage/v1"
+        self.bucket = bucket
+        self.timeout = timeout
+        self._headers = {'apikey': supabase_key, 'Authorization': f"Bearer {supabase_key}"}
+        self._response_hook = response_hook
+        self._session = ProcessLocal(self._new_session)
+
+    @property
+    def session(self):
+        return self._session.get()
+
+    def _new_session(self):
+        session = requests.Session()
+        session.headers.update(self._headers)
+        if self._response_hook:
+            session.hooks['response'].append(self._response_hook)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _object_url(self, path):
+        return f"{self.base_url}/object/{self.bucket}/{quote(path)}"
+
+    def upload(self, path, chunks, content_type=None, length=None, upsert=False):
+        """Stream ``chunks`` (an iterable of bytes) to ``path``; returns bytes sent."""
+        body = ByteStream(chunks, length)
+        headers = {
+            'Content-Type': content_type or 'application/octet-stream',
+            'x-upsert': 'true' if upsert else 'false'
+        }
+        response = self.session.post(self._object_url(path), data=body, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return body.bytes_sent
+
+    def exists(self, path):
+        """Whether an object is stored at ``path``."""
+        response = self.session.head(self._object_url(path), timeout=self.timeout)
+        if response.status_code in (400, 404):
+            return False
+        response.raise_for_status()
+        return True
+
+    def public_url(self, path):
+        return f"{self.base_url}/object/public/{self.bucket}/{quote(path)}"
@@ -0,0 +1,4 @@
+-- Reordering an agenda upserts meeting_tasks rows keyed on (meeting_id, task_id),
+-- which needs a unique index on that pair for ON CONFLICT to resolve against.
+create unique index if not exists meeting_tasks_meeting_id_task_id_key
+    on public.meeting_tasks (meeting_id, task_id);
@@ -0,0 +1,7 @@
+-- High-water mark for incremental Nettskjema imports: the highest submission id
+-- from each form that has been stored as a task.
+create table if not exists public.nettskjema_imports (
+    form_id text primary key,
+    last_submission_id bigint,
+    imported_at timestamptz not null default now()
+);
@@ -0,0 +1,5 @@
+-- Imports insert with ON CONFLICT (submission_id) DO NOTHING, so duplicate
+-- submissions are rejected by the database instead of a client-side scan.
+-- Tasks created by hand have no submission_id; NULLs never conflict.
+create unique index if not exists tasks_submission_id_key
+    on public.tasks (submission_id);
@@ -0,0 +1,12 @@
+-- Appends one attachment to a task in a single statement, so concurrent uploads
+-- to the same task cannot overwrite each other's entries. Returns the task's
+-- attachments after the append, or NULL when the task does not exist.
+create or replace function public.append_task_attachment(task_id bigint, attachment jsonb)
+returns jsonb
+language sql
+as $$
+    update public.tasks
+       set attachments = coalesce(attachments, '[]'::jsonb) || jsonb_build_array(attachment)
+     where id = task_id
+    returning attachments;
+$$;
@@ -0,0 +1,20 @@
+-- Row version for optimistic concurrency on task edits. Every UPDATE bumps it,
+-- so a client that sends back the version it last read (If-Match or "version")
+-- only writes if nobody else has changed the task since.
+alter table public.tasks
+    add column if not exists version integer not null default 1;
+
+create or replace function public.bump_task_version()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.version := old.version + 1;
+    return new;
+end;
+$$;
+
+drop trigger if exists tasks_bump_version on public.tasks;
+create trigger tasks_bump_version
+    before update on public.tasks
+    for each row execute function public.bump_task_version();
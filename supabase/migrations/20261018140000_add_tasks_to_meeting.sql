@@ -0,0 +1,62 @@
+-- Adds tasks to a meeting's agenda in one transaction. The meeting row is locked
+-- first, so concurrent adds to the same meeting queue up and each one numbers
+-- its tasks after max(task_order) without colliding. Tasks keep the order they
+-- were given in, each with a snapshot of its current stage; tasks already on
+-- the agenda (and repeated ids) are skipped.
+--
+-- Returns {"status": "ok", "added": [meeting_tasks rows]}, or a status of
+-- "meeting_not_found", "meeting_completed" or "tasks_not_found" (with the
+-- missing "task_ids"), in which case nothing is added.
+create or replace function public.add_tasks_to_meeting(meeting_id bigint, task_ids bigint[])
+returns jsonb
+language plpgsql
+as $$
+declare
+    completed boolean;
+    missing bigint[];
+    last_order integer;
+    added jsonb;
+begin
+    select m.is_completed into completed
+      from public.meetings m
+     where m.id = add_tasks_to_meeting.meeting_id
+       for update;
+    if not found then
+        return jsonb_build_object('status', 'meeting_not_found');
+    end if;
+    if coalesce(completed, false) then
+        return jsonb_build_object('status', 'meeting_completed');
+    end if;
+
+    select coalesce(array_agg(distinct requested.id), '{}') into missing
+      from unnest(task_ids) as requested(id)
+     where not exists (select 1 from public.tasks t where t.id = requested.id);
+    if cardinality(missing) > 0 then
+        return jsonb_build_object('status', 'tasks_not_found', 'task_ids', to_jsonb(missing));
+    end if;
+
+    select coalesce(max(mt.task_order), 0) into last_order
+      from public.meeting_tasks mt
+     where mt.meeting_id = add_tasks_to_meeting.meeting_id;
+
+    with requested as (
+        select r.id, min(r.position) as position
+          from unnest(task_ids) with ordinality as r(id, position)
+         where not exists (
+               select 1 from public.meeting_tasks mt
+                where mt.meeting_id = add_tasks_to_meeting.meeting_id and mt.task_id = r.id)
+         group by r.id
+    ), inserted as (
+        insert into public.meeting_tasks (meeting_id, task_id, task_order, stage_at_meeting)
+        select add_tasks_to_meeting.meeting_id, t.id,
+               last_order + row_number() over (order by requested.position), t.stage
+          from requested
+          join public.tasks t on t.id = requested.id
+        returning *
+    )
+    select coalesce(jsonb_agg(to_jsonb(inserted) order by inserted.task_order), '[]'::jsonb) into added
+      from inserted;
+
+    return jsonb_build_object('status', 'ok', 'added', added);
+end;
+$$;